@@ -0,0 +1,145 @@
+#
+#
+# Leapyosc
+# Logging which never blocks the thread logging
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+import atexit
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing.util import register_after_fork
+
+
+DEBUG = 10
+INFO = 20
+
+# Kinds of record queued
+_LINE = 0
+_EVENT = 1
+
+
+class AsyncLog(object):
+    """
+    Writes log lines to `stream` from a background thread (started on the
+    first record), so the Leap callback and sender threads never wait on
+    it.
+
+    Records are handed over in a deque, which can be appended to without
+    taking a lock; the writer wakes up every `interval` seconds to write
+    out what has been queued. If it falls more than `max_pending` records
+    behind, the oldest are dropped (and how many is logged.)
+
+    Repeated events (`event`) are only counted, and summarized once every
+    `summary_interval` seconds, e.g. "Zeroed 37 lost fingers in the last
+    1s"; at `DEBUG` level each is also written out as it happens. Lines
+    below `level` aren't even queued.
+    """
+
+    def __init__(self, stream=None, level=INFO, interval=0.05,
+                summary_interval=1.0, max_pending=10000):
+        self.stream = stream
+        self.level = level
+        self.interval = interval
+        self.summary_interval = summary_interval
+        self.max_pending = max_pending
+        self._reset()
+        register_after_fork(self, AsyncLog._reset)
+        atexit.register(self.close)
+
+    def _reset(self):
+        # Also in a forked child, which has a copy of the queue but not
+        # the thread
+        self._records = deque(maxlen=self.max_pending)
+        self._counts = {}
+        self._summarized_at = time.time()
+        self.dropped = 0
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def _queue(self, record):
+        records = self._records
+        if len(records) >= self.max_pending:
+            self.dropped += 1 # Near enough; not worth a lock
+        records.append(record)
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        # Records may be queued from several threads at once; only one
+        # of them starts the writer
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            thread = threading.Thread(target=self._run, name="leapyosc-log")
+            thread.daemon = True
+            thread.start()
+            self._thread = thread
+
+    def write(self, text, level=INFO):
+        if level >= self.level:
+            self._queue((_LINE, text))
+
+    def event(self, action, noun, detail=None):
+        """
+        Count an `action` on a `noun` (e.g. "Zeroed", "lost finger"); a
+        `detail` line is written as well at `DEBUG` level.
+        """
+        self._queue((_EVENT, (action, noun),
+                    detail if self.level <= DEBUG else None))
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._write_pending()
+
+    def _write_pending(self, final=False):
+        records = self._records
+        lines = []
+        counts = self._counts
+        while records:
+            record = records.popleft()
+            if record[0] == _LINE:
+                lines.append(record[1])
+                continue
+            _, key, detail = record
+            counts[key] = counts.get(key, 0) + 1
+            if detail is not None:
+                lines.append(detail)
+        now = time.time()
+        if counts and (final or
+                    now - self._summarized_at >= self.summary_interval):
+            lines.extend(self._summary(now))
+        elif not counts:
+            self._summarized_at = now
+        if self.dropped:
+            lines.append("Dropped %s log records\n" % self.dropped)
+            self.dropped = 0
+        if lines:
+            stream = self.stream or sys.stderr
+            stream.write("".join(lines))
+            stream.flush()
+
+    def _summary(self, now):
+        seconds = now - self._summarized_at
+        lines = ["%s %s %s%s in the last %.3gs\n" % (action, count, noun,
+                                                    "" if count == 1 else "s",
+                                                    seconds)
+                for (action, noun), count in sorted(self._counts.items())]
+        self._counts = {}
+        self._summarized_at = now
+        return lines
+
+    def close(self, timeout=1.0):
+        """
+        Stop the writer, once everything queued has been written.
+        """
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join(timeout)
+            self._thread = None
+        self._write_pending(final=True)
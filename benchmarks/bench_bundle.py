@@ -0,0 +1,131 @@
+#
+# Compare the cost of building one bundle per frame with pyOSC `OSCBundle`
+# versus `oscpack.BundleEncoder`
+#
+# Usage: python benchmarks/bench_bundle.py [frames]
+#
+# The pyOSC path is only run when pyOSC is importable (it is Python 2 only).
+# Allocation peaks need `tracemalloc` (Python 3).
+#
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from oscpack import OSCAddressTable, BundleEncoder
+
+try:
+    import OSC
+except ImportError:
+    OSC = None
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+HANDS = (1, 2)
+FINGERS = (1, 2, 3, 4, 5)
+TIP = (12.5, 187.25, -30.0)
+DIRECTION = (0.1, 0.2, -0.97)
+
+
+def pyosc_frame(vector_as_args):
+    """
+    What `PyOSCBundledMixin` (the original `BundledMixin`) does per frame.
+    """
+    bundle = OSC.OSCBundle()
+
+    def send(name, val):
+        msg = OSC.OSCMessage(name)
+        msg.append(val)
+        bundle.append(msg)
+
+    def send_vector(base, vector):
+        if vector_as_args:
+            send("%sxyz" % base, vector)
+        else:
+            send("%sx" % base, vector[0])
+            send("%sy" % base, vector[1])
+            send("%sz" % base, vector[2])
+
+    for hand_id in HANDS:
+        hand_base = "/hand%d" % hand_id
+        for finger_id in FINGERS:
+            send_vector("%s/finger%d/t" % (hand_base, finger_id), TIP)
+            send_vector("%s/finger%d/d" % (hand_base, finger_id), DIRECTION)
+            send("%s/finger%d/extended" % (hand_base, finger_id), 1)
+        send_vector("%s/palm/t" % hand_base, TIP)
+        send_vector("%s/palm/d" % hand_base, DIRECTION)
+    if len(bundle.values()) > 0:
+        return bundle.getBinary()
+
+
+def encoder_frame(vector_as_args, table=OSCAddressTable(), encoder=BundleEncoder()):
+    """
+    What `BundledMixin` does per frame.
+    """
+    encoder.begin()
+    get = table.get
+
+    def send_vector(hand_id, finger_id, field, vector):
+        if vector_as_args:
+            t, = get(hand_id, finger_id, field, True)
+            encoder.add(t, vector[0], vector[1], vector[2])
+        else:
+            x, y, z = get(hand_id, finger_id, field)
+            encoder.add(x, vector[0])
+            encoder.add(y, vector[1])
+            encoder.add(z, vector[2])
+
+    for hand_id in HANDS:
+        for finger_id in FINGERS:
+            send_vector(hand_id, finger_id, 't', TIP)
+            send_vector(hand_id, finger_id, 'd', DIRECTION)
+            t, = get(hand_id, finger_id, 'extended')
+            encoder.add(t, 1)
+        send_vector(hand_id, None, 't', TIP)
+        send_vector(hand_id, None, 'd', DIRECTION)
+    if len(encoder) > 0:
+        return encoder.getvalue()
+
+
+def peak_allocated(fn, vector_as_args):
+    """
+    Peak bytes allocated (and not yet freed) while encoding one frame.
+    """
+    if tracemalloc is None:
+        return None
+    fn(vector_as_args) # warm caches
+    tracemalloc.start()
+    current, _ = tracemalloc.get_traced_memory()
+    fn(vector_as_args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - current
+
+
+def main(frames=2000):
+    paths = [('encoder', encoder_frame)]
+    if OSC is not None:
+        paths.insert(0, ('pyosc', pyosc_frame))
+
+    for vector_as_args in (False, True):
+        mode = "vector-as-args" if vector_as_args else "single-arg"
+        if OSC is not None:
+            same = pyosc_frame(vector_as_args) == \
+                        encoder_frame(vector_as_args).tobytes()
+            print("%s: byte-identical bundles: %s" % (mode, same))
+        for name, fn in paths:
+            secs = min(timeit.repeat(lambda: fn(vector_as_args),
+                                repeat=3, number=frames)) / frames
+            peak = peak_allocated(fn, vector_as_args)
+            print("%s: %-8s %8.1f us/frame  peak allocated: %s" % (mode, name,
+                    secs * 1e6, "n/a" if peak is None else "%d bytes" % peak))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
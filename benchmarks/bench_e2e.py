@@ -0,0 +1,173 @@
+#
+# End-to-end throughput of each listener composition `main()` can build,
+# fed synthetic frames (benchmarks/synthetic/Leap.py) as fast as they can
+# be handled and sending to a local UDP sink.
+#
+# Usage: python benchmarks/bench_e2e.py [frames] [host:port]
+#
+# With host:port, sends there instead (e.g. to `python3 test_server.py -k`,
+# which reports what actually arrived) numbering the bundles as
+# client.py --sequence does, so the receiver can count packets lost.
+#
+# Needs pyOSC but not the Leap SDK. Latency is from the frame being handed
+# to `on_frame` until `on_frame` returns (everything is sent by then.)
+# CPU time is the calling thread's where the platform can tell, otherwise
+# the whole process' (including the sink thread.)
+#
+
+import os
+import sys
+import socket
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, 'synthetic'))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+import Leap
+import client
+
+
+cpu_time = getattr(time, 'thread_time', None) or \
+                getattr(time, 'process_time', None) or time.clock
+
+
+# (name, client.py options); the listener is built from them just as
+# `main()` does (see `client.PIPELINE`)
+COMPOSITIONS = [
+    ('default', []),
+    ('multi-arg', ['--multi-arg-vector']),
+    ('dumb', ['--dumb']),
+    ('unbundled', ['--unbundled']),
+    ('dumb unbundled', ['--dumb', '--unbundled']),
+    ('multi-arg dumb unbundled', ['--multi-arg-vector', '--dumb',
+                                '--unbundled']),
+    ('pyosc bundles', ['--pyosc-bundles']),
+    ('delta', ['--delta']),
+    ('blob', ['--blob', 'float32']),
+    # The cost of `--instrument`
+    ('default instrumented', ['--instrument']),
+    ('unbundled instrumented', ['--instrument', '--unbundled']),
+    # The cost of `--adaptive`, while it's keeping up
+    ('default adaptive', ['--adaptive']),
+]
+
+if client.OneEuroFilter is not None: # Needs NumPy
+    COMPOSITIONS.append(('default smoothed', ['--smooth']))
+    COMPOSITIONS.append(('default all metrics', ['--metric', 'velocity',
+                            '--metric', 'pinch', '--metric', 'spread',
+                            '--metric', 'extended']))
+
+SCENARIOS = [
+    ('2 hands', dict(hands=2)),
+    ('2 hands churning', dict(hands=2, motion=Leap.JITTER, churn=0.01,
+                                dropout=0.01)),
+    ('4 hands', dict(hands=4)),
+]
+
+
+class UDPSink(threading.Thread):
+    """
+    Receives (and counts) everything sent to it.
+    """
+
+    def __init__(self):
+        super(UDPSink, self).__init__(name="bench-sink")
+        self.daemon = True
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)
+        self.socket.bind(('127.0.0.1', 0))
+        self.socket.settimeout(0.2)
+        self.port = self.socket.getsockname()[1]
+        self.datagrams = 0
+        self.bytes = 0
+        self.last_received = time.time()
+        self._stopped = threading.Event()
+
+    def run(self):
+        buf = bytearray(65536)
+        while not self._stopped.is_set():
+            try:
+                size = self.socket.recv_into(buf)
+            except socket.timeout:
+                continue
+            self.datagrams += 1
+            self.bytes += size
+            self.last_received = time.time()
+
+    def drain(self, quiet=0.2):
+        while time.time() - self.last_received < quiet:
+            time.sleep(quiet / 4)
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        self.socket.close()
+
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100.0))]
+
+
+def run(args, scenario, frames, remote=None):
+    if remote is None:
+        sink = UDPSink()
+        sink.start()
+        hostname, port = '127.0.0.1', sink.port
+    else:
+        sink = None
+        hostname, port = remote
+        args = list(args) + ['--sequence']
+    options, _ = client.make_parser().parse_args(args)
+    listener = client.make_listener(options, hostname, port)
+    controller = Leap.Controller(Leap.SyntheticFrames(**scenario))
+    controller.add_listener(listener)
+
+    generate = controller.frames.next_frame
+    on_frame = listener.on_frame
+    latencies = []
+    cpu = 0.0
+    started = time.time()
+    for _ in range(frames):
+        controller.current = generate()
+        t = time.time()
+        c = cpu_time()
+        on_frame(controller)
+        cpu += cpu_time() - c
+        latencies.append(time.time() - t)
+    elapsed = time.time() - started
+
+    if sink is not None:
+        sink.drain()
+    controller.remove_listener(listener)
+    if sink is not None:
+        sink.stop()
+    latencies.sort()
+    return dict(frames_per_sec=frames / elapsed,
+                messages_per_sec=listener.osc_messages_sent / elapsed,
+                bytes_per_sec=sink.bytes / elapsed if sink else None,
+                cpu_us=cpu * 1e6 / frames,
+                p50_us=percentile(latencies, 50) * 1e6,
+                p99_us=percentile(latencies, 99) * 1e6)
+
+
+def main(frames=3000, remote=None):
+    client.log = client.log_event = lambda *args, **kwargs: None
+    if remote is not None:
+        hostname, _, port = remote.rpartition(":")
+        remote = (hostname, int(port))
+    for scenario_name, scenario in SCENARIOS:
+        print("%s:" % scenario_name)
+        for name, args in COMPOSITIONS:
+            r = run(args, scenario, frames, remote)
+            print("  %-26s %7.0f frames/s %8.0f msgs/s %6s MB/s "
+                  "cpu %6.1f us/frame  latency p50 %6.1f us p99 %6.1f us" % (
+                    name, r['frames_per_sec'], r['messages_per_sec'],
+                    "%.2f" % (r['bytes_per_sec'] / 1e6)
+                        if r['bytes_per_sec'] is not None else "-",
+                    r['cpu_us'], r['p50_us'], r['p99_us']))
+
+
+if __name__ == "__main__":
+    main(*[int(a) if i == 0 else a for i, a in enumerate(sys.argv[1:])])
@@ -0,0 +1,74 @@
+#
+# Cost per frame of sending to several destinations with `FanOutMixin`
+# (encode once, cut filtered copies out of the encoding) compared with
+# running one listener per destination.
+#
+# Usage: python benchmarks/bench_fanout.py [frames]
+#
+# Needs pyOSC but not the Leap SDK. Destinations are unread local UDP sockets.
+#
+
+import os
+import sys
+import socket
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, 'synthetic'))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+import Leap
+import client
+from client import (OSCLeapListener, BundledMixin, RealPartTrackerMixin,
+                    FanOutMixin)
+from fanout import Destination
+
+
+FILTERS = [(), ('/hand*/palm',), ('/hand*/finger*/t*',), ('/hand1',)]
+
+
+def sink():
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.bind(('127.0.0.1', 0))
+    return s
+
+
+def listener(mixins, port, **kwargs):
+    class_ = type('BenchLeapListener', tuple(mixins) + (OSCLeapListener,), {})
+    return class_(hostname='127.0.0.1', port=port, **kwargs)
+
+
+def per_frame(listeners, frames):
+    controller = Leap.Controller(Leap.SyntheticFrames(hands=2))
+    handlers = [l.on_frame for l in listeners]
+
+    def run():
+        for _ in range(frames):
+            controller.current = controller.frames.next_frame()
+            for on_frame in handlers:
+                on_frame(controller)
+    return min(timeit.repeat(run, repeat=3, number=1)) / frames
+
+
+def main(frames=2000):
+    client.log = client.log_event = lambda *args, **kwargs: None
+    sinks = [sink() for _ in FILTERS]
+    ports = [s.getsockname()[1] for s in sinks]
+    default = [BundledMixin, RealPartTrackerMixin]
+
+    separate = [listener(default, port) for port in ports]
+    print("%d listeners, one per destination   %7.1f us/frame" % (
+                len(ports), per_frame(separate, frames) * 1e6))
+
+    for name, patterns in (("unfiltered", [()] * len(FILTERS)),
+                           ("filtered", FILTERS)):
+        destinations = [Destination('127.0.0.1', port, p)
+                        for port, p in zip(ports[1:], patterns[1:])]
+        fanout = listener(default + [FanOutMixin], ports[0],
+                        destinations=destinations)
+        print("1 listener, %d destinations %-10s %7.1f us/frame" % (
+                    len(ports), name, per_frame([fanout], frames) * 1e6))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
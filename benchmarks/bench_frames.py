@@ -0,0 +1,71 @@
+#
+# Compare per-scalar `pre_send_x/y/z` scaling against whole-frame NumPy
+# scaling (`FrameArrayMixin`) with 2 and 4 hands.
+#
+# Usage: python benchmarks/bench_frames.py [frames]
+#
+# Frames are sent (bundled) to an unread local UDP socket.
+#
+
+import os
+import sys
+import socket
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Falls back to the stand-in `Leap` module if the SDK isn't on the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'synthetic'))
+
+import client
+from client import (OSCLeapListener, BundledMixin, LinearScalingMixin,
+                    FrameArrayMixin)
+from scheduler import FingerState, HandState
+
+
+SCALING = dict(x_mm_min=-200, x_mm_max=200, y_mm_min=50, y_mm_max=450,
+                z_mm_min=-150, z_mm_max=150, clamp=True)
+
+
+class Frame(object):
+    def __init__(self, hands):
+        self.hands = hands
+
+
+def make_frame(hand_count):
+    hands = []
+    for h in range(1, hand_count + 1):
+        fingers = [FingerState(f, (h * 10.0 + f, 200.0 + f, -f * 3.0),
+                            (0.1, 0.2, -0.97), f % 2 == 0)
+                    for f in range(1, 6)]
+        hands.append(HandState(h, (h * 10.0, 180.0, 3.5), (0.0, -1.0, 0.0),
+                            fingers))
+    return Frame(hands)
+
+
+def make_listener(mixins, port):
+    listener_class = type('BenchListener', tuple(mixins) + (OSCLeapListener,), {})
+    return listener_class(hostname='127.0.0.1', port=port, **SCALING)
+
+
+def main(frames=2000):
+    client.log = client.log_event = lambda *args: None
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', 0))
+    port = sink.getsockname()[1]
+
+    paths = [
+        ('per-scalar', [BundledMixin, LinearScalingMixin]),
+        ('numpy', [FrameArrayMixin, BundledMixin, LinearScalingMixin]),
+    ]
+    for hand_count in (2, 4):
+        frame = make_frame(hand_count)
+        for name, mixins in paths:
+            listener = make_listener(mixins, port)
+            secs = min(timeit.repeat(lambda: listener.send_frame_data(frame),
+                                repeat=3, number=frames)) / frames
+            print("%d hands: %-10s %8.1f us/frame" % (hand_count, name,
+                                                    secs * 1e6))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,116 @@
+#
+# Measure tracker churn on a synthetic finger ID churn sequence, with and
+# without positional reassociation (`--reassociate-mm`).
+#
+# Usage: python benchmarks/bench_reassociate.py [frames]
+#
+
+import os
+import sys
+import math
+import random
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Falls back to the stand-in `Leap` module if the SDK isn't on the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'synthetic'))
+
+import client
+from client import RealHandTracker, RealFingerTracker
+from scheduler import FingerState, HandState
+
+
+class CountingFingerTracker(RealFingerTracker):
+    counts = None
+
+    def claim_next_real_number(self, real_part):
+        self.counts['created'] += 1
+        return super(CountingFingerTracker, self).claim_next_real_number(real_part)
+
+    def handle_old_part(self, real_part):
+        self.counts['zeroed'] += 1
+        return super(CountingFingerTracker, self).handle_old_part(real_part)
+
+
+class CountingHandTracker(RealHandTracker):
+
+    def __init__(self, counts, *args, **kwargs):
+        self.counts = counts
+        super(CountingHandTracker, self).__init__(*args, **kwargs)
+
+    def make_finger_tracker(self):
+        tracker = CountingFingerTracker(reassociate_mm=self.reassociate_mm)
+        tracker.counts = self.counts
+        return tracker
+
+
+class Frame(object):
+    def __init__(self, hands):
+        self.hands = hands
+
+
+def churn_sequence(frames, churn=0.05, dropout=0.02, seed=1):
+    """
+    Two slowly moving hands; each frame every finger may get a new Leap id
+    (`churn`) and/or briefly go missing (`dropout`).
+    """
+    rnd = random.Random(seed)
+    next_id = [100]
+    def new_id():
+        next_id[0] += 1
+        return next_id[0]
+    finger_ids = dict(((h, f), new_id()) for h in (1, 2) for f in range(5))
+    hidden = {}
+    sequence = []
+    for n in range(frames):
+        hands = []
+        for h in (1, 2):
+            x = h * 150.0 + 40 * math.sin(n / 50.0)
+            y = 200.0 + 20 * math.cos(n / 70.0)
+            fingers = []
+            for f in range(5):
+                key = (h, f)
+                if rnd.random() < churn:
+                    finger_ids[key] = new_id()
+                if hidden.get(key, 0) > 0:
+                    hidden[key] -= 1
+                    continue
+                if rnd.random() < dropout:
+                    hidden[key] = rnd.randint(1, 3)
+                tip = (x + f * 20 + rnd.gauss(0, 1), y + 60 + rnd.gauss(0, 1), 0.0)
+                fingers.append(FingerState(finger_ids[key], tip, (0.0, 1.0, 0.0),
+                                        True))
+            hands.append(HandState(h, (x, y, 0.0), (0.0, -1.0, 0.0), fingers))
+        sequence.append(Frame(hands))
+    return sequence
+
+
+def run(sequence, reassociate_mm):
+    counts = dict(created=0, zeroed=0, zeroed_part_frames=0)
+    tracker = CountingHandTracker(counts, reassociate_mm=reassociate_mm)
+    start = time.time()
+    for frame in sequence:
+        tracker.frame_tick(frame)
+        for hand in tracker.hands:
+            counts['zeroed_part_frames'] += len([f for f in hand.fingers
+                                                if f.zeroed])
+    counts['us_per_frame'] = (time.time() - start) * 1e6 / len(sequence)
+    counts['reassociated'] = sum(hand.finger_tracker.reassociated_count
+                                for hand in tracker.hands)
+    return counts
+
+
+def main(frames=5000):
+    client.log = client.log_event = lambda *args: None
+    sequence = churn_sequence(frames)
+    for reassociate_mm in (None, 20.0):
+        counts = run(sequence, reassociate_mm)
+        print("reassociate_mm=%-5s fingers created %5d, zeroed %5d, "
+              "zeroed finger-frames %6d, reassociated %5d, %6.1f us/frame" % (
+                    reassociate_mm, counts['created'], counts['zeroed'],
+                    counts['zeroed_part_frames'], counts['reassociated'],
+                    counts['us_per_frame']))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,142 @@
+#
+# Count the reads which cross into the Leap SDK per frame when the sent
+# fields are read straight off the raw parts (as the dumb listener does, and
+# as the proxying `RealPart` used to), versus read off the tracked parts,
+# which copy them out once per frame.
+#
+# Usage: python benchmarks/bench_records.py [frames]
+#
+# The raw parts are stand-ins which count every attribute and item read.
+# Allocation peaks need `tracemalloc` (Python 3).
+#
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Falls back to the stand-in `Leap` module if the SDK isn't on the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'synthetic'))
+
+import client
+from client import RealHandTracker
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+CROSSINGS = [0]
+
+
+class RawVector(object):
+    def __init__(self, x, y, z):
+        self._values = (x, y, z)
+
+    def __getitem__(self, i):
+        CROSSINGS[0] += 1
+        return self._values[i]
+
+    def to_tuple(self):
+        CROSSINGS[0] += 1
+        return self._values
+
+
+class RawPart(object):
+    """
+    Stands in for a SWIG wrapped `Leap.Hand` or `Leap.Finger`.
+    """
+
+    def __init__(self, **fields):
+        self._fields = fields
+
+    def __getattr__(self, key):
+        try:
+            value = self.__dict__['_fields'][key]
+        except KeyError:
+            raise AttributeError(key)
+        CROSSINGS[0] += 1
+        return value
+
+
+class Frame(object):
+    def __init__(self, hands):
+        self.hands = hands
+
+
+def make_frame(n, hand_count=2):
+    hands = []
+    for h in range(1, hand_count + 1):
+        fingers = [RawPart(id=h * 10 + f,
+                        tip_position=RawVector(h * 10.0 + f + n, 200.0, -f * 3.0),
+                        direction=RawVector(0.1, 0.2, -0.97),
+                        is_extended=f % 2 == 0)
+                    for f in range(1, 6)]
+        hands.append(RawPart(id=h, palm_position=RawVector(h * 10.0 + n, 180.0, 3.5),
+                        palm_normal=RawVector(0.0, -1.0, 0.0), fingers=fingers))
+    return Frame(hands)
+
+
+def read_fields(hands):
+    """
+    Read every field that is sent for a frame, the way `send_frame_data` does.
+    """
+    values = []
+    add = values.append
+    for hand in hands:
+        add(hand.id)
+        for vector in (hand.palm_position, hand.palm_normal):
+            add((vector[0], vector[1], vector[2]))
+        for finger in hand.fingers:
+            add(finger.id)
+            for vector in (finger.tip_position, finger.direction):
+                add((vector[0], vector[1], vector[2]))
+            add(finger.is_extended)
+    return values
+
+
+def raw_frame(frame, tracker):
+    return read_fields(frame.hands)
+
+
+def tracked_frame(frame, tracker):
+    tracker.frame_tick(frame)
+    return read_fields(tracker.hands)
+
+
+def peak_allocated(fn, frames, tracker):
+    if tracemalloc is None:
+        return None
+    fn(frames[0], tracker) # warm up
+    tracemalloc.start()
+    current, _ = tracemalloc.get_traced_memory()
+    for frame in frames:
+        fn(frame, tracker)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - current
+
+
+def main(frames=2000):
+    client.log = client.log_event = lambda *args: None
+    sequence = [make_frame(n) for n in range(100)]
+    for name, fn in (('raw', raw_frame), ('tracked', tracked_frame)):
+        tracker = RealHandTracker()
+        CROSSINGS[0] = 0
+        for frame in sequence:
+            fn(frame, tracker)
+        crossings = CROSSINGS[0] / float(len(sequence))
+
+        def run():
+            for i in range(frames):
+                fn(sequence[i % len(sequence)], tracker)
+        secs = min(timeit.repeat(run, repeat=3, number=1)) / frames
+        peak = peak_allocated(fn, sequence, tracker)
+        print("%-8s %6.1f SDK reads/frame %8.1f us/frame  peak allocated: %s" % (
+                name, crossings, secs * 1e6,
+                "n/a" if peak is None else "%d bytes" % peak))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
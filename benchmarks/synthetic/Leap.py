@@ -0,0 +1,218 @@
+#
+#
+# Leapyosc
+# Stand-in for the Leap SDK's `Leap` module, generating synthetic frames
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+# Only what leapyosc uses is here. Put this folder on the path in place of
+# `../Leap_SDK/lib/` to run `client.py` (or the benchmarks) without the
+# SDK or a controller:
+#
+#   PYTHONPATH=benchmarks/synthetic python client.py --replay ...
+#
+
+import math
+import random
+
+
+class Vector(object):
+
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def __getitem__(self, i):
+        return (self.x, self.y, self.z)[i]
+
+    def to_tuple(self):
+        return (self.x, self.y, self.z)
+
+
+class Finger(object):
+
+    TYPE_THUMB = 0
+    TYPE_INDEX = 1
+    TYPE_MIDDLE = 2
+    TYPE_RING = 3
+    TYPE_PINKY = 4
+
+    __slots__ = ('id', 'tip_position', 'direction', 'is_extended', 'type')
+
+    def __init__(self, id, tip_position, direction, is_extended, type=0):
+        self.id = id
+        self.tip_position = tip_position
+        self.direction = direction
+        self.is_extended = is_extended
+        self.type = type
+
+
+class Hand(object):
+
+    __slots__ = ('id', 'palm_position', 'palm_normal', 'fingers')
+
+    def __init__(self, id, palm_position, palm_normal, fingers):
+        self.id = id
+        self.palm_position = palm_position
+        self.palm_normal = palm_normal
+        self.fingers = fingers
+
+
+class Frame(object):
+
+    __slots__ = ('id', 'timestamp', 'hands')
+
+    def __init__(self, id, timestamp, hands):
+        self.id = id
+        self.timestamp = timestamp
+        self.hands = hands
+
+
+STILL = 'still'
+ORBIT = 'orbit'
+JITTER = 'jitter'
+
+MOTIONS = (STILL, ORBIT, JITTER)
+
+
+class SyntheticFrames(object):
+    """
+    Generates plausible Leap frames.
+
+    - `hands` hands with `fingers` fingers each, spread out along x
+    - `motion`: hands are `still`, `orbit` in slow circles, or `jitter`
+        (random walk with tracking noise)
+    - `churn`: the chance, each frame, of any one part being given a new
+        Leap id (as the Leap does when it loses track of a part)
+    - `dropout`: the chance, each frame, of a finger going missing for
+        a few frames
+    - `rate`: frames per second (sets the timestamps)
+    """
+
+    def __init__(self, hands=2, fingers=5, motion=ORBIT, churn=0.0,
+                    dropout=0.0, rate=120.0, seed=1):
+        if motion not in MOTIONS:
+            raise ValueError("Unknown motion '%s'" % motion)
+        self.hand_count = hands
+        self.finger_count = fingers
+        self.motion = motion
+        self.churn = churn
+        self.dropout = dropout
+        self.interval = int(1e6 / rate)
+        self.random = random.Random(seed)
+        self.frame_id = 0
+        self._last_id = 0
+        self._ids = {}
+        self._hidden = {}
+        self._walk = dict((h, (0.0, 0.0, 0.0)) for h in range(hands))
+
+    def _id(self, key):
+        if key not in self._ids or self.random.random() < self.churn:
+            self._last_id += 1
+            self._ids[key] = self._last_id
+        return self._ids[key]
+
+    def _palm(self, h, n):
+        x = (h - (self.hand_count - 1) / 2.0) * 150.0
+        y = 200.0
+        z = 0.0
+        if self.motion == ORBIT:
+            angle = n / 60.0 + h
+            x += 60.0 * math.cos(angle)
+            y += 40.0 * math.sin(angle)
+            z += 30.0 * math.sin(angle / 2.0)
+        elif self.motion == JITTER:
+            gauss = self.random.gauss
+            wx, wy, wz = self._walk[h]
+            wx, wy, wz = wx + gauss(0, 2), wy + gauss(0, 2), wz + gauss(0, 2)
+            self._walk[h] = (wx, wy, wz)
+            x, y, z = x + wx + gauss(0, 0.5), y + wy + gauss(0, 0.5), z + wz
+        return x, y, z
+
+    def next_frame(self):
+        self.frame_id += 1
+        n = self.frame_id
+        hands = []
+        for h in range(self.hand_count):
+            x, y, z = self._palm(h, n)
+            fingers = []
+            for f in range(self.finger_count):
+                key = (h, f)
+                if self._hidden.get(key, 0) > 0:
+                    self._hidden[key] -= 1
+                    continue
+                if self.dropout and self.random.random() < self.dropout:
+                    self._hidden[key] = self.random.randint(1, 3)
+                    continue
+                spread = (f - (self.finger_count - 1) / 2.0) * 20.0
+                fingers.append(Finger(self._id(key),
+                                Vector(x + spread, y + 60.0 + f % 2 * 10.0, z - 20.0),
+                                Vector(spread / 100.0, 0.4, -0.9),
+                                f != 0 or n % 100 < 50, f % 5))
+            hands.append(Hand(self._id(h), Vector(x, y, z),
+                            Vector(0.0, -1.0, 0.0), fingers))
+        return Frame(n, n * self.interval, hands)
+
+    def frames(self, count):
+        for _ in range(count):
+            yield self.next_frame()
+
+
+class Listener(object):
+
+    def on_init(self, controller):
+        pass
+
+    def on_connect(self, controller):
+        pass
+
+    def on_disconnect(self, controller):
+        pass
+
+    def on_exit(self, controller):
+        pass
+
+    def on_frame(self, controller):
+        pass
+
+
+class Controller(object):
+    """
+    Hands its listeners synthetic frames, one per `step`. (Unlike the real
+    controller, nothing happens unless `step` is called.)
+    """
+
+    POLICY_BACKGROUND_FRAMES = 1
+
+    def __init__(self, frames=None):
+        self.frames = frames or SyntheticFrames()
+        self.listeners = []
+        self.current = Frame(0, 0, [])
+
+    def set_policy(self, policy):
+        pass
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+        listener.on_init(self)
+        listener.on_connect(self)
+        return True
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+        listener.on_disconnect(self)
+        listener.on_exit(self)
+        return True
+
+    def frame(self, history=0):
+        return self.current
+
+    def step(self):
+        self.current = self.frames.next_frame()
+        for listener in self.listeners:
+            listener.on_frame(self)
+        return self.current
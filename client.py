@@ -10,12 +10,46 @@
 
 import Leap
 import sys
+import math
+import heapq
+import time
+import socket
+import struct
+import multiprocessing
 import OSC
 from OSC import OSCClient, OSCMessage, OSCBundle
-from collections import defaultdict
-from datetime import datetime, timedelta
-from itertools import count
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from datetime import timedelta
+from oscpack import (OSCAddressTable, BundleEncoder, IndexedBundleEncoder,
+                    MessageTemplate, encode_message, decode_message,
+                    split_bundle, prepend_message, as_bytes, BUNDLE_HEADER,
+                    IMMEDIATELY)
+from pipeline import FrameRing, SenderThread, DROP_OLDEST, OVERFLOW_POLICIES
+from scheduler import (HandStateBuffer, FixedRateTimer, ResampledFrame,
+                        HandState, INTERPOLATE, RESAMPLE_MODES)
+from serializer import FrameSerializer, FrameReader, ReplayController
+from shmring import SharedFrameRing, SharedRingController
+from fanout import FanOut, Destination, AddressFilter
+from frameblob import FrameBlobEncoder, FLOAT32, BLOB_FORMATS
+from timetags import LeapTimeMapper, to_timetag
+from instrument import Instruments, now_ns, FETCH, TRACK, ENCODE, LATENCY
+from asynclog import AsyncLog, DEBUG as VERBOSE, INFO
+from quality import (QualityController, QUALITY_LEVELS, NO_FINGER_DIRECTIONS,
+                    VECTOR_ARGS, COARSE, HALF_RATE)
+from rates import RateSchedule
+
+try:
+    from frames import FrameArray, LinearScaling
+    from matching import match_nearest
+    from smoothing import OneEuroFilter
+    from metrics import (HandMetrics, METRICS, PART_FIELDS, HAND_FIELDS,
+                        VELOCITY)
+except ImportError: # NumPy is only needed for `FrameArrayMixin`, reassociation,
+                    # smoothing and metrics
+    FrameArray = None
+    match_nearest = None
+    OneEuroFilter = None
+    HandMetrics = None
 
 LeapListener = Leap.Listener
 
@@ -24,14 +58,47 @@ from optparse import OptionParser
 
 DEBUG = True
 
-def log(m, newline=False):
+# Written to stderr by a background thread; see asynclog.py
+LOG = AsyncLog()
+
+def log(m, newline=False, level=INFO):
     x = ("%s\n" % m) if newline else str(m)
-    sys.stderr.write(x)
-    sys.stderr.flush()
+    LOG.write(x, level)
+
+def log_event(action, noun, detail=None):
+    """
+    Log something which can happen over and over, e.g. a finger being
+    zeroed; counted and logged once a second (and `detail` each time,
+    with --verbose.)
+    """
+    LOG.event(action, noun, detail)
+
 
+# Shared by every zeroed part; never mutated
+ZERO_VECTOR = (0.0, 0.0, 0.0)
 
-def ZERO():
-    return Leap.Vector(0.0,0.0,0.0)
+def to_tuple(vector):
+    try:
+        return vector.to_tuple()
+    except AttributeError: # Already a tuple (or list)
+        return (vector[0], vector[1], vector[2])
+
+def defined_by(obj, name):
+    """
+    The class in `obj`'s inheritance chain whose `name` it gets
+    """
+    for class_ in type(obj).__mro__:
+        if name in vars(class_):
+            return class_
+    return None
+
+def frame_seconds(frame):
+    """
+    When a Leap frame (or `ResampledFrame`) was captured, in seconds
+    """
+    if isinstance(frame, ResampledFrame):
+        return frame.timestamp
+    return frame.timestamp / 1e6
 
 ###############################
 ###
@@ -42,15 +109,22 @@ def ZERO():
 class RealPart(object):
     """
     Abstract class which is the base for the RealFinger and RealHand object
+
+    The fields which are sent over OSC are copied out of the raw Leap part
+    the first time they're read each frame (after `update_raw`), so reading
+    them again doesn't go back through the Leap SDK, and fields which
+    aren't sent (e.g. not subscribed to) aren't read at all. Anything else
+    is still looked up on the raw part.
     """
 
-    NOT_PROXIED = set(['_raw_part','zeroed','tracker','last_seen_frame',
-                    'fingers','finger_tracker','update_raw'])
+    __slots__ = ('_raw_part', 'leap_id', 'zeroed', 'tracker', 'last_seen_frame',
+                    'real_number')
 
     def __init__(self, part, tracker):
-        self._raw_part = part
         self.zeroed = False
         self.tracker = tracker
+        self.real_number = None
+        self.update_raw(part)
         self.tracker.claim_next_real_number(self)
         self.last_seen_frame = None
         self.mark_seen()
@@ -60,23 +134,24 @@ class RealPart(object):
 
     def update_raw(self, raw_part):
         self._raw_part = raw_part
+        self.leap_id = raw_part.id
 
     @property
     def id(self):
-        return self.tracker.get_real_number(self._raw_part)
+        return self.real_number
 
     @property
-    def leap_id(self):
-        return self._raw_part.id
+    def last_position(self):
+        """
+        Where the part was last seen (even if it has since been zeroed)
+        """
+        raise NotImplementedError
 
     def __getattr__(self, key):
+        if key == '_raw_part':
+            raise AttributeError(key)
         return getattr(self._raw_part, key)
 
-    def __setattr__(self, key, value):
-        if key in self.NOT_PROXIED:
-            return object.__setattr__(self,key,value)
-        return setattr(self._raw_part, key, value)
-
     def mark_seen(self):
         self.zeroed = False
         self.last_seen_frame = self.tracker.frame_count
@@ -88,17 +163,40 @@ class RealFinger(RealPart):
     while creating sane finger IDs.
     """
 
+    __slots__ = ('_tip_position', '_direction', '_is_extended')
+
+    def update_raw(self, raw_part):
+        super(RealFinger, self).update_raw(raw_part)
+        # Read when first asked for
+        self._tip_position = None
+        self._direction = None
+        self._is_extended = None
+
     @property
     def tip_position(self):
-        return ZERO() if self.zeroed else self._raw_part.tip_position
+        return ZERO_VECTOR if self.zeroed else self.last_position
 
     @property
     def direction(self):
-        return ZERO() if self.zeroed else self._raw_part.direction
+        if self.zeroed:
+            return ZERO_VECTOR
+        if self._direction is None:
+            self._direction = to_tuple(self._raw_part.direction)
+        return self._direction
 
     @property
     def is_extended(self):
-        return false if self.zeroed else self._raw_part.is_extended
+        if self.zeroed:
+            return False
+        if self._is_extended is None:
+            self._is_extended = bool(self._raw_part.is_extended)
+        return self._is_extended
+
+    @property
+    def last_position(self):
+        if self._tip_position is None:
+            self._tip_position = to_tuple(self._raw_part.tip_position)
+        return self._tip_position
 
     def __str__(self):
         return "<Finger%s>" % self.id
@@ -111,11 +209,19 @@ class RealHand(RealPart):
     while creating sane finger IDs.
     """
 
+    __slots__ = ('_palm_position', '_palm_normal', 'finger_tracker', 'fingers')
+
     def __init__(self, part, tracker, *args, **kwargs):
         super(RealHand, self).__init__(part, tracker, *args, **kwargs)
-        self.finger_tracker = RealFingerTracker()
+        self.finger_tracker = tracker.make_finger_tracker()
         self.fingers = self.FingerContainer(self)
 
+    def update_raw(self, raw_part):
+        super(RealHand, self).update_raw(raw_part)
+        # Read when first asked for
+        self._palm_position = None
+        self._palm_normal = None
+
     def __str__(self):
         def apply_(f):
             if f:
@@ -151,11 +257,21 @@ class RealHand(RealPart):
 
     @property
     def palm_position(self):
-        return ZERO() if self.zeroed else self._raw_part.palm_position
+        return ZERO_VECTOR if self.zeroed else self.last_position
 
     @property
     def palm_normal(self):
-        return ZERO() if self.zeroed else self._raw_part.palm_normal
+        if self.zeroed:
+            return ZERO_VECTOR
+        if self._palm_normal is None:
+            self._palm_normal = to_tuple(self._raw_part.palm_normal)
+        return self._palm_normal
+
+    @property
+    def last_position(self):
+        if self._palm_position is None:
+            self._palm_position = to_tuple(self._raw_part.palm_position)
+        return self._palm_position
 
     @property
     def __fingers(self):
@@ -167,18 +283,36 @@ class RealHand(RealPart):
 class RealPartTracker(object):
     """
     Ensures a consistent id numbering system for the body part
+
+    Real numbers are handed out lowest first (starting at 1) from a min-heap
+    of the numbers which are free or belong to zeroed parts. Live and zeroed
+    parts are each kept in the order they were last seen, so each frame only
+    the parts actually due to be zeroed or dropped are looked at.
+
+    With `reassociate_mm` set, a raw part with an unknown Leap id is first
+    matched (by position, see `reassociate`) against the parts which weren't
+    seen this frame, before it is treated as a new part.
     """
 
     RealPart = None # Class
+    position_attribute = None # Compared when reassociating
 
-    def __init__(self, part_miss_count=5):
+    def __init__(self, part_miss_count=5, reassociate_mm=None):
+        if reassociate_mm is not None and match_nearest is None:
+            raise ImportError("Reassociating parts requires NumPy")
         self._real_parts = {}
         self._by_leap_id = {}
         self.part_miss_count = part_miss_count
+        self.reassociate_mm = reassociate_mm
+        self.reassociated_count = 0
         self.frame_count = 0
 
-
-        self._new_raw_parts = {}
+        # Real numbers which may be claimed (stale entries are skipped)
+        self._free_numbers = []
+        self._top_number = 0
+        # real number -> part; least recently seen first
+        self._live_parts = OrderedDict()
+        self._zeroed_parts = OrderedDict()
 
     #def __str__(self):
     #    def _(x):
@@ -187,7 +321,7 @@ class RealPartTracker(object):
     #                        (self.part_name, _(0),_(1),_(2),_(3),_(4),_(5))
 
     def __len__(self):
-        return len([x for x in self.get_real_parts() if not x.zeroed])
+        return len(self._live_parts)
 
     def get_raw_parts(self, raw_parent):
         raise NotImplementedError
@@ -205,14 +339,21 @@ class RealPartTracker(object):
 
     def handle_old_part(self, real_part):
         # Zero out the old hand
-        log("Zeroing lost %s:%s\n" % (self.__class__.__name__, real_part.id) )
+        log_event("Zeroed", "lost %s" % self.part_name, "Zeroing lost %s:%s\n" %
+                        (self.__class__.__name__, real_part.id))
         real_part.zeroed = True
+        del self._live_parts[real_part.id]
+        self._zeroed_parts[real_part.id] = real_part
+        self.release_real_number(real_part.id)
 
     def handle_really_old_part(self, real_part):
         # Completely remove the real hand from our tracking
-        log("Drop lost %s:%s\n" % (self.__class__.__name__, real_part.id) )
+        log_event("Dropped", "lost %s" % self.part_name, "Drop lost %s:%s\n" %
+                        (self.__class__.__name__, real_part.id))
+        del self._zeroed_parts[real_part.id]
         del self._real_parts[real_part.id]
         del self._by_leap_id[real_part.leap_id]
+        self.release_real_number(real_part.id)
 
     def handle_parent_tick(self, raw_parent):
 
@@ -221,16 +362,32 @@ class RealPartTracker(object):
 
         self.frame_count += 1
 
-        # Deal with old hands
-        for real_part in self._real_parts.values():
-            if self.is_old_part(real_part):
-                self.handle_old_part(real_part)
-            if self.is_really_old_part(real_part):
-                # This real hand data is really old! Purge it!
-                self.handle_really_old_part(real_part)
+        # Deal with old hands; oldest first, stopping at the first which isn't
+        live_parts = self._live_parts
+        while live_parts:
+            real_part = live_parts[next(iter(live_parts))]
+            if not self.is_old_part(real_part):
+                break
+            self.handle_old_part(real_part)
+
+        zeroed_parts = self._zeroed_parts
+        while zeroed_parts:
+            real_part = zeroed_parts[next(iter(zeroed_parts))]
+            if not self.is_really_old_part(real_part):
+                break
+            # This real hand data is really old! Purge it!
+            self.handle_really_old_part(real_part)
 
-        for raw_part in self.get_raw_parts(raw_parent):
-            self.handle_raw_part(raw_part)
+        if self.reassociate_mm is None:
+            for raw_part in self.get_raw_parts(raw_parent):
+                if self.handle_raw_part(raw_part) is None:
+                    self.RealPart(raw_part, tracker=self)
+        else:
+            unknown_raw_parts = [raw_part
+                        for raw_part in self.get_raw_parts(raw_parent)
+                        if self.handle_raw_part(raw_part) is None]
+            for raw_part in self.reassociate(unknown_raw_parts):
+                self.RealPart(raw_part, tracker=self)
 
 
     def handle_raw_part(self, raw_part):
@@ -242,45 +399,107 @@ class RealPartTracker(object):
 
         real_part = self.get_real_part(raw_part)
         if real_part:
-            real_part.mark_seen()
+            self.mark_part_seen(real_part)
             real_part.update_raw(raw_part)
+        return real_part
+
+    def reassociate(self, raw_parts):
+        """
+        Give raw parts with new Leap ids to the nearest (within
+        `reassociate_mm`) parts not seen this frame, as if their Leap ids
+        hadn't changed. Returns the raw parts left unmatched.
+        """
+        if not raw_parts:
+            return raw_parts
+        lost_parts = [real_part for real_part in self._real_parts.values()
+                        if real_part.last_seen_frame < self.frame_count]
+        if not lost_parts:
+            return raw_parts
+
+        attribute = self.position_attribute
+        pairs = match_nearest(
+                    [to_tuple(getattr(raw_part, attribute))
+                                for raw_part in raw_parts],
+                    [real_part.last_position for real_part in lost_parts],
+                    self.reassociate_mm)
+        for i, j in pairs:
+            self.reassign_part(lost_parts[j], raw_parts[i])
+        matched = set(i for i, j in pairs)
+        return [raw_part for i, raw_part in enumerate(raw_parts)
+                        if i not in matched]
+
+    def reassign_part(self, real_part, raw_part):
+        real_num = real_part.id
+        if self._by_leap_id.get(real_part.leap_id) == real_num:
+            del self._by_leap_id[real_part.leap_id]
+        self._by_leap_id[raw_part.id] = real_num
+        self.mark_part_seen(real_part)
+        real_part.update_raw(raw_part)
+        self.reassociated_count += 1
+
+    def mark_part_seen(self, real_part):
+        real_num = real_part.id
+        if real_part.zeroed:
+            del self._zeroed_parts[real_num]
         else:
-            real_part = self.RealPart(raw_part, tracker=self)
-            
+            del self._live_parts[real_num]
+        self._live_parts[real_num] = real_part
+        real_part.mark_seen()
+
+    def is_free_number(self, real_num):
+        real_part = self._real_parts.get(real_num)
+        return real_part is None or real_part.zeroed
+
+    def release_real_number(self, real_num):
+        free = self._free_numbers
+        heapq.heappush(free, real_num)
+        # Parts which flicker in and out leave stale numbers behind
+        if len(free) > 2 * (len(self._real_parts) + 4):
+            free[:] = [n for n in set(free) if self.is_free_number(n)]
+            heapq.heapify(free)
 
     def claim_next_real_number(self, real_part):
+        free = self._free_numbers
         real_num = None
-        for i in count(1):
-            existing_real_part = self._real_parts.get(i)
-            if existing_real_part:
-                if existing_real_part.zeroed:
-                    real_num = i
-                    break
-            else:
-                real_num = i
+        while free:
+            n = heapq.heappop(free)
+            if self.is_free_number(n):
+                real_num = n
                 break
-
-        if real_num:
-            self._real_parts[real_num] = real_part
-            self._by_leap_id[real_part.leap_id] = real_num
+        if real_num is None:
+            self._top_number += 1
+            real_num = self._top_number
+
+        zeroed_part = self._real_parts.get(real_num)
+        if zeroed_part is not None:
+            # Take over the zeroed part's number; the zeroed part is forgotten
+            del self._zeroed_parts[real_num]
+            if self._by_leap_id.get(zeroed_part.leap_id) == real_num:
+                del self._by_leap_id[zeroed_part.leap_id]
+
+        real_part.real_number = real_num
+        self._real_parts[real_num] = real_part
+        self._by_leap_id[real_part.leap_id] = real_num
+        self._live_parts[real_num] = real_part
 
     def get_real_parts_or_none(self):
-        real_part_count = len(self._real_parts)
-        r_counter = 0
-        for i in count(1):
-            if r_counter == real_part_count:
-                raise StopIteration
-            r = self._real_parts.get(i)
-            r_counter += 1
-            yield r
+        if not self._real_parts:
+            return []
+        get = self._real_parts.get
+        return [get(i) for i in range(1, max(self._real_parts) + 1)]
 
     def get_real_parts(self):
-        return filter(None, self.get_real_parts_or_none())
+        real_parts = self._real_parts
+        return [real_parts[i] for i in sorted(real_parts)]
 
 
 class RealHandTracker(RealPartTracker):
     part_name = "hand"
     RealPart = RealHand
+    position_attribute = "palm_position"
+
+    def make_finger_tracker(self):
+        return RealFingerTracker(reassociate_mm=self.reassociate_mm)
 
     def get_raw_parts(self, raw_parent): # Frame is parent
         return raw_parent.hands
@@ -305,6 +524,7 @@ class RealHandTracker(RealPartTracker):
 class RealFingerTracker(RealPartTracker):
     part_name = "finger"
     RealPart = RealFinger
+    position_attribute = "tip_position"
 
     def get_real_number(self, raw_part):
         return self._by_leap_id.get(raw_part.id)
@@ -339,6 +559,52 @@ class BaseLeapListener(LeapListener):
         log("Disconnected from Leap\n")
 
 
+class SharedRingWriterListener(BaseLeapListener):
+    """
+    Only copies each Leap frame into a `SharedFrameRing`, for the worker
+    process to track, encode and send (see `--processes`.)
+    """
+
+    def __init__(self, ring):
+        self.ring = ring
+        super(SharedRingWriterListener,self).__init__()
+
+    def on_frame(self, controller):
+        self.ring.put(controller.frame())
+
+    def on_exit(self, controller):
+        self.ring.close()
+
+
+class PackedMessage(OSCMessage):
+    """
+    An already encoded OSC message which pyOSC can send or bundle as-is.
+    """
+
+    def __init__(self, binary):
+        self.binary = binary
+
+    def getBinary(self):
+        return self.binary
+
+
+class TimedOSCClient(OSCClient):
+    """
+    An `OSCClient` which records how long each send takes.
+    """
+
+    def __init__(self, instruments, *args, **kwargs):
+        super(TimedOSCClient, self).__init__(*args, **kwargs)
+        self.instruments = instruments
+
+    def send(self, msg, timeout=None):
+        start = now_ns()
+        try:
+            return super(TimedOSCClient, self).send(msg, timeout)
+        finally:
+            self.instruments.record_send(now_ns() - start)
+
+
 class OSCLeapListener(BaseLeapListener):
     """
     Convert Leap hand and finger data into OSC format and 
@@ -346,6 +612,13 @@ class OSCLeapListener(BaseLeapListener):
 
     """
 
+    # Whether vectors are sent as one message with three arguments
+    vector_as_args = False
+
+    # Fields sent for each finger and palm (see `part_fields`)
+    finger_fields = ('t', 'd', 'extended')
+    palm_fields = ('t', 'd')
+
     def __init__(self, *args, **kwargs):
         self.frame_count = 0
         self.osc_messages_sent = 0
@@ -361,9 +634,10 @@ class OSCLeapListener(BaseLeapListener):
         super(OSCLeapListener,self).__init__(*args,**kwargs)
 
         self.count_at_log = 0
-        self.time_at_log = datetime.now()
+        self.time_at_log = time.time()
         self.osc_messages_sent_at_log = 0
         self.previous_hands = defaultdict(list)
+        self.addresses = OSCAddressTable()
 
 
     def pre_send_x(self, val):
@@ -373,6 +647,21 @@ class OSCLeapListener(BaseLeapListener):
     def pre_send_z(self, val):
         return val
 
+    def transform_frame_array(self, frame_array):
+        """
+        Whole-frame counterpart of `pre_send_x/y/z`; used instead of them
+        by `FrameArrayMixin`.
+        """
+        pass
+
+    def specialize(self):
+        """
+        Called once the listener is built (see `make_listener`), before any
+        frames: mixins may replace per-value methods with more direct ones
+        which do the same for this particular composition.
+        """
+        pass
+
     def on_init(self, controller):
         self.send("/init")
         super(OSCLeapListener,self).on_init(controller)
@@ -397,6 +686,45 @@ class OSCLeapListener(BaseLeapListener):
         self.send("%sy" % base, self.pre_send_y(vector[1]))
         self.send("%sz" % base, self.pre_send_z(vector[2]))
 
+    def send_packed(self, template, *values):
+        r = self.client.send(PackedMessage(template.encode(*values)))
+        self.osc_messages_sent += 1
+        return r
+
+    def send_buffer(self, data, elements=None):
+        """
+        Send an already encoded OSC packet (a string or a buffer such
+        as a `memoryview`) straight to the client's socket.
+
+        For a bundle, `elements` may give the `(address, start, end)` of
+        each message in it (see `IndexedBundleEncoder`.)
+        """
+        try:
+            return self.client.socket.send(data)
+        except socket.error as e:
+            raise OSC.OSCClientError("while sending: %s" % str(e))
+
+    def send_part_vector(self, hand_id, finger_id, field, vector):
+        """
+        Send a hand/finger vector using the cached address templates
+        (see `OSCAddressTable`.)
+        """
+        templates = self.addresses.get(hand_id, finger_id, field,
+                                    self.vector_as_args)
+        if self.vector_as_args:
+            # Switched on for a while (see `AdaptiveQualityMixin`)
+            self.send_packed(templates[0], self.pre_send_x(vector[0]),
+                        self.pre_send_y(vector[1]), self.pre_send_z(vector[2]))
+            return
+        x, y, z = templates
+        self.send_packed(x, self.pre_send_x(vector[0]))
+        self.send_packed(y, self.pre_send_y(vector[1]))
+        self.send_packed(z, self.pre_send_z(vector[2]))
+
+    def send_part_value(self, hand_id, finger_id, field, value):
+        template, = self.addresses.get(hand_id, finger_id, field)
+        self.send_packed(template, value)
+
 
     def print_frame(self, frame):
         any_ = False
@@ -409,59 +737,98 @@ class OSCLeapListener(BaseLeapListener):
             log("No hands detected.\n")
 
 
-    def do_stats(self):
-        time_diff = datetime.now() - self.time_at_log
-        #log(time_diff)
-        if time_diff >= timedelta(seconds=1):
-            log("Saw %s frames; Sent %4s messages in %s.\n" % 
-                        (self.frame_count - self.count_at_log,
+    def format_stats(self, time_diff):
+        return "Saw %s frames; Sent %4s messages in %s" % (
+                        self.frame_count - self.count_at_log,
                         self.osc_messages_sent - self.osc_messages_sent_at_log,
-                        time_diff))
-            self.count_at_log = self.frame_count
-            self.time_at_log = datetime.now()
-            self.osc_messages_sent_at_log = self.osc_messages_sent
+                        time_diff)
+
+    def mark_stats(self):
+        self.count_at_log = self.frame_count
+        self.time_at_log = time.time()
+        self.osc_messages_sent_at_log = self.osc_messages_sent
+
+    def do_stats(self):
+        seconds = time.time() - self.time_at_log
+        if seconds >= 1:
+            log("%s.\n" % self.format_stats(timedelta(seconds=seconds)))
+            self.mark_stats()
 
 
     def on_frame(self, controller):
+        self.process_frame(self.fetch_frame(controller))
+
+    def fetch_frame(self, controller):
+        return controller.frame()
+
+    def process_frame(self, frame):
         self.frame_count += 1 
 
         self.do_stats()
 
-        frame = controller.frame()
         if DEBUG:
             #self.print_frame(frame)
             pass
+        self.track_frame(frame)
         self.send_frame_data(frame)
 
+    def track_frame(self, frame):
+        """
+        Update any state kept across frames (e.g. part tracking) before
+        the frame is sent.
+        """
+        pass
+
 
     def get_hands(self, frame):
         return frame.hands
 
+    def part_fields(self, hand_id, finger_id):
+        """
+        Which fields to send for a finger (or the palm, if `finger_id` is
+        `None`); fields not sent aren't even read from the Leap.
+        """
+        return self.palm_fields if finger_id is None else self.finger_fields
+
     def send_frame_data(self, frame):
 
         current_hands = defaultdict(list)
 
-        for hand in self.get_hands(frame):
+        send_part_vector = self.send_part_vector
+        send_part_value = self.send_part_value
+        part_fields = self.part_fields
+
+        hands = self.get_hands(frame)
+        for hand in hands:
 
-            hand_base = "/hand%d" % hand.id
+            hand_id = hand.id
 
             ## Handle fingers
             for finger in hand.fingers:
-                self.send_vector("%s/finger%d/t" % (hand_base,finger.id),
-                            finger.tip_position)
-                self.send_vector("%s/finger%d/d" % (hand_base,finger.id),
-                            finger.direction)
-                self.send("%s/finger%d/extended" % (hand_base,finger.id),
-                            1 if finger.is_extended else 0)
-                current_hands[hand.id].append(finger.id)
+                finger_id = finger.id
+                fields = part_fields(hand_id, finger_id)
+                if 't' in fields:
+                    send_part_vector(hand_id, finger_id, 't',
+                                finger.tip_position)
+                if 'd' in fields:
+                    send_part_vector(hand_id, finger_id, 'd', finger.direction)
+                if 'extended' in fields:
+                    send_part_value(hand_id, finger_id, 'extended',
+                                1 if finger.is_extended else 0)
+                current_hands[hand_id].append(finger_id)
 
             ## Handle palm
+            fields = part_fields(hand_id, None)
             # Relative point position of palm
-            self.send_vector("%s/palm/t" % hand_base, hand.palm_position)
+            if 't' in fields:
+                send_part_vector(hand_id, None, 't', hand.palm_position)
             # Normal to the plane of the palm
-            self.send_vector("%s/palm/d" % hand_base, hand.palm_normal) 
+            if 'd' in fields:
+                send_part_vector(hand_id, None, 'd', hand.palm_normal)
             # Direction pointing from palm to fingers
-            # self.send_vector("%s/palm/d" % hand_base, hand.palm_direction)
+            # send_part_vector(hand_id, None, 'd', hand.palm_direction)
+
+        self.send_derived(frame, hands)
 
         # When we lose a hand we should ZERO out the finger data for
         # the missing hand
@@ -470,35 +837,223 @@ class OSCLeapListener(BaseLeapListener):
         lost_hands = set(self.previous_hands.keys()) - set(current_hands.keys())
         if len(lost_hands) > 0:
             for lost_hand_key in lost_hands:
-                hand_base = '/hand%d' % lost_hand_key
-                for finger_key in self.previous_hands[lost_hand_key]:
-                    self.send_vector("%s/finger%d/t" % (hand_base,finger_key),
-                                ZERO())
-                    self.send_vector("%s/finger%d/d" % (hand_base,finger_key),
-                                ZERO())
-                    self.send("%s/finger%d/extended" % (hand_base,finger_key),
-                                0)
-                self.send_vector("%s/palm/t" % hand_base, ZERO())
-                self.send_vector("%s/palm/d" % hand_base, ZERO())
-                log("Clear lost hand %s\n" % lost_hand_key) 
+                self.clear_lost_hand(lost_hand_key,
+                                self.previous_hands[lost_hand_key])
 
         self.previous_hands = current_hands
 
+    def send_derived(self, frame, hands):
+        """
+        Send anything worked out from the frame's `hands` (as sent), after
+        them (see `MetricsMixin`.)
+        """
+        pass
+
+    def bundle_overhead(self):
+        """
+        Bytes added to each bundle after it's encoded (and split to fit
+        `max_datagram`, see `BundledMixin`), on its way out
+        """
+        return 0
+
+    def zero_vector(self):
+        return ZERO_VECTOR
+
+    def clear_lost_hand(self, hand_id, finger_ids):
+        zero = self.zero_vector()
+        for finger_id in list(finger_ids) + [None]:
+            for field in self.part_fields(hand_id, finger_id):
+                if field in OSCAddressTable.VECTOR_FIELDS:
+                    self.send_part_vector(hand_id, finger_id, field, zero)
+                else:
+                    self.send_part_value(hand_id, finger_id, field, 0)
+        log_event("Cleared", "lost hand", "Clear lost hand %s\n" % hand_id)
+
 
 class BundledMixin(object):
     """
     Combine invidual OSC messages into bundles.
 
     One bundle is sent per frame (so it will contain all hand and finger data.)
+    The bundle is encoded directly into a reusable buffer by a `BundleEncoder`
+    and the buffer handed to the socket; see `PyOSCBundledMixin` for the
+    (slower) pyOSC `OSCBundle` based equivalent.
+
+    With `max_datagram` set, a frame's bundle which is bigger than that is
+    split into as few bundles as fit (with the same timetag), keeping each
+    hand's messages together where possible, so it isn't IP fragmented.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, max_datagram=None, *args, **kwargs):
         self.current_bundle = None
+        self.max_datagram = max_datagram
+        # Splitting needs to know where each message is
+        self.bundle_encoder = IndexedBundleEncoder() if max_datagram \
+                                else BundleEncoder()
+        self.bundles_sent = 0
+        self.bundled_frames = 0
+        self.max_bundles_per_frame = 0
+        self.bundles_sent_at_log = 0
+        self.bundled_frames_at_log = 0
         super(BundledMixin,self).__init__(*args,**kwargs)
 
     def send(self, name, val=None):
         if self.current_bundle is None:
             super(BundledMixin,self).send(name,val)
+        else:
+            self.osc_messages_sent += 1
+            if val is None:
+                self.current_bundle.add_binary(encode_message(name))
+            elif isinstance(val, (tuple, list)):
+                self.current_bundle.add_binary(encode_message(name, *val))
+            else:
+                self.current_bundle.add_binary(encode_message(name, val))
+
+    def send_packed(self, template, *values):
+        if self.current_bundle is None:
+            return super(BundledMixin,self).send_packed(template, *values)
+        self.osc_messages_sent += 1
+        self.current_bundle.add(template, *values)
+
+    def send_frame_data(self, frame):
+        self.current_bundle = self.bundle_encoder
+        self.current_bundle.begin(self.bundle_timetag(frame))
+        r = super(BundledMixin,self).send_frame_data(frame)
+        bundle = self.current_bundle
+        self.current_bundle = None
+        if len(bundle) > 0:
+            if self.max_datagram:
+                self.send_split_bundle(bundle)
+            else:
+                self.send_buffer(bundle.getvalue(), bundle.elements)
+        return r
+
+    def specialize(self):
+        # Unless something changes how part values are sent (e.g. delta)
+        # or transforms them one by one, encode them straight into the
+        # bundle rather than through `pre_send_x/y/z` and `send_packed`
+        super(BundledMixin,self).specialize()
+        overridden = self.overridden_part_methods()
+        if overridden:
+            # Not an error, but easy to bring about unintentionally
+            log("Not encoding part values straight into bundles: %s\n" %
+                        ", ".join("%s is %s's" % (name, class_.__name__)
+                                for name, class_ in overridden),
+                level=VERBOSE)
+            return
+        self.send_part_vector = self.bundle_part_vector
+        self.send_part_value = self.bundle_part_value
+
+    def overridden_part_methods(self):
+        """
+        `(name, class)` of each per-value method which is defined by a class
+        that may do more with the values than `bundle_part_vector` and
+        `bundle_part_value` would; none if they can be used instead.
+        """
+        equivalent = {
+            'send_packed': (BundledMixin,),
+            'send_part_vector': (OSCLeapListener, VectorAsArgsMixin),
+            'send_part_value': (OSCLeapListener,),
+            # `FrameArrayMixin`'s transform whole frames before they're sent
+            'pre_send_x': (OSCLeapListener, FrameArrayMixin),
+            'pre_send_y': (OSCLeapListener, FrameArrayMixin),
+            'pre_send_z': (OSCLeapListener, FrameArrayMixin),
+        }
+        overridden = []
+        for name in sorted(equivalent):
+            class_ = defined_by(self, name)
+            if class_ not in equivalent[name]:
+                overridden.append((name, class_))
+        return overridden
+
+    def bundle_part_vector(self, hand_id, finger_id, field, vector):
+        # Only while a frame is being bundled
+        self.osc_messages_sent += self.bundle_encoder.add_vector(
+                        self.addresses.get(hand_id, finger_id, field,
+                                        self.vector_as_args), vector)
+
+    def bundle_part_value(self, hand_id, finger_id, field, value):
+        self.osc_messages_sent += 1
+        self.bundle_encoder.add(self.addresses.get(hand_id, finger_id,
+                                                field)[0], value)
+
+    def bundle_timetag(self, frame):
+        return IMMEDIATELY
+
+    def bundle_group(self, address):
+        """
+        Messages are kept in the same bundle by this (e.g. `hand1`.)
+        """
+        return address.split("/", 2)[1]
+
+    def send_split_bundle(self, bundle):
+        split = split_bundle(bundle.getvalue(), bundle.elements,
+                            self.max_datagram - self.bundle_overhead(),
+                            self.bundle_group)
+        for data, elements in split:
+            self.send_buffer(data, elements)
+        self.bundles_sent += len(split)
+        self.bundled_frames += 1
+        if len(split) > self.max_bundles_per_frame:
+            self.max_bundles_per_frame = len(split)
+
+    def format_stats(self, time_diff):
+        stats = super(BundledMixin,self).format_stats(time_diff)
+        if not self.max_datagram:
+            return stats
+        frames = self.bundled_frames - self.bundled_frames_at_log
+        bundles = self.bundles_sent - self.bundles_sent_at_log
+        return "%s; %.2f bundles per frame (max %s)" % (stats,
+                    float(bundles) / frames if frames else 0.0,
+                    self.max_bundles_per_frame)
+
+    def mark_stats(self):
+        super(BundledMixin,self).mark_stats()
+        self.bundles_sent_at_log = self.bundles_sent
+        self.bundled_frames_at_log = self.bundled_frames
+        self.max_bundles_per_frame = 0
+
+
+class LeapTimetagMixin(object):
+    """
+    Timetag each frame's bundle with when the Leap captured the frame
+    (its timestamp mapped onto local time, see `LeapTimeMapper`) instead
+    of 'immediately', so receivers can take out network and scheduling
+    jitter by playing bundles back on their timetags.
+
+    Must come before `BundledMixin` in the inheritance chain. With
+    `FixedRateMixin` each tick is timetagged with the time it resampled.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.leap_time = LeapTimeMapper()
+        super(LeapTimetagMixin,self).__init__(*args, **kwargs)
+
+    def fetch_frame(self, controller):
+        frame = super(LeapTimetagMixin,self).fetch_frame(controller)
+        self.leap_time.observe(frame.timestamp, time.time())
+        return frame
+
+    def bundle_timetag(self, frame):
+        if isinstance(frame, ResampledFrame):
+            return to_timetag(frame.timestamp)
+        return to_timetag(self.leap_time.to_local(frame.timestamp))
+
+
+class PyOSCBundledMixin(object):
+    """
+    Combine invidual OSC messages into pyOSC `OSCBundle`s.
+
+    Sends exactly the same bundles as `BundledMixin`; kept as a fallback.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.current_bundle = None
+        super(PyOSCBundledMixin,self).__init__(*args,**kwargs)
+
+    def send(self, name, val=None):
+        if self.current_bundle is None:
+            super(PyOSCBundledMixin,self).send(name,val)
         else:
             self.osc_messages_sent += 1
             #log("Bundle: %s\n" % self.current_bundle)
@@ -507,9 +1062,15 @@ class BundledMixin(object):
                 msg.append(val)
             self.current_bundle.append(msg)
 
+    def send_packed(self, template, *values):
+        if self.current_bundle is None:
+            return super(PyOSCBundledMixin,self).send_packed(template, *values)
+        self.osc_messages_sent += 1
+        self.current_bundle.append(PackedMessage(template.encode(*values)))
+
     def send_frame_data(self, frame):
         self.current_bundle = OSCBundle()
-        r = super(BundledMixin,self).send_frame_data(frame)
+        r = super(PyOSCBundledMixin,self).send_frame_data(frame)
         if len(self.current_bundle.values()) > 0:
             self.client.send(self.current_bundle)
             #log("%s\n" % self.current_bundle.values())
@@ -517,6 +1078,43 @@ class BundledMixin(object):
         return r
 
 
+class FrameBlobMixin(object):
+    """
+    Send each frame as a single `/frame` message carrying an OSC blob of
+    packed float32 (or int16 fixed point) values, laid out as described
+    in frameblob.py, instead of a message per value.
+
+    Takes the place of bundling. With `int16`, positions are sent
+    multiplied by `blob_scale`.
+    """
+
+    def __init__(self, blob_format=FLOAT32, blob_scale=10.0, *args, **kwargs):
+        self.blob_encoder = FrameBlobEncoder(blob_format, blob_scale)
+        super(FrameBlobMixin,self).__init__(*args, **kwargs)
+
+    def send_frame_data(self, frame):
+        x, y, z = self.pre_send_x, self.pre_send_y, self.pre_send_z
+        hands = []
+        for hand in self.get_hands(frame):
+            fingers = []
+            for finger in hand.fingers:
+                t = finger.tip_position
+                d = finger.direction
+                fingers.append((finger.id, (x(t[0]), y(t[1]), z(t[2])),
+                                (x(d[0]), y(d[1]), z(d[2])),
+                                finger.is_extended))
+            p = hand.palm_position
+            n = hand.palm_normal
+            hands.append((hand.id, (x(p[0]), y(p[1]), z(p[2])),
+                        (x(n[0]), y(n[1]), z(n[2])), fingers))
+        if isinstance(frame, ResampledFrame):
+            frame_id, timestamp = -1, int(frame.timestamp * 1e6)
+        else:
+            frame_id, timestamp = frame.id, frame.timestamp
+        self.osc_messages_sent += 1
+        self.send_buffer(self.blob_encoder.encode(frame_id, timestamp, hands))
+
+
 class VectorAsArgsMixin(object):
     """
     Send Leap vector data values with one OSC address and multiple
@@ -536,6 +1134,941 @@ class VectorAsArgsMixin(object):
             vec_tuple = vector
         self.send("%sxyz" % name, vec_tuple)
 
+    vector_as_args = True
+
+    def send_part_vector(self, hand_id, finger_id, field, vector):
+        template, = self.addresses.get(hand_id, finger_id, field, True)
+        self.send_packed(template, vector[0], vector[1], vector[2])
+
+
+class DeltaMixin(object):
+    """
+    Only send hand and finger values which have moved further than a 
+    deadband since they were last sent.
+
+    - Positions (`t`) are compared by distance in mm, and velocities (`v`)
+      likewise in mm/s
+    - Directions and normals (`d`) are compared by angle in degrees
+    - `extended` is sent whenever it changes
+    
+    Every value is (re)sent in a "keyframe" every `keyframe_frames` frames
+    and/or `keyframe_ms` milliseconds so that receivers which join late
+    or lose packets recover.
+    """
+
+    def __init__(self, deadband_mm=1.0, deadband_degrees=1.0,
+                    keyframe_frames=None, keyframe_ms=1000, *args, **kwargs):
+        self.deadband_mm_sq = deadband_mm ** 2
+        self.deadband_cos = math.cos(math.radians(deadband_degrees))
+        self.keyframe_frames = keyframe_frames
+        self.keyframe_ms = keyframe_ms
+        self.keyframe = True
+        self.keyframe_at_frame = 0
+        self.keyframe_at_time = 0.0
+        # hand_id -> {(finger_id, field): last sent value}
+        self.sent_values = defaultdict(dict)
+        self.delta_messages_skipped = 0
+        self.delta_bytes_skipped = 0
+        self.delta_messages_skipped_at_log = 0
+        self.delta_bytes_skipped_at_log = 0
+        super(DeltaMixin,self).__init__(*args, **kwargs)
+
+    def is_keyframe(self):
+        if self.keyframe_frames is not None and \
+                self.frame_count - self.keyframe_at_frame >= self.keyframe_frames:
+            return True
+        if self.keyframe_ms is not None and \
+                (time.time() - self.keyframe_at_time) * 1000 >= self.keyframe_ms:
+            return True
+        return False
+
+    def send_frame_data(self, frame):
+        self.keyframe = self.is_keyframe()
+        if self.keyframe:
+            self.keyframe_at_frame = self.frame_count
+            self.keyframe_at_time = time.time()
+        return super(DeltaMixin,self).send_frame_data(frame)
+
+    def vector_moved(self, field, previous, value):
+        if field != 'd':
+            dx = value[0] - previous[0]
+            dy = value[1] - previous[1]
+            dz = value[2] - previous[2]
+            return dx * dx + dy * dy + dz * dz > self.deadband_mm_sq
+        dot = value[0] * previous[0] + value[1] * previous[1] + \
+                value[2] * previous[2]
+        norms = (value[0] ** 2 + value[1] ** 2 + value[2] ** 2) * \
+                (previous[0] ** 2 + previous[1] ** 2 + previous[2] ** 2)
+        if norms == 0:
+            # Only 'moved' if just one of them is a zero vector
+            return value != previous
+        return dot < self.deadband_cos * math.sqrt(norms)
+
+    def skip_part(self, hand_id, finger_id, field):
+        for template in self.addresses.get(hand_id, finger_id, field,
+                                        self.vector_as_args):
+            self.delta_messages_skipped += 1
+            self.delta_bytes_skipped += template.size
+
+    def send_part_vector(self, hand_id, finger_id, field, vector):
+        value = (vector[0], vector[1], vector[2])
+        sent = self.sent_values[hand_id]
+        previous = sent.get((finger_id, field))
+        if self.keyframe or previous is None or \
+                self.vector_moved(field, previous, value):
+            sent[(finger_id, field)] = value
+            return super(DeltaMixin,self).send_part_vector(hand_id, finger_id,
+                                                        field, vector)
+        self.skip_part(hand_id, finger_id, field)
+
+    def send_part_value(self, hand_id, finger_id, field, value):
+        sent = self.sent_values[hand_id]
+        if self.keyframe or sent.get((finger_id, field)) != value:
+            sent[(finger_id, field)] = value
+            return super(DeltaMixin,self).send_part_value(hand_id, finger_id,
+                                                        field, value)
+        self.skip_part(hand_id, finger_id, field)
+
+    def clear_lost_hand(self, hand_id, finger_ids):
+        # Always send the zeroing messages; then forget the hand so it is
+        # sent in full if it comes back
+        self.sent_values.pop(hand_id, None)
+        super(DeltaMixin,self).clear_lost_hand(hand_id, finger_ids)
+        self.sent_values.pop(hand_id, None)
+
+    def format_stats(self, time_diff):
+        skipped = self.delta_messages_skipped - \
+                        self.delta_messages_skipped_at_log
+        sent = self.osc_messages_sent - self.osc_messages_sent_at_log
+        return "%s; Skipped %s unchanged messages (%d%%, %s bytes)" % (
+                    super(DeltaMixin,self).format_stats(time_diff), skipped,
+                    100 * skipped / max(skipped + sent, 1),
+                    self.delta_bytes_skipped - self.delta_bytes_skipped_at_log)
+
+    def mark_stats(self):
+        super(DeltaMixin,self).mark_stats()
+        self.delta_messages_skipped_at_log = self.delta_messages_skipped
+        self.delta_bytes_skipped_at_log = self.delta_bytes_skipped
+
+
+class RateLimitMixin(object):
+    """
+    Send each hand and finger field no more often than the rate, and in
+    each frame in the order of the priority (highest first), of the first
+    rule of `rate_schedule` its address matches (see `rates.RateSchedule`.)
+
+    - Vectors and float values are sent whenever they're due
+    - Integer values (e.g. `extended`) are also sent as soon as they change
+    - Fields no rule matches are sent every frame, at priority 0
+
+    Priority only orders a frame's messages. Only with `--unbundled`, where
+    each is a datagram of its own, does that make higher priority fields
+    arrive sooner; in a bundle they all arrive at once, in that order.
+
+    Lost hands are always zeroed, and sent in full if they come back.
+    Must come after `BundledMixin` and before `DeltaMixin` in the
+    inheritance chain; the values sent are compared in frame time.
+    """
+
+    def __init__(self, rate_schedule=None, *args, **kwargs):
+        self.rate_schedule = rate_schedule or RateSchedule([])
+        # (hand_id, finger_id, field, vector_as_args) -> `AddressRule`; the
+        # addresses matched differ with `vector_as_args` (which
+        # `AdaptiveQualityMixin` changes)
+        self.rate_rules = {}
+        # hand_id -> {(finger_id, field): frame time next due}
+        self.rate_due = defaultdict(dict)
+        # hand_id -> {(finger_id, field): integer value last sent}
+        self.rate_values = defaultdict(dict)
+        self.rate_now = 0.0
+        self.rate_deferred = None
+        self.rate_limited = 0
+        self.rate_limited_at_log = 0
+        super(RateLimitMixin,self).__init__(*args, **kwargs)
+
+    def send_frame_data(self, frame):
+        self.rate_now = frame_seconds(frame)
+        # Fields of less than the top priority wait until the end of the
+        # frame, then go in order
+        self.rate_deferred = deferred = []
+        try:
+            r = super(RateLimitMixin,self).send_frame_data(frame)
+        finally:
+            self.rate_deferred = None
+        deferred.sort()
+        send_part_vector = super(RateLimitMixin,self).send_part_vector
+        send_part_value = super(RateLimitMixin,self).send_part_value
+        for _, _, vector, hand_id, finger_id, field, value in deferred:
+            if vector:
+                send_part_vector(hand_id, finger_id, field, value)
+            else:
+                send_part_value(hand_id, finger_id, field, value)
+        return r
+
+    def rate_rule(self, hand_id, finger_id, field):
+        rules = self.rate_rules
+        vector_as_args = self.vector_as_args
+        key = (hand_id, finger_id, field, vector_as_args)
+        try:
+            return rules[key]
+        except KeyError:
+            if len(rules) >= self.addresses.max_entries:
+                rules.clear()
+            addresses = self.addresses
+            rule = rules[key] = self.rate_schedule.rule_for(
+                        [addresses.base_address(hand_id, finger_id, field)] +
+                        [template.address for template in addresses.get(
+                            hand_id, finger_id, field, vector_as_args)])
+            return rule
+
+    def is_due(self, hand_id, finger_id, field, period):
+        due = self.rate_due[hand_id]
+        now = self.rate_now
+        at = due.get((finger_id, field))
+        if at is not None and now < at:
+            return False
+        # Keep to the rate on average, unless it's fallen a period behind
+        due[(finger_id, field)] = at + period \
+                        if at is not None and now - at < period \
+                        else now + period
+        return True
+
+    def send_part_vector(self, hand_id, finger_id, field, vector):
+        rule = self.rate_rule(hand_id, finger_id, field)
+        if rule.period is not None and \
+                not self.is_due(hand_id, finger_id, field, rule.period):
+            self.rate_limited += 1
+            return None
+        if self.rate_deferred is not None and \
+                rule.priority < self.rate_schedule.top_priority:
+            self.rate_deferred.append((-rule.priority,
+                        len(self.rate_deferred), True, hand_id, finger_id,
+                        field, vector))
+            return None
+        return super(RateLimitMixin,self).send_part_vector(hand_id,
+                                                finger_id, field, vector)
+
+    def send_part_value(self, hand_id, finger_id, field, value):
+        rule = self.rate_rule(hand_id, finger_id, field)
+        if rule.period is not None:
+            if field in OSCAddressTable.FLOAT_FIELDS:
+                due = self.is_due(hand_id, finger_id, field, rule.period)
+            else:
+                sent = self.rate_values[hand_id]
+                due = sent.get((finger_id, field)) != value
+                if due:
+                    # Changed; send now, and start the period over
+                    self.rate_due[hand_id][(finger_id, field)] = \
+                                    self.rate_now + rule.period
+                else:
+                    due = self.is_due(hand_id, finger_id, field, rule.period)
+                sent[(finger_id, field)] = value
+            if not due:
+                self.rate_limited += 1
+                return None
+        if self.rate_deferred is not None and \
+                rule.priority < self.rate_schedule.top_priority:
+            self.rate_deferred.append((-rule.priority,
+                        len(self.rate_deferred), False, hand_id, finger_id,
+                        field, value))
+            return None
+        return super(RateLimitMixin,self).send_part_value(hand_id,
+                                                finger_id, field, value)
+
+    def clear_lost_hand(self, hand_id, finger_ids):
+        # Zero everything, straight away; forget the hand, so it's sent in
+        # full if it comes back
+        deferred = self.rate_deferred
+        self.rate_deferred = None
+        self.rate_due.pop(hand_id, None)
+        self.rate_values.pop(hand_id, None)
+        try:
+            super(RateLimitMixin,self).clear_lost_hand(hand_id, finger_ids)
+        finally:
+            self.rate_deferred = deferred
+            self.rate_due.pop(hand_id, None)
+            self.rate_values.pop(hand_id, None)
+
+    def format_stats(self, time_diff):
+        return "%s; Rate limited %s values" % (
+                    super(RateLimitMixin,self).format_stats(time_diff),
+                    self.rate_limited - self.rate_limited_at_log)
+
+    def mark_stats(self):
+        super(RateLimitMixin,self).mark_stats()
+        self.rate_limited_at_log = self.rate_limited
+
+
+class SenderThreadMixin(object):
+    """
+    Keep the Leap callback thread free: `on_frame` only queues the frame
+    in a bounded `FrameRing`; tracking, encoding, sending and logging all
+    happen on a separate sender thread.
+
+    `overflow` picks what to do when the sender falls behind (see `FrameRing`.)
+    """
+
+    def __init__(self, queue_size=4, overflow=DROP_OLDEST, *args, **kwargs):
+        self.frame_ring = FrameRing(queue_size, overflow)
+        self.dropped_at_log = 0
+        self.coalesced_at_log = 0
+        super(SenderThreadMixin,self).__init__(*args, **kwargs)
+        self.sender_thread = SenderThread(self.frame_ring, self.process_frame)
+        self.sender_thread.start()
+
+    def on_frame(self, controller):
+        self.frame_ring.put(self.fetch_frame(controller))
+
+    def on_exit(self, controller):
+        self.sender_thread.stop(timeout=1.0)
+        super(SenderThreadMixin,self).on_exit(controller)
+
+    def format_stats(self, time_diff):
+        ring = self.frame_ring
+        return "%s; Queue depth %s (max %s), dropped %s, coalesced %s" % (
+                    super(SenderThreadMixin,self).format_stats(time_diff),
+                    len(ring), ring.max_depth,
+                    ring.dropped - self.dropped_at_log,
+                    ring.coalesced - self.coalesced_at_log)
+
+    def mark_stats(self):
+        super(SenderThreadMixin,self).mark_stats()
+        self.dropped_at_log = self.frame_ring.dropped
+        self.coalesced_at_log = self.frame_ring.coalesced
+        self.frame_ring.reset_max_depth()
+
+
+class FixedRateMixin(object):
+    """
+    Send hand data at a fixed `output_rate` (per second) instead of once
+    per Leap frame.
+
+    Each Leap frame only records a snapshot of the (tracked) hands. A timer
+    thread then sends, every tick, either the latest snapshot or one linearly
+    interpolated between the last two (which delays output by at most one
+    Leap frame interval, and never by more than one tick.)
+    """
+
+    def __init__(self, output_rate=60.0, resample=INTERPOLATE, *args, **kwargs):
+        self.hand_states = HandStateBuffer(resample)
+        self.ticks_sent = 0
+        self.ticks_sent_at_log = 0
+        super(FixedRateMixin,self).__init__(*args, **kwargs)
+        self.output_timer = FixedRateTimer(output_rate, self.send_tick)
+        self.output_timer.start()
+
+    def get_hands(self, frame):
+        if isinstance(frame, ResampledFrame):
+            return frame.hands
+        return super(FixedRateMixin,self).get_hands(frame)
+
+    def send_frame_data(self, frame):
+        self.hand_states.record(self.get_hands(frame))
+
+    def send_tick(self, now):
+        frame = self.hand_states.resample(now, self.output_timer.period)
+        if frame is not None:
+            self.ticks_sent += 1
+            super(FixedRateMixin,self).send_frame_data(frame)
+
+    def on_exit(self, controller):
+        self.output_timer.stop(timeout=1.0)
+        super(FixedRateMixin,self).on_exit(controller)
+
+    def format_stats(self, time_diff):
+        return "%s; Sent %s ticks" % (
+                    super(FixedRateMixin,self).format_stats(time_diff),
+                    self.ticks_sent - self.ticks_sent_at_log)
+
+    def mark_stats(self):
+        super(FixedRateMixin,self).mark_stats()
+        self.ticks_sent_at_log = self.ticks_sent
+
+
+class AdaptiveQualityMixin(object):
+    """
+    Step the quality of what's sent down while tracking and sending frames
+    takes longer than the Leap takes to make them, and back up once it
+    doesn't (see `quality.QualityController`), through the levels which
+    apply:
+
+    - `no-finger-directions`: fingers' directions (`d`) aren't sent
+    - `vector-args`: vectors are sent as one message with three arguments,
+      as by `VectorAsArgsMixin`
+    - `coarse`: with `DeltaMixin`, values are only resent once they've
+      moved `coarse_factor` times as far (or turned as much further)
+    - `half-rate`: only every other frame is sent
+
+    Each level also has those before it. The level is logged with the
+    stats, and sent in a `/status/quality <number> <name>` message (its
+    number being its place in `quality.QUALITY_LEVELS`) whenever it
+    changes and once a second.
+
+    Must come after `FixedRateMixin` (so it's the ticks which are sent at
+    half rate) and before the bundling mixins in the inheritance chain.
+    """
+
+    status_address = '/status/quality'
+
+    def __init__(self, degrade_load=0.9, recover_load=0.5, coarse_factor=4.0,
+                *args, **kwargs):
+        super(AdaptiveQualityMixin,self).__init__(*args, **kwargs)
+        self.quality = QualityController([level for level in QUALITY_LEVELS
+                                        if self.quality_applies(level)],
+                                        degrade_load, recover_load)
+        if COARSE in self.quality.levels:
+            self.coarse_factor = coarse_factor
+            self.fine_deadband_mm_sq = self.deadband_mm_sq
+            self.fine_deadband_radians = math.acos(self.deadband_cos)
+        self._without_directions = {}
+        self.frame_stride = 1
+        self.quality_frames = 0
+        self.quality_frames_skipped = 0
+        self.quality_frames_skipped_at_log = 0
+        # Seconds spent tracking; with `FixedRateMixin` frames are tracked
+        # on another thread than they're sent, so each only writes its own
+        self.quality_tracking_busy = 0.0
+        self.quality_tracking_busy_counted = 0.0
+        self.quality_frame_time = None
+        self.quality_status_due = True
+
+    def quality_applies(self, level):
+        blob = isinstance(self, FrameBlobMixin)
+        if level == NO_FINGER_DIRECTIONS:
+            return not blob and 'd' in self.finger_fields
+        if level == VECTOR_ARGS:
+            return not blob and not self.vector_as_args
+        if level == COARSE:
+            return isinstance(self, DeltaMixin)
+        return True
+
+    def track_frame(self, frame):
+        start = time.time()
+        super(AdaptiveQualityMixin,self).track_frame(frame)
+        self.quality_tracking_busy += time.time() - start
+
+    def send_frame_data(self, frame):
+        start = time.time()
+        self.quality_frames += 1
+        if self.quality_frames % self.frame_stride:
+            self.quality_frames_skipped += 1
+            r = None
+        else:
+            r = super(AdaptiveQualityMixin,self).send_frame_data(frame)
+        tracking_busy = self.quality_tracking_busy
+        busy = tracking_busy - self.quality_tracking_busy_counted + \
+                    time.time() - start
+        self.quality_tracking_busy_counted = tracking_busy
+
+        seconds = frame_seconds(frame)
+        previous = self.quality_frame_time
+        self.quality_frame_time = seconds
+        # Not the first frame, nor a jump (e.g. the replay starting over)
+        if previous is not None and 0 < seconds - previous < 1.0 and \
+                self.quality.observe(busy, seconds - previous) is not None:
+            self.apply_quality()
+            log("Quality %s (load %.2f)\n" % (self.quality.name,
+                                            self.quality.load))
+            self.quality_status_due = True
+        # Sent from here, not the stats, so it's never sent while another
+        # thread (e.g. `FixedRateMixin`'s) is bundling a frame
+        if self.quality_status_due:
+            self.quality_status_due = False
+            self.send(self.status_address,
+                    (QUALITY_LEVELS.index(self.quality.name),
+                    self.quality.name))
+        return r
+
+    def apply_quality(self):
+        levels = self.quality.levels
+        active = levels[1:self.quality.level + 1]
+        if NO_FINGER_DIRECTIONS in active:
+            self.part_fields = self.part_fields_without_directions
+        else:
+            self.__dict__.pop('part_fields', None)
+        if VECTOR_ARGS in levels:
+            if VECTOR_ARGS in active:
+                self.vector_as_args = True
+            else:
+                self.__dict__.pop('vector_as_args', None)
+        if COARSE in levels:
+            factor = self.coarse_factor if COARSE in active else 1.0
+            self.deadband_mm_sq = self.fine_deadband_mm_sq * factor ** 2
+            self.deadband_cos = math.cos(min(
+                            self.fine_deadband_radians * factor, math.pi))
+        self.frame_stride = 2 if HALF_RATE in active else 1
+        # What's sent has changed; plan it again, and send every value
+        # (under its new address) rather than only those which moved
+        if isinstance(self, SubscriptionMixin):
+            self.emission_plan = {}
+        if isinstance(self, DeltaMixin):
+            self.sent_values.clear()
+
+    def clear_lost_hand(self, hand_id, finger_ids):
+        # Zero every field of a lost hand, including those left out at
+        # this level, so receivers don't keep values which were last sent
+        # before it
+        part_fields = self.__dict__.pop('part_fields', None)
+        try:
+            super(AdaptiveQualityMixin,self).clear_lost_hand(hand_id,
+                                                            finger_ids)
+        finally:
+            if part_fields is not None:
+                self.part_fields = part_fields
+
+    def part_fields_without_directions(self, hand_id, finger_id):
+        # In place of `part_fields` at `no-finger-directions` and below
+        fields = super(AdaptiveQualityMixin,self).part_fields(hand_id,
+                                                            finger_id)
+        if finger_id is None:
+            return fields
+        try:
+            return self._without_directions[fields]
+        except KeyError:
+            reduced = self._without_directions[fields] = \
+                            tuple(field for field in fields if field != 'd')
+            return reduced
+
+    def format_stats(self, time_diff):
+        return "%s; Quality %s (load %.2f), skipped %s frames" % (
+                    super(AdaptiveQualityMixin,self).format_stats(time_diff),
+                    self.quality.name, self.quality.load,
+                    self.quality_frames_skipped -
+                        self.quality_frames_skipped_at_log)
+
+    def mark_stats(self):
+        super(AdaptiveQualityMixin,self).mark_stats()
+        self.quality_frames_skipped_at_log = self.quality_frames_skipped
+        self.quality_status_due = True
+
+
+class RecordingMixin(object):
+    """
+    Record every Leap frame, as it arrives from the controller (before any
+    tracking), to a file which can be replayed with `ReplayController`.
+    """
+
+    def __init__(self, record_path=None, *args, **kwargs):
+        self.recorder = FrameSerializer(open(record_path, 'wb'))
+        super(RecordingMixin,self).__init__(*args, **kwargs)
+
+    def fetch_frame(self, controller):
+        frame = super(RecordingMixin,self).fetch_frame(controller)
+        self.recorder.serialize(frame)
+        return frame
+
+    def on_exit(self, controller):
+        super(RecordingMixin,self).on_exit(controller)
+        self.recorder.close()
+        self.recorder.out_fp.close()
+        log("Recorded %s frames\n" % self.recorder.frame_count)
+
+
+class FanOutMixin(object):
+    """
+    Send to several destinations from one non-blocking socket: the
+    listener's `hostname:port`, plus `destinations` (`fanout.Destination`s)
+    which may each only want some addresses.
+
+    Bundles are encoded once; each filtered copy is cut out of that
+    encoding (see `fanout.FanOut`.) Must come after `BundledMixin` in the
+    inheritance chain. Not for use with `PyOSCBundledMixin`.
+    """
+
+    def __init__(self, destinations=(), *args, **kwargs):
+        super(FanOutMixin,self).__init__(*args, **kwargs)
+        self.fanout = FanOut([Destination(self.hostname, self.port)] +
+                            list(destinations))
+        if getattr(self, 'bundle_encoder', None) is not None:
+            # Keep where each message is, for cutting out filtered bundles
+            self.bundle_encoder = IndexedBundleEncoder()
+        self.fanout_dropped_at_log = 0
+        self.fanout_errors_at_log = 0
+        for destination in self.fanout.destinations:
+            log("Sending to %s\n" % destination)
+
+    def send(self, name, val=None):
+        if val is None:
+            binary = encode_message(name)
+        elif isinstance(val, (tuple, list)):
+            binary = encode_message(name, *val)
+        else:
+            binary = encode_message(name, val)
+        self.osc_messages_sent += 1
+        self.send_buffer(binary)
+
+    def send_packed(self, template, *values):
+        self.osc_messages_sent += 1
+        self.send_buffer(template.encode(*values))
+
+    def send_buffer(self, data, elements=None):
+        self.fanout.send(data, elements)
+
+    def on_exit(self, controller):
+        super(FanOutMixin,self).on_exit(controller)
+        self.fanout.close()
+
+    def _fanout_totals(self):
+        destinations = self.fanout.destinations
+        return (sum(d.dropped for d in destinations),
+                sum(d.errors for d in destinations))
+
+    def format_stats(self, time_diff):
+        dropped, errors = self._fanout_totals()
+        return "%s; %s destinations dropped %s, errors %s" % (
+                    super(FanOutMixin,self).format_stats(time_diff),
+                    len(self.fanout.destinations),
+                    dropped - self.fanout_dropped_at_log,
+                    errors - self.fanout_errors_at_log)
+
+    def mark_stats(self):
+        super(FanOutMixin,self).mark_stats()
+        self.fanout_dropped_at_log, self.fanout_errors_at_log = \
+                        self._fanout_totals()
+
+
+class SubscriptionMixin(object):
+    """
+    Only read, transform and send the hand and finger fields receivers
+    have subscribed to, by sending OSC messages to `subscribe_port`:
+
+    - `/subscribe <pattern> [<pattern>...]` adds address patterns (globs,
+      as for `--destination`, e.g. `/hand*/palm` or `/hand1/finger*/t*`)
+    - `/unsubscribe <pattern> [<pattern>...]` removes them again, or all
+      of them if none are given
+
+    Everything is sent until the first subscription. Which fields of each
+    finger and palm are wanted (the emission plan) is only worked out again
+    when the subscriptions change. The socket is read, without blocking,
+    before each frame is handled.
+    """
+
+    def __init__(self, subscribe_port=None, *args, **kwargs):
+        # None until the first /subscribe: send everything
+        self.subscriptions = None
+        # (hand_id, finger_id) -> fields to send
+        self.emission_plan = {}
+        self.subscription_socket = socket.socket(socket.AF_INET,
+                                                socket.SOCK_DGRAM)
+        self.subscription_socket.setblocking(False)
+        self.subscription_socket.bind(('', subscribe_port))
+        super(SubscriptionMixin,self).__init__(*args, **kwargs)
+        log("Listening for subscriptions on port %s\n" % subscribe_port)
+
+    def process_frame(self, frame):
+        self.read_subscriptions()
+        return super(SubscriptionMixin,self).process_frame(frame)
+
+    def read_subscriptions(self):
+        changed = False
+        while True:
+            try:
+                packet = self.subscription_socket.recv(65536)
+            except socket.error:
+                break
+            try:
+                address, args = decode_message(packet)
+            except (ValueError, struct.error):
+                log_event("Ignored", "malformed subscription packet")
+                continue
+            changed = self.update_subscriptions(address, args) or changed
+        if changed:
+            self.emission_plan = {}
+            log("Subscribed to %s\n" % (", ".join(self.subscriptions) or
+                                        "nothing"))
+
+    def update_subscriptions(self, address, patterns):
+        patterns = [str(p) for p in patterns]
+        subscriptions = list(self.subscriptions or [])
+        if address == '/subscribe':
+            subscriptions.extend(p for p in patterns
+                                if p not in subscriptions)
+        elif address == '/unsubscribe':
+            subscriptions = [p for p in subscriptions
+                            if patterns and p not in patterns]
+        else:
+            return False
+        self.subscriptions = subscriptions
+        self.subscription_filter = AddressFilter(subscriptions)
+        return True
+
+    def plan_fields(self, hand_id, finger_id):
+        """
+        The fields of a part with any address subscribed to
+        """
+        fields = super(SubscriptionMixin,self).part_fields(hand_id, finger_id)
+        if self.subscriptions is None:
+            return fields
+        if not self.subscriptions:
+            return ()
+        keep = self.subscription_filter
+        addresses = self.addresses
+        return tuple(field for field in fields
+            if keep(addresses.base_address(hand_id, finger_id, field)) or
+                any(keep(template.address) for template in
+                    addresses.get(hand_id, finger_id, field,
+                                self.vector_as_args)))
+
+    def part_fields(self, hand_id, finger_id):
+        plan = self.emission_plan
+        try:
+            return plan[(hand_id, finger_id)]
+        except KeyError:
+            if len(plan) >= self.addresses.max_entries:
+                plan.clear()
+            fields = plan[(hand_id, finger_id)] = \
+                            self.plan_fields(hand_id, finger_id)
+            return fields
+
+    def on_exit(self, controller):
+        super(SubscriptionMixin,self).on_exit(controller)
+        self.subscription_socket.close()
+
+
+class SequenceMixin(object):
+    """
+    Number every bundle sent with a `/seq <n>` message as its first
+    element (counting up from 0, wrapping at 2**31), so a receiver can tell
+    packets lost or reordered on the way (see test_server.py).
+
+    Bundles split by `max_datagram` are numbered separately (and split
+    small enough to still fit once numbered.) Must come
+    after `BundledMixin` (and before `FanOutMixin`) in the inheritance
+    chain; destinations only wanting some addresses don't get `/seq`
+    unless they ask for it.
+    """
+
+    sequence_template = MessageTemplate('/seq', 'i')
+
+    def __init__(self, *args, **kwargs):
+        self.sequence = 0
+        super(SequenceMixin,self).__init__(*args, **kwargs)
+
+    def bundle_overhead(self):
+        # The `/seq` element: its size, then the message
+        return super(SequenceMixin,self).bundle_overhead() + 4 + \
+                        self.sequence_template.size
+
+    def send_buffer(self, data, elements=None):
+        if as_bytes(data[:len(BUNDLE_HEADER)]) == BUNDLE_HEADER:
+            data, elements = prepend_message(data, elements,
+                            self.sequence_template.encode(self.sequence))
+            self.sequence = (self.sequence + 1) & 0x7fffffff
+        return super(SequenceMixin,self).send_buffer(data, elements)
+
+
+STATS_FORMATS = ('text', 'json', 'osc')
+
+class InstrumentationMixin(object):
+    """
+    Time each stage of handling a frame (see `instrument.STAGES`) into
+    histograms, which are summarized and reset with the other stats
+    once a second.
+
+    `stats_format` picks how: percentiles added to the `text` stats line,
+    and also as a line of `json` or as `/stats/<stage>/<field>` `osc`
+    messages. With `FixedRateMixin` the encode and latency stages only
+    cover recording each frame's snapshot (the sends are timed as usual.)
+    """
+
+    def __init__(self, stats_format='text', *args, **kwargs):
+        if stats_format not in STATS_FORMATS:
+            raise ValueError("Unknown stats format '%s'" % stats_format)
+        self.stats_format = stats_format
+        self.instruments = Instruments()
+        kwargs.setdefault('client', TimedOSCClient(self.instruments))
+        super(InstrumentationMixin,self).__init__(*args, **kwargs)
+
+    def fetch_frame(self, controller):
+        start = now_ns()
+        frame = super(InstrumentationMixin,self).fetch_frame(controller)
+        end = now_ns()
+        self.instruments.record(FETCH, end - start)
+        clock = self.instruments.leap_clock
+        if hasattr(controller, 'now'):
+            clock.observe(controller.now(), now_ns())
+        else:
+            clock.observe(frame.timestamp, end)
+        return frame
+
+    def track_frame(self, frame):
+        start = now_ns()
+        super(InstrumentationMixin,self).track_frame(frame)
+        self.instruments.record(TRACK, now_ns() - start)
+
+    def send_frame_data(self, frame):
+        instruments = self.instruments
+        sent_before = instruments.send_total_ns
+        start = now_ns()
+        r = super(InstrumentationMixin,self).send_frame_data(frame)
+        end = now_ns()
+        instruments.record(ENCODE,
+                    end - start - (instruments.send_total_ns - sent_before))
+        if instruments.leap_clock.offset is not None:
+            instruments.record(LATENCY,
+                    end - instruments.leap_clock.to_local(frame.timestamp))
+        return r
+
+    def send_buffer(self, data, elements=None):
+        start = now_ns()
+        try:
+            return super(InstrumentationMixin,self).send_buffer(data, elements)
+        finally:
+            self.instruments.record_send(now_ns() - start)
+
+    def format_stats(self, time_diff):
+        stages = " ".join("%s %.0f/%.0f" % (stage, summary['p50_us'],
+                                            summary['p99_us'])
+                        for stage, summary in self.instruments.summary().items()
+                        if summary['count'])
+        return "%s; p50/p99 us: %s" % (
+                    super(InstrumentationMixin,self).format_stats(time_diff),
+                    stages or "-")
+
+    def mark_stats(self):
+        super(InstrumentationMixin,self).mark_stats()
+        if self.stats_format == 'json':
+            log("%s\n" % self.instruments.to_json())
+        elif self.stats_format == 'osc':
+            # Encoded on their own and sent straight out, not through
+            # `send`: with `FixedRateMixin` another thread may be filling
+            # the bundle meanwhile
+            for address, value in self.instruments.osc_messages():
+                self.osc_messages_sent += 1
+                self.send_buffer(encode_message(address, value))
+        self.instruments.reset()
+
+
+class FrameArrayMixin(object):
+    """
+    Snapshot each frame's (tracked) hands into a NumPy `FrameArray` and run
+    the per-value transforms (`transform_frame_array`) over the whole frame
+    at once, instead of calling `pre_send_x/y/z` for every value.
+
+    Must come before any mixin defining `pre_send_x/y/z` (e.g. 
+    `LinearScalingMixin`) and before `RealPartTrackerMixin` in the
+    inheritance chain. Mixins which look at the values being sent (e.g.
+    `DeltaMixin`) see them already transformed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if FrameArray is None:
+            raise ImportError("FrameArrayMixin requires NumPy")
+        self.frame_array = FrameArray()
+        self._zero_vector = None
+        super(FrameArrayMixin,self).__init__(*args, **kwargs)
+
+    def pre_send_x(self, val):
+        return val
+    def pre_send_y(self, val):
+        return val
+    def pre_send_z(self, val):
+        return val
+
+    def zero_vector(self):
+        # Lost hands are zeroed outside of any frame; transform the zero
+        # vector just as `pre_send_x/y/z` would have
+        if self._zero_vector is None:
+            zero = HandState(0, ZERO_VECTOR, ZERO_VECTOR, [])
+            frame_array = FrameArray(1, 0).fill([zero])
+            self.transform_frame_array(frame_array)
+            self._zero_vector = tuple(frame_array.hands[0, 0, 0:3].tolist())
+        return self._zero_vector
+
+    def get_hands(self, frame):
+        if isinstance(frame, ResampledFrame):
+            return frame.hands
+        frame_array = self.frame_array.fill(
+                        super(FrameArrayMixin,self).get_hands(frame))
+        self.transform_frame_array(frame_array)
+        return frame_array.to_hands()
+
+
+class SmoothingMixin(object):
+    """
+    Smooth the positions and directions of the tracked hands and fingers
+    with a One Euro filter (see `smoothing.OneEuroFilter`), for the whole
+    frame at once, before they are sent.
+
+    Must come before `RealPartTrackerMixin` in the inheritance chain, and
+    needs its (small) ids. A part's filter starts over whenever the
+    tracker zeroes or drops it.
+    """
+
+    def __init__(self, smooth_min_cutoff=1.0, smooth_beta=0.01, *args,
+                **kwargs):
+        if OneEuroFilter is None:
+            raise ImportError("SmoothingMixin requires NumPy")
+        self.smoothing_array = FrameArray()
+        self.smoothing_filter = OneEuroFilter(smooth_min_cutoff, smooth_beta)
+        self._smoothed = (None, None)
+        super(SmoothingMixin,self).__init__(*args, **kwargs)
+
+    def get_hands(self, frame):
+        # Only filter each frame once, however often it's asked for
+        timestamp, hands = self._smoothed
+        if timestamp == frame.timestamp:
+            return hands
+        frame_array = self.smoothing_array.fill(
+                        super(SmoothingMixin,self).get_hands(frame))
+        self.smoothing_filter(frame_array, frame.timestamp / 1e6)
+        hands = frame_array.to_hands()
+        self._smoothed = (frame.timestamp, hands)
+        return hands
+
+
+class MetricsMixin(object):
+    """
+    Also send values derived from each frame's (tracked) hands, after
+    them, for the `metrics` named (see metrics.py):
+
+    - `velocity`: `/hand<n>/palm/v[xyz]` and `/hand<n>/finger<n>/v[xyz]`,
+      in mm/s
+    - `pinch`: `/hand<n>/pinch`, mm between the thumb and index fingertips
+    - `spread`: `/hand<n>/spread`, mean mm of the fingertips from their
+      centre
+    - `extended`: `/hand<n>/extended_count`, how many fingers are extended
+
+    They are worked out for the whole frame at once, and only those whose
+    addresses are being sent (e.g. subscribed to.) Needs the tracker's
+    (small) ids.
+    """
+
+    def __init__(self, metrics=(), *args, **kwargs):
+        if HandMetrics is None:
+            raise ImportError("MetricsMixin requires NumPy")
+        self.hand_metrics = HandMetrics()
+        part = tuple(PART_FIELDS[m] for m in METRICS
+                    if m in metrics and m in PART_FIELDS)
+        self.hand_metric_fields = tuple(HAND_FIELDS[m] for m in METRICS
+                                    if m in metrics and m in HAND_FIELDS)
+        self.finger_fields = self.finger_fields + part
+        self.palm_fields = self.palm_fields + part + self.hand_metric_fields
+        super(MetricsMixin,self).__init__(*args, **kwargs)
+
+    def send_derived(self, frame, hands):
+        super(MetricsMixin,self).send_derived(frame, hands)
+        metrics = self.hand_metrics.measure(hands, frame_seconds(frame))
+
+        send_part_vector = self.send_part_vector
+        send_part_value = self.send_part_value
+        part_fields = self.part_fields
+        velocity = PART_FIELDS[VELOCITY]
+        for i, hand in enumerate(hands):
+            hand_id = hand.id
+            fields = part_fields(hand_id, None)
+            if velocity in fields:
+                send_part_vector(hand_id, None, velocity,
+                                metrics.velocities[i][0])
+            for j, finger in enumerate(hand.fingers):
+                if velocity in part_fields(hand_id, finger.id):
+                    send_part_vector(hand_id, finger.id, velocity,
+                                    metrics.velocities[i][j + 1])
+            for field in self.hand_metric_fields:
+                if field in fields:
+                    send_part_value(hand_id, None, field,
+                                    getattr(metrics, field)[i])
+
 
 class RealPartTrackerMixin(object):
     """
@@ -544,16 +2077,17 @@ class RealPartTrackerMixin(object):
     - Hand and finger IDs are always lowest possible values (starting at 1)
     - "Zero out" hand and finger data when the part is no longer tracked 
         (send multiple (0.0,0.0,0.0) Vectors.)
+    - Optionally keep a part's ID when Leap gives it a new one, if it's
+        within `reassociate_mm` of where the part was last seen
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, reassociate_mm=None, *args, **kwargs):
         super(RealPartTrackerMixin, self).__init__(*args,**kwargs)
-        self.real_hands_tracker = RealHandTracker()
+        self.real_hands_tracker = RealHandTracker(reassociate_mm=reassociate_mm)
 
-    def on_frame(self, controller):
-        self.real_hands_tracker.frame_tick(controller.frame())
-        r = super(RealPartTrackerMixin,self).on_frame(controller)
-        return r
+    def track_frame(self, frame):
+        self.real_hands_tracker.frame_tick(frame)
+        super(RealPartTrackerMixin,self).track_frame(frame)
 
     def get_hands(self, frame):
         return self.real_hands_tracker.hands
@@ -563,22 +2097,31 @@ class RealPartTrackerMixin(object):
 class LinearScalingMixin(object):
 
     def __init__(self, x_mm_min=None, x_mm_max=None, y_mm_min=None, y_mm_max=None, 
-                    z_mm_min=None, z_mm_max=None, *args, **kwargs):
+                    z_mm_min=None, z_mm_max=None, clamp=False, *args, **kwargs):
         self.x_mm_min = x_mm_min
         self.x_mm_max = x_mm_max
         self.y_mm_min = y_mm_min
         self.y_mm_max = y_mm_max
         self.z_mm_min = z_mm_min
         self.z_mm_max = z_mm_max
+        self.clamp = clamp
+        if FrameArray is not None:
+            self.linear_scaling = LinearScaling((x_mm_min, y_mm_min, z_mm_min),
+                                    (x_mm_max, y_mm_max, z_mm_max), clamp)
         super(LinearScalingMixin,self).__init__(*args, **kwargs)
 
     def _calc(self, name, val):
         min_ = getattr(self,'%s_mm_min' % name)
         max_ = getattr(self,'%s_mm_max' % name)
         if min_ is not None and max_ is not None:
-            return (float(val - min_) / (max_ - min_)) - 0.5
-        else:
-            return val
+            val = (float(val - min_) / (max_ - min_)) - 0.5
+            if self.clamp:
+                val = min(max(val, -0.5), 0.5)
+        return val
+
+    def transform_frame_array(self, frame_array):
+        self.linear_scaling.scale_frame(frame_array)
+        super(LinearScalingMixin,self).transform_frame_array(frame_array)
 
     def pre_send_x(self,val):
         return self._calc('x', val) 
@@ -597,32 +2140,126 @@ class LinearScalingMixin(object):
 ###############################
 
 
-class RuntimeLeapListener(OSCLeapListener):
+class Stage(object):
     """
-    This class is the one run by the cli script.
-    It has its inheritance chain dynamically altered (by adding mixins)
-    depending on the options the user selected
+    One optional stage of the listener the cli script runs: `mixin` is
+    used when `enabled(options)` is true, and given the keyword arguments
+    `kwargs(options)`.
     """
-    pass
 
+    def __init__(self, name, mixin, enabled, kwargs=None):
+        self.name = name
+        self.mixin = mixin
+        self.enabled = enabled
+        self.kwargs = kwargs or (lambda options: {})
+
+    def __repr__(self):
+        return "<Stage %s %s>" % (self.name, self.mixin.__name__)
+
+
+def _bundled(options):
+    return not (options.blob_format or options.unbundled or
+                options.pyosc_bundles)
+
+# Outermost first; i.e. in the order of the listener's inheritance chain.
+# Each frame comes in through the source stages (recording, queueing,
+# resampling), is snapshotted, tracked and smoothed, then encoded, and the
+# encoding is numbered and sent by the transport stages.
+#
+# Stages are mixins, which pass each frame on to the next with `super()`;
+# one can be swapped for another by giving `make_listener` a different
+# list, but is only built (or benchmarked) as part of a whole listener.
+# Only sending each part value is specialized into direct calls, once the
+# listener is built (see `BundledMixin.specialize`.)
+PIPELINE = [
+    Stage('record', RecordingMixin, lambda o: o.record_path,
+        lambda o: dict(record_path=o.record_path)),
+    Stage('instrument', InstrumentationMixin, lambda o: o.instrument,
+        lambda o: dict(stats_format=o.stats_format)),
+    Stage('queue', SenderThreadMixin, lambda o: o.queue_size,
+        lambda o: dict(queue_size=o.queue_size, overflow=o.overflow)),
+    Stage('output-rate', FixedRateMixin, lambda o: o.output_rate,
+        lambda o: dict(output_rate=o.output_rate, resample=o.resample)),
+    Stage('adaptive', AdaptiveQualityMixin, lambda o: o.adaptive,
+        lambda o: dict(degrade_load=o.degrade_load,
+                    recover_load=o.recover_load)),
+    Stage('numpy', FrameArrayMixin, lambda o: o.numpy),
+    Stage('timetags', LeapTimetagMixin, lambda o: _bundled(o) and o.timetags),
+    Stage('bundle', BundledMixin, _bundled,
+        lambda o: dict(max_datagram=o.max_datagram)),
+    Stage('pyosc-bundle', PyOSCBundledMixin,
+        lambda o: o.pyosc_bundles and not (o.blob_format or o.unbundled)),
+    Stage('blob', FrameBlobMixin, lambda o: o.blob_format,
+        lambda o: dict(blob_format=o.blob_format, blob_scale=o.blob_scale)),
+    Stage('smooth', SmoothingMixin, lambda o: o.smooth,
+        lambda o: dict(smooth_min_cutoff=o.smooth_min_cutoff,
+                    smooth_beta=o.smooth_beta)),
+    Stage('metrics', MetricsMixin, lambda o: o.metrics,
+        lambda o: dict(metrics=o.metrics)),
+    Stage('track', RealPartTrackerMixin, lambda o: not o.dumb,
+        lambda o: dict(reassociate_mm=o.reassociate_mm)),
+    Stage('rates', RateLimitMixin, lambda o: o.rate_schedule,
+        lambda o: dict(rate_schedule=o.rate_schedule)),
+    Stage('delta', DeltaMixin, lambda o: o.delta,
+        lambda o: dict(deadband_mm=o.deadband_mm,
+                    deadband_degrees=o.deadband_degrees,
+                    keyframe_frames=o.keyframe_frames,
+                    keyframe_ms=o.keyframe_ms)),
+    Stage('multi-arg', VectorAsArgsMixin, lambda o: o.multi_arg),
+    Stage('subscribe', SubscriptionMixin, lambda o: o.subscribe_port,
+        lambda o: dict(subscribe_port=o.subscribe_port)),
+    Stage('sequence', SequenceMixin, lambda o: o.sequence),
+    Stage('fanout', FanOutMixin, lambda o: o.destinations,
+        lambda o: dict(destinations=o.destinations)),
+]
+
+
+def listener_class(stages):
+    """
+    `OSCLeapListener` with the mixins of `stages` (outermost first.)
+    """
+    return type('RuntimeLeapListener',
+                tuple(stage.mixin for stage in stages) + (OSCLeapListener,),
+                {})
 
-def main(options, hostname, port):
 
-    # Now we append Mixin classes to our LeapListener's inheritance
-    # chain based on the options the user specified
-    # 
-    def runtime_mixin(class_, mixin):
-        class_.__bases__ = (mixin,) + class_.__bases__
-
-    if options.multi_arg:
-        runtime_mixin(RuntimeLeapListener, VectorAsArgsMixin)
-    if not options.dumb:
-        runtime_mixin(RuntimeLeapListener, RealPartTrackerMixin)
-    if not options.unbundled:
-        runtime_mixin(RuntimeLeapListener, BundledMixin)
-    # ok, that was weird. Now instantiate this listener
-    listener = RuntimeLeapListener(hostname=hostname, port=int(port),
-                        verbose=options.verbose)
+def make_listener(options, hostname, port, stages=PIPELINE):
+    """
+    The listener for `options`, built from the `stages` (`PIPELINE`, or
+    a variation of it) they enable; composed once, then specialized (see
+    `OSCLeapListener.specialize`.)
+    """
+    LOG.level = VERBOSE if options.verbose else INFO
+    stages = [stage for stage in stages if stage.enabled(options)]
+    listener_kwargs = {}
+    for stage in stages:
+        listener_kwargs.update(stage.kwargs(options))
+    listener = listener_class(stages)(hostname=hostname, port=int(port),
+                        verbose=options.verbose, **listener_kwargs)
+    listener.specialize()
+    return listener
+
+
+def run_listener(options, listener):
+    """
+    Hand `listener` frames from the Leap, or the recording being replayed,
+    until Enter is pressed (or the replay is over.)
+    """
+    if options.replay_path:
+        controller = ReplayController(FrameReader(options.replay_path),
+                                    speed=options.replay_speed)
+        controller.add_listener(listener)
+
+        # Keep this process running until the replay is over
+        log("Replaying '%s', press Ctrl-C to quit...\n" % options.replay_path)
+        try:
+            while controller.is_playing():
+                time.sleep(0.1)
+        except KeyboardInterrupt:
+            pass
+        controller.remove_listener(listener)
+        return
+
     controller = Leap.Controller()
     controller.set_policy(Leap.Controller.POLICY_BACKGROUND_FRAMES)
     controller.add_listener(listener)
@@ -633,9 +2270,41 @@ def main(options, hostname, port):
     controller.remove_listener(listener)
 
 
-if __name__ == "__main__":
+def run_worker(ring, options, hostname, port):
+    """
+    The worker process for `--processes`: everything but reading the Leap,
+    for the frames it is handed through `ring`.
+    """
+    listener = make_listener(options, hostname, port)
+    try:
+        SharedRingController(ring.reader()).play(listener)
+    finally:
+        # The worker process exits without running atexit handlers
+        LOG.close()
+
 
+def main(options, hostname, port):
+    if not options.processes:
+        run_listener(options, make_listener(options, hostname, port))
+        return
+
+    # The worker gets every frame through a shared memory ring
+    ring = SharedFrameRing()
+    worker = multiprocessing.Process(target=run_worker, name="leapyosc-worker",
+                        args=(ring, options, hostname, port))
+    worker.start()
+    try:
+        run_listener(options, SharedRingWriterListener(ring))
+    finally:
+        ring.close()
+        worker.join()
+        ring.release()
+
+
+def make_parser():
     parser = OptionParser(usage="usage: %prog [options] [host] [port]")
+    # Read from --rates by `check_options`
+    parser.set_defaults(rate_schedule=None)
 
     #parser.add_option("-a", "--host", dest="host", type="string", 
     #    action="store", default="localhost", 
@@ -654,7 +2323,8 @@ if __name__ == "__main__":
             "`/hand1/palm/dy 0.32` `/hand1/palm/dz 0.12`.")
 
     parser.add_option("-v", "--verbose", dest="verbose", action="store_true", 
-        help="Be more talkative")
+        help="Be more talkative; e.g. log every part zeroed or dropped when "
+        "it's lost, instead of how many were once a second")
 
     parser.add_option("-d", "--dumb", dest="dumb", action="store_true",
         help="Disable smart real hand tracking; This will cause raw hand and " 
@@ -662,12 +2332,248 @@ if __name__ == "__main__":
         "IDs are maintained; this means, for instance, that a hand wont have " 
         "fingers with IDs `3, 8, 17,` instead they are mapped to `1, 2, 3`.")
 
+    parser.add_option("--reassociate-mm", dest="reassociate_mm", type="float",
+        action="store", default=None,
+        help="When Leap gives a hand or finger a new ID, keep its 'realistic' "
+        "ID if it is within N mm of a hand or finger which just went missing "
+        "(requires NumPy)")
+
+    parser.add_option("--smooth", dest="smooth", action="store_true",
+        help="Take the jitter out of positions and directions with a One "
+        "Euro filter (adaptive low-pass; requires NumPy and tracking)")
+
+    parser.add_option("--smooth-min-cutoff", dest="smooth_min_cutoff",
+        type="float", action="store", default=1.0,
+        help="With --smooth; the filter's cutoff (in Hz) for a part which is "
+        "keeping still. Lower is smoother but lags more (defaults to 1.0)")
+
+    parser.add_option("--smooth-beta", dest="smooth_beta", type="float",
+        action="store", default=0.01,
+        help="With --smooth; how much the cutoff goes up per mm/s a part is "
+        "moving. Higher lags less when moving fast (defaults to 0.01)")
+
+    parser.add_option("--metric", dest="metrics", action="append",
+        default=[], metavar="NAME",
+        help="Also send NAME, worked out from each frame's hands: 'velocity' "
+        "(of the palms and fingertips), 'pinch' (thumb to index fingertip "
+        "distance), 'spread' (of the fingertips) or 'extended' (how many "
+        "fingers are); may be given more than once (requires NumPy and "
+        "tracking)")
+
     parser.add_option("-u", "--unbundled", dest="unbundled", action="store_true",
         help="Turn off bundling of OSC message; each addressable message is sent "
         "individually. By default, each Leap 'frame' is bundled into a single "
         "OSC message.")
 
+    parser.add_option("-D", "--destination", dest="destinations",
+        action="append", default=[], metavar="HOST:PORT[=PATTERN,...]",
+        help="Also send to HOST:PORT (may be given more than once), "
+        "optionally only the addresses matching (or under) the glob "
+        "PATTERNs, e.g. `-D visuals:9000=/hand*/palm`. Each frame is still "
+        "only encoded once.")
+
+    parser.add_option("--pyosc-bundles", dest="pyosc_bundles",
+        action="store_true",
+        help="Build bundles with pyOSC's `OSCBundle` instead of the built-in "
+        "bundle encoder. The bytes sent are the same, but slower to produce.")
+
+    parser.add_option("--max-datagram", dest="max_datagram", type="int",
+        action="store", default=None,
+        help="Split a frame's bundle into bundles of at most N bytes (with "
+        "the same timetag) rather than send one which will be IP fragmented; "
+        "e.g. 1472 for a 1500 byte ethernet MTU. By default there's no limit.")
+
+    parser.add_option("--timetags", dest="timetags", action="store_true",
+        help="Timetag each bundle with when the Leap captured the frame, "
+        "instead of 'immediately', for receivers which buffer out jitter "
+        "(see test_server.py --jitter-buffer)")
+
+    parser.add_option("--sequence", dest="sequence", action="store_true",
+        help="Start each bundle with a `/seq N` message counting the bundles "
+        "sent, so a receiver can measure packet loss and reordering (see "
+        "test_server.py)")
+
+    parser.add_option("--subscribe-port", dest="subscribe_port", type="int",
+        action="store", default=None, metavar="PORT",
+        help="Listen on PORT for `/subscribe PATTERN...` and `/unsubscribe "
+        "PATTERN...` messages, and only send (or even read from the Leap) "
+        "the subscribed addresses once anything has subscribed")
+
+    parser.add_option("--blob", dest="blob_format", type="choice",
+        choices=list(BLOB_FORMATS), default=None, metavar="FORMAT",
+        help="Send each frame as one `/frame` message with the hands and "
+        "fingers packed into a blob of 'float32' or 'int16' (fixed point) "
+        "values (see frameblob.py for the layout) instead of a message per "
+        "value")
+
+    parser.add_option("--blob-scale", dest="blob_scale", type="float",
+        action="store", default=10.0,
+        help="With --blob int16; positions are sent multiplied by N "
+        "(defaults to 10, i.e. 0.1 mm)")
+
+    parser.add_option("--delta", dest="delta", action="store_true",
+        help="Only send values which have changed by more than a deadband "
+        "since they were last sent, plus a full 'keyframe' every so often.")
+
+    parser.add_option("--deadband-mm", dest="deadband_mm", type="float",
+        action="store", default=1.0,
+        help="With --delta; minimum change in a position (in mm) before it is "
+        "resent (defaults to 1.0)")
+
+    parser.add_option("--deadband-degrees", dest="deadband_degrees",
+        type="float", action="store", default=1.0,
+        help="With --delta; minimum change in a direction (in degrees) before "
+        "it is resent (defaults to 1.0)")
+
+    parser.add_option("--keyframe-frames", dest="keyframe_frames", type="int",
+        action="store", default=None,
+        help="With --delta; send every value at least every N frames")
+
+    parser.add_option("--keyframe-ms", dest="keyframe_ms", type="int",
+        action="store", default=1000,
+        help="With --delta; send every value at least every N milliseconds "
+        "(defaults to 1000)")
+
+    parser.add_option("--rates", dest="rate_path", type="string",
+        action="store", default=None,
+        help="Send the fields whose addresses match the patterns in FILE "
+        "no more often than the rates, and in the order of the priorities, "
+        "given with them; lines of 'pattern rate|full [priority]' (see "
+        "rates.py). Integer fields, e.g. 'extended', are still sent as soon "
+        "as they change. Priorities only order each frame's messages, so "
+        "only make higher priority fields arrive sooner with --unbundled.")
+
+    parser.add_option("-q", "--queue", dest="queue_size", type="int",
+        action="store", default=None,
+        help="Queue up to N frames for a separate sender thread instead of "
+        "tracking, encoding and sending them inside the Leap callback.")
+
+    parser.add_option("--overflow", dest="overflow", type="choice",
+        choices=list(OVERFLOW_POLICIES), default=DROP_OLDEST,
+        help="With --queue; what to do with frames when the queue is full: "
+        "'drop-oldest' (default), 'drop-newest' or 'coalesce' (only the "
+        "latest queued frame is ever sent)")
+
+    parser.add_option("-r", "--output-rate", dest="output_rate", type="float",
+        action="store", default=None,
+        help="Send hand data at a fixed rate of N times a second instead of "
+        "once per Leap frame.")
+
+    parser.add_option("--resample", dest="resample", type="choice",
+        choices=list(RESAMPLE_MODES), default=INTERPOLATE,
+        help="With --output-rate; 'interpolate' (default) between the last "
+        "two Leap frames or send the 'latest' one.")
+
+    parser.add_option("--adaptive", dest="adaptive", action="store_true",
+        help="When tracking and sending frames can't keep up with the Leap, "
+        "step down what's sent (first leaving out finger directions, then "
+        "sending vectors as one message, coarser --delta deadbands, then "
+        "only every other frame) until it can, and back up again after")
+
+    parser.add_option("--degrade-load", dest="degrade_load", type="float",
+        action="store", default=0.9,
+        help="With --adaptive; step down when more than this fraction of "
+        "the time between frames is spent on them (defaults to 0.9)")
+
+    parser.add_option("--recover-load", dest="recover_load", type="float",
+        action="store", default=0.5,
+        help="With --adaptive; step back up when less than this fraction "
+        "is (defaults to 0.5)")
+
+    parser.add_option("--numpy", dest="numpy", action="store_true",
+        help="Snapshot each frame into NumPy arrays and transform values "
+        "for the whole frame at once (requires NumPy)")
+
+    parser.add_option("--instrument", dest="instrument", action="store_true",
+        help="Time each stage of handling a frame (fetch, track, encode, "
+        "send) and the Leap-to-sent latency, and log their percentiles "
+        "with the stats once a second")
+
+    parser.add_option("--stats-format", dest="stats_format", type="choice",
+        choices=list(STATS_FORMATS), default='text',
+        help="With --instrument; also log the timings as a 'json' line, or "
+        "send them as '/stats/...' 'osc' messages (default 'text' only)")
+
+    parser.add_option("--processes", dest="processes", type="int",
+        action="store", default=None,
+        help="Only read Leap frames in this process, handing them through "
+        "shared memory to a worker process which tracks, encodes and sends "
+        "them, so the cost of that doesn't add to when frames are read. The "
+        "work isn't split up: 1 is the only number of workers supported.")
+
+    parser.add_option("--record", dest="record_path", type="string",
+        action="store", default=None,
+        help="Record every Leap frame to FILE (for replaying with --replay)")
+
+    parser.add_option("--replay", dest="replay_path", type="string",
+        action="store", default=None,
+        help="Replay the frames recorded in FILE instead of reading them "
+        "from the Leap")
+
+    parser.add_option("--replay-speed", dest="replay_speed", type="float",
+        action="store", default=1.0,
+        help="With --replay; play back N times faster than recorded, or as "
+        "fast as possible if 0 (defaults to 1.0)")
+
+    return parser
+
+
+def check_options(parser, opts):
+    """
+    Parse the --destination's, and exit with a usage error for options
+    which can't be used (together.)
+    """
+    try:
+        opts.destinations = [Destination.parse(d) for d in opts.destinations]
+    except ValueError as e:
+        parser.error(str(e))
+    if opts.max_datagram and (opts.pyosc_bundles or opts.unbundled):
+        parser.error("--max-datagram needs the (default) built-in bundling")
+    if opts.timetags and (opts.pyosc_bundles or opts.unbundled):
+        parser.error("--timetags needs the (default) built-in bundling")
+    if opts.sequence and (opts.pyosc_bundles or opts.unbundled):
+        parser.error("--sequence needs the (default) built-in bundling")
+    if opts.destinations and opts.pyosc_bundles:
+        parser.error("--destination can't be used with --pyosc-bundles")
+    if opts.processes is not None and opts.processes != 1:
+        parser.error("--processes only supports 1 worker process")
+    if opts.blob_format and (opts.multi_arg or opts.delta or opts.sequence or
+            opts.subscribe_port or opts.pyosc_bundles or opts.max_datagram or
+            opts.timetags or opts.metrics or opts.rate_path):
+        parser.error("--blob can't be used with --multi-arg-vector, --delta, "
+                    "--sequence, --subscribe-port, --metric, --rates or "
+                    "bundling options")
+    if opts.numpy and FrameArray is None:
+        parser.error("--numpy requires NumPy to be installed")
+    if opts.smooth and OneEuroFilter is None:
+        parser.error("--smooth requires NumPy to be installed")
+    if opts.smooth and opts.dumb:
+        parser.error("--smooth needs tracking (it can't be used with --dumb)")
+    if opts.reassociate_mm is not None and match_nearest is None:
+        parser.error("--reassociate-mm requires NumPy to be installed")
+    if opts.metrics and HandMetrics is None:
+        parser.error("--metric requires NumPy to be installed")
+    for name in opts.metrics:
+        if name not in METRICS:
+            parser.error("Unknown --metric '%s' (choose from %s)" % (name,
+                        ", ".join("'%s'" % m for m in METRICS)))
+    if opts.metrics and opts.dumb:
+        parser.error("--metric needs tracking (it can't be used with --dumb)")
+    if not 0 < opts.recover_load < opts.degrade_load:
+        parser.error("--recover-load must be more than 0 and less than "
+                    "--degrade-load")
+    if opts.rate_path:
+        try:
+            opts.rate_schedule = RateSchedule.load(opts.rate_path)
+        except (IOError, ValueError) as e:
+            parser.error("--rates: %s" % e)
+
+
+if __name__ == "__main__":
+
+    parser = make_parser()
     (opts, args_) = parser.parse_args() # Default is sys.argv[1:]
+    check_options(parser, opts)
 
     port = None
     if len(args_) < 1:
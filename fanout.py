@@ -0,0 +1,137 @@
+#
+#
+# Leapyosc
+# Sending the same OSC packets to several destinations
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+import errno
+import re
+import socket
+from fnmatch import translate
+
+from oscpack import (BUNDLE_HEADER, as_bytes, message_address, bundle_elements,
+                    filter_bundle)
+
+
+class AddressFilter(object):
+    """
+    Accepts OSC addresses matching any of a list of glob patterns, or
+    starting with one followed by a `/`; so `/hand*/palm` and
+    `/hand*/palm/*` both accept `/hand1/palm/tx`.
+
+    Each address is only matched against the patterns once.
+    """
+
+    def __init__(self, patterns, max_entries=4096):
+        self.patterns = tuple(patterns)
+        self._regex = re.compile("|".join(
+                        "(?:%s)|(?:%s)" % (translate(p), translate(p + "/*"))
+                        for p in self.patterns))
+        self._accepted = {}
+        self.max_entries = max_entries
+
+    def __call__(self, address):
+        try:
+            return self._accepted[address]
+        except KeyError:
+            if len(self._accepted) >= self.max_entries:
+                self._accepted.clear()
+            accepted = self._accepted[address] = \
+                            self._regex.match(address) is not None
+            return accepted
+
+
+class Destination(object):
+    """
+    Where to send, and which addresses (all of them if `patterns` is empty.)
+    """
+
+    def __init__(self, hostname, port, patterns=()):
+        self.address = (hostname, int(port))
+        self.sockaddr = self.address
+        self.patterns = tuple(patterns)
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def __str__(self):
+        return "%s:%s%s" % (self.address[0], self.address[1],
+                        "=%s" % ",".join(self.patterns) if self.patterns else "")
+
+    @classmethod
+    def parse(cls, spec):
+        """
+        From `host:port` or `host:port=pattern[,pattern...]`
+        """
+        spec, _, patterns = spec.partition("=")
+        hostname, _, port = spec.rpartition(":")
+        if not hostname or not port.isdigit():
+            raise ValueError("Expected host:port[=pattern,...], got '%s'" % spec)
+        return cls(hostname, int(port),
+                    [p for p in patterns.split(",") if p])
+
+
+class FanOut(object):
+    """
+    Sends packets to several `Destination`s from one non-blocking UDP
+    socket.
+
+    Destinations with the same patterns share one filtered copy of each
+    bundle, cut out of the full encoding. A destination which can't keep up
+    (or isn't there) only loses its own packets.
+    """
+
+    def __init__(self, destinations):
+        self.destinations = list(destinations)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        groups = {}
+        for destination in self.destinations:
+            # Resolve host names once, rather than on every send
+            destination.sockaddr = (socket.gethostbyname(destination.address[0]),
+                                    destination.address[1])
+            groups.setdefault(destination.patterns, []).append(destination)
+        # (filter or None, destinations); unfiltered first
+        self.groups = [(AddressFilter(patterns) if patterns else None, group)
+                        for patterns, group in sorted(groups.items())]
+
+    def send(self, packet, elements=None):
+        """
+        Send an encoded message or bundle; for a bundle, `elements` saves
+        finding where each message in it is (see `IndexedBundleEncoder`.)
+        """
+        is_bundle = as_bytes(packet[:len(BUNDLE_HEADER)]) == BUNDLE_HEADER
+        for keep, destinations in self.groups:
+            if keep is None:
+                data = packet
+            elif is_bundle:
+                if elements is None:
+                    elements = bundle_elements(packet)
+                data = filter_bundle(packet, elements, keep)
+                if data is None:
+                    continue
+            elif keep(message_address(packet)):
+                data = packet
+            else:
+                continue
+            for destination in destinations:
+                self.sendto(data, destination)
+
+    def sendto(self, data, destination):
+        try:
+            self.socket.sendto(data, destination.sockaddr)
+        except socket.error as e:
+            if e.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK, errno.ENOBUFS):
+                destination.dropped += 1
+            else:
+                destination.errors += 1
+            return
+        destination.packets_sent += 1
+        destination.bytes_sent += len(data)
+
+    def close(self):
+        self.socket.close()
@@ -0,0 +1,174 @@
+#
+#
+# Leapyosc
+# Whole frames packed into a single OSC message
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+import struct
+
+from oscpack import INT32, osc_string, as_bytes, decode_message
+
+
+# A frame is sent as one OSC message, `/frame ,b <blob>`. The blob is
+# (all big-endian, as OSC is):
+#
+#   header  version (u8), format (u8: 0 float32, 1 int16), hand count (u8),
+#           pad (1), sequence (u32, counts frames sent), Leap frame id
+#           (i64, -1 for a resampled tick), timestamp (i64, microseconds;
+#           the Leap's, or local Unix time for a resampled tick),
+#           position scale (f32, see below)
+#   hand    id (i32), finger count (u8), pad (3), palm position x y z,
+#           palm normal x y z; followed by that hand's fingers
+#   finger  id (i32), extended (u8), pad (3), tip position x y z,
+#           direction x y z
+#
+# Values are float32, or with the int16 format fixed point: positions
+# multiplied by the position scale (so 10 is 0.1 mm resolution, to about
+# +-3.2 m), directions and normals by 32767. Hands and fingers which the
+# frame doesn't have are simply not there; there is no zeroing.
+BLOB_VERSION = 1
+
+FLOAT32 = 'float32'
+INT16 = 'int16'
+
+BLOB_FORMATS = (FLOAT32, INT16)
+
+HEADER = struct.Struct('>BBBxIqqf')
+PARTS = {
+    FLOAT32: struct.Struct('>iB3x6f'),
+    INT16: struct.Struct('>iB3x6h'),
+}
+DIRECTION_SCALE = 32767.0
+
+ADDRESS = '/frame'
+
+
+class FrameBlobEncoder(object):
+    """
+    Encodes a frame's hands as a complete `/frame` OSC message (see the
+    layout above), into a reusable buffer.
+    """
+
+    def __init__(self, format=FLOAT32, position_scale=10.0, address=ADDRESS):
+        if format not in BLOB_FORMATS:
+            raise ValueError("Unknown blob format '%s'" % format)
+        self.format = format
+        self.format_code = BLOB_FORMATS.index(format)
+        self.position_scale = position_scale if format == INT16 else 1.0
+        self.part = PARTS[format]
+        self.prefix = osc_string(address) + osc_string(',b')
+        self.buffer = bytearray(4096)
+        self.sequence = 0
+
+    def _reserve(self, size):
+        if size > len(self.buffer):
+            self.buffer = bytearray(max(size, len(self.buffer) * 2))
+
+    def encode(self, frame_id, timestamp, hands):
+        """
+        `hands` is a list of `(id, palm_position, palm_normal, fingers)`,
+        with `fingers` a list of `(id, tip_position, direction, extended)`.
+        """
+        part = self.part
+        size = HEADER.size + part.size * (len(hands) +
+                                        sum(len(h[3]) for h in hands))
+        start = len(self.prefix) + INT32.size
+        end = start + size
+        padded = (end + 3) & ~3
+        self._reserve(padded)
+        buffer = self.buffer
+        buffer[:len(self.prefix)] = self.prefix
+        INT32.pack_into(buffer, len(self.prefix), size)
+        HEADER.pack_into(buffer, start, BLOB_VERSION, self.format_code,
+                        len(hands), self.sequence, frame_id, timestamp,
+                        self.position_scale)
+        offset = start + HEADER.size
+        if self.format == INT16:
+            pack = self._pack_int16
+        else:
+            pack = part.pack_into
+        for hand_id, position, normal, fingers in hands:
+            pack(buffer, offset, hand_id, len(fingers), position[0],
+                position[1], position[2], normal[0], normal[1], normal[2])
+            offset += part.size
+            for finger_id, tip, direction, extended in fingers:
+                pack(buffer, offset, finger_id, 1 if extended else 0, tip[0],
+                    tip[1], tip[2], direction[0], direction[1], direction[2])
+                offset += part.size
+        buffer[end:padded] = b"\0" * (padded - end)
+        self.sequence = (self.sequence + 1) & 0xffffffff
+        return memoryview(buffer)[:padded]
+
+    def _pack_int16(self, buffer, offset, id, count, px, py, pz, dx, dy, dz):
+        p = self.position_scale
+        d = DIRECTION_SCALE
+        self.part.pack_into(buffer, offset, id, count,
+                            _int16(px * p), _int16(py * p), _int16(pz * p),
+                            _int16(dx * d), _int16(dy * d), _int16(dz * d))
+
+
+def _int16(value):
+    return max(-32768, min(32767, int(round(value))))
+
+
+class BlobFrame(object):
+    """
+    A decoded `/frame` blob; `hands` are `(id, palm_position, palm_normal,
+    fingers)` with `fingers` `(id, tip_position, direction, extended)`, as
+    given to `FrameBlobEncoder.encode`.
+    """
+
+    __slots__ = ('sequence', 'id', 'timestamp', 'hands')
+
+    def __init__(self, sequence, id, timestamp, hands):
+        self.sequence = sequence
+        self.id = id
+        self.timestamp = timestamp
+        self.hands = hands
+
+
+def decode_frame_blob(blob):
+    """
+    The `BlobFrame` packed in a `/frame` message's blob
+    """
+    blob = as_bytes(blob)
+    version, format_code, hand_count, sequence, frame_id, timestamp, scale = \
+                    HEADER.unpack_from(blob, 0)
+    if version != BLOB_VERSION:
+        raise ValueError("Unsupported frame blob version %s" % version)
+    format = BLOB_FORMATS[format_code]
+    part = PARTS[format]
+    if format == INT16:
+        p, d = 1.0 / scale, 1.0 / DIRECTION_SCALE
+    offset = HEADER.size
+    hands = []
+    for _ in range(hand_count):
+        values = part.unpack_from(blob, offset)
+        offset += part.size
+        fingers = []
+        for _ in range(values[1]):
+            f = part.unpack_from(blob, offset)
+            offset += part.size
+            if format == INT16:
+                fingers.append((f[0], (f[2] * p, f[3] * p, f[4] * p),
+                                (f[5] * d, f[6] * d, f[7] * d), bool(f[1])))
+            else:
+                fingers.append((f[0], f[2:5], f[5:8], bool(f[1])))
+        if format == INT16:
+            hands.append((values[0], (values[2] * p, values[3] * p,
+                                    values[4] * p),
+                        (values[5] * d, values[6] * d, values[7] * d), fingers))
+        else:
+            hands.append((values[0], values[2:5], values[5:8], fingers))
+    return BlobFrame(sequence, frame_id, timestamp, hands)
+
+
+def decode_frame_message(binary):
+    """
+    The `BlobFrame` in an encoded `/frame` message
+    """
+    address, args = decode_message(binary)
+    return decode_frame_blob(args[0])
@@ -0,0 +1,168 @@
+#
+#
+# Leapyosc
+# NumPy snapshots of whole Leap frames
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+import numpy as np
+
+from scheduler import FingerState, HandState, UNKNOWN_TYPE
+
+
+# Columns of each row of a `FrameArray`. Row 0 of each hand is the palm
+# (position, normal, unused); rows 1.. are its fingers (tip, direction, extended)
+POSITION = slice(0, 3)
+DIRECTION = slice(3, 6)
+EXTENDED = 6
+COLUMNS = 7
+
+
+class FrameArray(object):
+    """
+    One frame's hands packed into a single float array of shape
+    `(hands, 1 + fingers, 7)`, so per-value transforms can run over the
+    whole frame at once.
+
+    The arrays are reused (and only ever grown) from frame to frame.
+    """
+
+    def __init__(self, hands=2, fingers=5, dtype=np.float64):
+        self.dtype = dtype
+        self.hand_count = 0
+        self.finger_counts = []
+        self._allocate(hands, fingers)
+
+    def _allocate(self, hands, fingers):
+        self.data = np.zeros((hands, 1 + fingers, COLUMNS), self.dtype)
+        self.hand_ids = np.zeros(hands, np.int64)
+        self.finger_ids = np.zeros((hands, fingers), np.int64)
+        # `Leap.Finger.type` of each finger (`UNKNOWN_TYPE` if not known)
+        self.finger_types = np.zeros((hands, fingers), np.int64)
+        # Which palms (column 0) and fingers the tracker has zeroed
+        self.zeroed = np.zeros((hands, 1 + fingers), bool)
+
+    @property
+    def hands(self):
+        """
+        The hands (palm rows and their finger rows) filled by the last `fill`
+        """
+        return self.data[:self.hand_count]
+
+    def fill(self, hands):
+        hands = list(hands)
+        fingers = [list(hand.fingers) for hand in hands]
+        rows = 1 + max([len(f) for f in fingers] or [0])
+        capacity, capacity_rows, _ = self.data.shape
+        if len(hands) > capacity or rows > capacity_rows:
+            self._allocate(max(len(hands), capacity), max(rows, capacity_rows) - 1)
+        rows = self.data.shape[1]
+
+        values = []
+        extend = values.extend
+        padding = [0.0] * COLUMNS
+        zeroed = self.zeroed
+        zeroed[:len(hands)] = False
+        for i, hand in enumerate(hands):
+            p = hand.palm_position
+            n = hand.palm_normal
+            extend((p[0], p[1], p[2], n[0], n[1], n[2], 0.0))
+            if getattr(hand, 'zeroed', False):
+                zeroed[i, 0] = True
+            for j, finger in enumerate(fingers[i]):
+                t = finger.tip_position
+                d = finger.direction
+                extend((t[0], t[1], t[2], d[0], d[1], d[2],
+                        1.0 if finger.is_extended else 0.0))
+                self.finger_ids[i, j] = finger.id
+                self.finger_types[i, j] = getattr(finger, 'type',
+                                                UNKNOWN_TYPE)
+                if getattr(finger, 'zeroed', False):
+                    zeroed[i, j + 1] = True
+            extend(padding * (rows - 1 - len(fingers[i])))
+            self.hand_ids[i] = hand.id
+
+        self.hand_count = len(hands)
+        self.finger_counts = [len(f) for f in fingers]
+        if hands:
+            self.data[:len(hands)].flat = values
+        return self
+
+    def live_parts(self):
+        """
+        `(live, hand_ids, part_ids)`: which rows of `hands` are palms or
+        fingers of the frame which aren't zeroed, and the hand id and
+        finger id + 1 (0 for the palm) of each of those, in order.
+        """
+        count = self.hand_count
+        rows = self.data.shape[1]
+        parts = np.zeros((count, rows), np.int64)
+        parts[:, 1:] = self.finger_ids[:count, :rows - 1] + 1
+        live = np.arange(rows) <= np.array(self.finger_counts)[:, None]
+        live &= ~self.zeroed[:count, :rows]
+        hand_ids = np.empty((count, rows), np.int64)
+        hand_ids[:] = self.hand_ids[:count, None]
+        return live, hand_ids[live], parts[live]
+
+    def to_hands(self):
+        """
+        Read the (transformed) frame back out as `HandState`s for sending.
+        """
+        frame = self.hands
+        positions = frame[:, :, POSITION].tolist()
+        directions = frame[:, :, DIRECTION].tolist()
+        extended = frame[:, :, EXTENDED].tolist()
+        hand_ids = self.hand_ids.tolist()
+        finger_ids = self.finger_ids.tolist()
+        finger_types = self.finger_types.tolist()
+        zeroed = self.zeroed.tolist()
+        hands = []
+        for i, finger_count in enumerate(self.finger_counts):
+            fingers = [FingerState(finger_ids[i][j], positions[i][j + 1],
+                                directions[i][j + 1],
+                                extended[i][j + 1] > 0.5, zeroed[i][j + 1],
+                                finger_types[i][j])
+                        for j in range(finger_count)]
+            hands.append(HandState(hand_ids[i], positions[i][0],
+                                directions[i][0], fingers, zeroed[i][0]))
+        return hands
+
+
+class LinearScaling(object):
+    """
+    Vectorized form of `LinearScalingMixin._calc`: maps each axis from
+    `[min, max]` mm to `[-0.5, 0.5]` (optionally clamping to that range);
+    axes without both limits are left alone.
+    """
+
+    def __init__(self, mins, maxs, clamp=False):
+        scaled = [lo is not None and hi is not None for lo, hi in zip(mins, maxs)]
+        self.axes = np.array(scaled)
+        self.mins = np.array([lo if s else 0.0 for lo, s in zip(mins, scaled)])
+        self.spans = np.array([float(hi - lo) if s else 1.0
+                        for lo, hi, s in zip(mins, maxs, scaled)])
+        self.offsets = np.where(self.axes, 0.5, 0.0)
+        self.clamp = clamp and self.axes.any()
+        self.lows = np.where(self.axes, -0.5, -np.inf)
+        self.highs = np.where(self.axes, 0.5, np.inf)
+
+    def __call__(self, vectors):
+        """
+        Scale, in place, an array whose last axis is `(x, y, z)`.
+        """
+        vectors -= self.mins
+        vectors /= self.spans
+        vectors -= self.offsets
+        if self.clamp:
+            np.clip(vectors, self.lows, self.highs, out=vectors)
+        return vectors
+
+    def scale_frame(self, frame_array):
+        """
+        Scale every vector in a `FrameArray` (as `pre_send_x/y/z` would.)
+        """
+        frame = frame_array.hands
+        self(frame[:, :, POSITION])
+        self(frame[:, :, DIRECTION])
@@ -0,0 +1,183 @@
+#
+#
+# Leapyosc
+# Cheap always-on timing of each stage of handling a frame
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+import json
+import time
+from collections import OrderedDict
+
+
+try:
+    now_ns = time.perf_counter_ns
+except AttributeError: # Before Python 3.7
+    def now_ns():
+        return int(time.time() * 1e9)
+
+
+FETCH = 'fetch'         # Getting the frame from the controller
+TRACK = 'track'         # Tracking hands and fingers
+ENCODE = 'encode'       # Building the messages (excluding socket sends)
+SEND = 'send'           # Each socket send
+LATENCY = 'latency'     # From the Leap frame timestamp until it was sent
+
+STAGES = (FETCH, TRACK, ENCODE, SEND, LATENCY)
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class Histogram(object):
+    """
+    A fixed-bucket histogram of (non-negative integer) nanosecond durations.
+
+    Like an HDR histogram, buckets are exact up to `2 * 2**sub_bucket_bits`
+    and after that each power of two is split into `2**sub_bucket_bits`
+    buckets, so any value is known to within about 3% (with the default 5
+    bits.) Recording a value is a little integer arithmetic and one list
+    increment; nothing is allocated.
+    """
+
+    def __init__(self, sub_bucket_bits=5, max_value=60 * 10**9):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_buckets = 1 << sub_bucket_bits
+        self.counts = [0] * (self.index(max_value) + 1)
+        self.reset()
+
+    def reset(self):
+        counts = self.counts
+        for i in range(len(counts)):
+            counts[i] = 0
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def index(self, value):
+        shift = value.bit_length() - self.sub_bucket_bits - 1
+        if shift <= 0:
+            return value
+        return (shift << self.sub_bucket_bits) + (value >> shift)
+
+    def lowest_value(self, index):
+        """
+        The smallest value which falls in the bucket at `index`.
+        """
+        if index < 2 * self.sub_buckets:
+            return index
+        shift = (index >> self.sub_bucket_bits) - 1
+        return (index - (shift << self.sub_bucket_bits)) << shift
+
+    def record(self, value):
+        if value < 0:
+            value = 0
+        shift = value.bit_length() - self.sub_bucket_bits - 1
+        i = value if shift <= 0 else \
+                    (shift << self.sub_bucket_bits) + (value >> shift)
+        try:
+            self.counts[i] += 1
+        except IndexError:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        if self.min is None or value < self.min:
+            self.min = value
+
+    def percentile(self, p):
+        """
+        The (bucket rounded) value below which `p` percent of values fall.
+        """
+        if not self.count:
+            return None
+        target = max(1, int(round(self.count * p / 100.0)))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self.lowest_value(i), self.max)
+        return self.max
+
+    def summary(self):
+        """
+        Count and mean/min/percentiles/max in microseconds.
+        """
+        summary = OrderedDict(count=self.count)
+        if self.count:
+            summary['mean_us'] = self.total / 1e3 / self.count
+            summary['min_us'] = self.min / 1e3
+            for p in PERCENTILES:
+                summary['p%s_us' % ('%g' % p).replace('.', '')] = \
+                                self.percentile(p) / 1e3
+            summary['max_us'] = self.max / 1e3
+        return summary
+
+
+class LeapClock(object):
+    """
+    Converts Leap frame timestamps (microseconds, on the Leap service's
+    clock) into `now_ns` time.
+
+    The offset between the two clocks is the smallest difference seen
+    between them; with `Controller.now()` samples that's close to exact,
+    with only frame timestamps (as received) it's the offset of the quickest
+    frame, so latencies come out as time over the best case.
+    """
+
+    def __init__(self):
+        self.offset = None
+
+    def observe(self, leap_us, local_ns):
+        offset = local_ns - leap_us * 1000
+        if self.offset is None or offset < self.offset:
+            self.offset = offset
+
+    def to_local(self, leap_us):
+        return leap_us * 1000 + self.offset
+
+
+class Instruments(object):
+    """
+    A `Histogram` per stage (see `STAGES`.)
+    """
+
+    def __init__(self, stages=STAGES):
+        self.histograms = OrderedDict((stage, Histogram()) for stage in stages)
+        self.leap_clock = LeapClock()
+        self.send_total_ns = 0
+
+    def record(self, stage, ns):
+        self.histograms[stage].record(ns)
+
+    def record_send(self, ns):
+        """
+        Record one socket send, also adding it to the running total (so
+        encoding time can be told apart from the sends made while encoding.)
+        """
+        self.histograms[SEND].record(ns)
+        self.send_total_ns += ns
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def summary(self):
+        return OrderedDict((stage, histogram.summary())
+                        for stage, histogram in self.histograms.items())
+
+    def to_json(self):
+        return json.dumps(self.summary())
+
+    def osc_messages(self, prefix="/stats"):
+        """
+        `(address, value)` pairs such as `("/stats/send/p99_us", 41.2)`
+        """
+        messages = []
+        for stage, summary in self.summary().items():
+            for field, value in summary.items():
+                messages.append(("%s/%s/%s" % (prefix, stage, field), value))
+        return messages
@@ -0,0 +1,88 @@
+#
+#
+# Leapyosc
+# Nearest-position matching of parts whose Leap ids changed
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+import numpy as np
+
+
+def distance_matrix(a, b):
+    """
+    Euclidean distances between each row of `a` (n x 3) and of `b` (m x 3)
+    """
+    diff = a[:, np.newaxis, :] - b[np.newaxis, :, :]
+    return np.sqrt((diff * diff).sum(axis=2))
+
+
+def min_cost_assignment(cost):
+    """
+    Pair rows with columns of `cost` so the total cost is minimal
+    (the Hungarian algorithm); returns a list of `(row, column)`.
+
+    Every row is assigned if there are at least as many columns as rows,
+    and vice versa.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+
+    # Potentials and matching are 1-based; column 0 is a sentinel
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    row_of = np.zeros(m + 1, dtype=np.int64)
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        row_of[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = row_of[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[row_of[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if row_of[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            row_of[j0] = row_of[j1]
+            j0 = j1
+
+    pairs = [(int(row_of[j]) - 1, j - 1) for j in range(1, m + 1) if row_of[j]]
+    if transposed:
+        pairs = [(j, i) for i, j in pairs]
+    return pairs
+
+
+def match_nearest(positions, lost_positions, gate):
+    """
+    Match new parts (`positions`) to recently lost ones (`lost_positions`)
+    minimizing the total distance between them; pairs further apart than
+    `gate` are never matched. Returns a list of `(new, lost)` index pairs.
+    """
+    if not len(positions) or not len(lost_positions):
+        return []
+    distances = distance_matrix(np.asarray(positions, dtype=np.float64),
+                                np.asarray(lost_positions, dtype=np.float64))
+    gated = distances > gate
+    if gated.all():
+        return []
+    # A gated pair costs more than any set of ungated pairs could
+    cost = np.where(gated, gate * (distances.size + 1), distances)
+    return [(i, j) for i, j in min_cost_assignment(cost) if not gated[i, j]]
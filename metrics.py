@@ -0,0 +1,199 @@
+#
+#
+# Leapyosc
+# Values derived from whole frames of tracked hands
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+import numpy as np
+
+from frames import FrameArray, POSITION, EXTENDED
+from scheduler import THUMB, INDEX
+
+
+VELOCITY = 'velocity'
+PINCH = 'pinch'
+SPREAD = 'spread'
+EXTENDED_COUNT = 'extended'
+
+METRICS = (VELOCITY, PINCH, SPREAD, EXTENDED_COUNT)
+
+# Fields (see `OSCAddressTable`) each metric adds to every finger's and
+# palm's, and to the whole hand's
+PART_FIELDS = {VELOCITY: 'v'}
+HAND_FIELDS = {PINCH: 'pinch', SPREAD: 'spread',
+                EXTENDED_COUNT: 'extended_count'}
+
+# The types of finger pinched with (by type, not tracked id: a finger the
+# Leap loses and finds again is given a new one)
+PINCH_FINGERS = (THUMB, INDEX)
+
+
+class per_frame(object):
+    """
+    A `FrameMetrics` property which is worked out the first time it is
+    read, then kept (in the instance) for the rest of the frame.
+    """
+
+    def __init__(self, compute):
+        self.compute = compute
+        self.__doc__ = compute.__doc__
+
+    def __get__(self, metrics, type=None):
+        if metrics is None:
+            return self
+        value = metrics.__dict__[self.compute.__name__] = self.compute(metrics)
+        return value
+
+
+class FrameMetrics(object):
+    """
+    The metrics of one frame's hands, each a list in the order of the
+    hands (and their fingers.)
+
+    Nothing is worked out until it is read, and intermediates (the
+    snapshot of the hands, where the fingertips are...) only once however
+    many metrics share them; metrics which aren't read cost nothing.
+    """
+
+    def __init__(self, hand_metrics, hands, timestamp):
+        self.hand_metrics = hand_metrics
+        self.hands = hands
+        self.timestamp = timestamp
+
+    @per_frame
+    def frame_array(self):
+        return self.hand_metrics.frame_array.fill(self.hands)
+
+    @per_frame
+    def live_parts(self):
+        return self.frame_array.live_parts()
+
+    @per_frame
+    def live_fingers(self):
+        return self.live_parts[0][:, 1:]
+
+    @per_frame
+    def positions(self):
+        return self.frame_array.hands[:, :, POSITION]
+
+    @per_frame
+    def tips(self):
+        return self.positions[:, 1:]
+
+    @per_frame
+    def velocities(self):
+        """
+        mm/s of each palm (first) and fingertip of each hand, since the
+        last frame; zero for parts which weren't in it
+        """
+        live, hand_ids, part_ids = self.live_parts
+        velocities = np.zeros(self.positions.shape)
+        velocities[live] = self.hand_metrics.history.velocities(hand_ids,
+                            part_ids, self.positions[live], self.timestamp)
+        return velocities.tolist()
+
+    @per_frame
+    def pinch(self):
+        """
+        mm between the thumb and index fingertips (zero unless both are
+        there)
+        """
+        count = self.frame_array.hand_count
+        tips = self.tips
+        types = self.frame_array.finger_types[:count, :tips.shape[1]]
+        live = self.live_fingers
+        thumbs = (types == PINCH_FINGERS[0]) & live
+        indexes = (types == PINCH_FINGERS[1]) & live
+        rows = np.arange(count)
+        gaps = tips[rows, thumbs.argmax(axis=1)] - \
+                        tips[rows, indexes.argmax(axis=1)]
+        distances = np.sqrt((gaps * gaps).sum(axis=1))
+        distances[~(thumbs.any(axis=1) & indexes.any(axis=1))] = 0.0
+        return distances.tolist()
+
+    @per_frame
+    def spread(self):
+        """
+        Mean mm of the fingertips from their centre
+        """
+        live = self.live_fingers
+        counts = np.maximum(live.sum(axis=1), 1)[:, None]
+        centres = (self.tips * live[:, :, None]).sum(axis=1) / counts
+        offsets = self.tips - centres[:, None]
+        distances = np.sqrt((offsets * offsets).sum(axis=2)) * live
+        return (distances.sum(axis=1) / counts[:, 0]).tolist()
+
+    @per_frame
+    def extended_count(self):
+        """
+        How many fingers are extended
+        """
+        extended = self.frame_array.hands[:, 1:, EXTENDED] > 0.5
+        return (extended & self.live_fingers).sum(axis=1).tolist()
+
+
+class PartHistory(object):
+    """
+    Where each tracked part was in the last frame it was measured in; kept
+    in arrays indexed by (hand id, finger id + 1 or 0 for the palm), as
+    `smoothing.OneEuroFilter` keeps its state.
+    """
+
+    def __init__(self, hands=4, fingers=8):
+        self.positions = None
+        self._allocate(hands, fingers)
+
+    def _allocate(self, hands, fingers):
+        positions = np.zeros((hands + 1, fingers + 2, 3))
+        times = np.full((hands + 1, fingers + 2), np.nan)
+        if self.positions is not None:
+            h, f, _ = self.positions.shape
+            positions[:h, :f] = self.positions
+            times[:h, :f] = self.times
+        self.positions = positions
+        self.times = times
+
+    def velocities(self, hand_ids, part_ids, positions, timestamp):
+        """
+        The velocity of each part (`hand_ids`, `part_ids`) now at
+        `positions`, as of `timestamp` (in seconds.) Parts not given are
+        forgotten.
+        """
+        if len(hand_ids) == 0:
+            self.times[:] = np.nan
+            return np.zeros((0, 3))
+        if hand_ids.max() >= self.times.shape[0] or \
+                part_ids.max() >= self.times.shape[1]:
+            self._allocate(max(hand_ids.max(), self.times.shape[0] - 1),
+                        max(part_ids.max(), self.times.shape[1] - 2))
+        dt = timestamp - self.times[hand_ids, part_ids]
+        with np.errstate(invalid='ignore'):
+            moved = dt > 0
+        velocities = np.zeros(positions.shape)
+        velocities[moved] = (positions[moved] -
+                            self.positions[hand_ids, part_ids][moved]) / \
+                        dt[moved][:, None]
+        self.times[:] = np.nan
+        self.positions[hand_ids, part_ids] = positions
+        self.times[hand_ids, part_ids] = timestamp
+        return velocities
+
+
+class HandMetrics(object):
+    """
+    Measures the `FrameMetrics` of each frame's (tracked) hands in turn.
+    """
+
+    def __init__(self):
+        self.frame_array = FrameArray()
+        self.history = PartHistory()
+
+    def measure(self, hands, timestamp):
+        """
+        The metrics of `hands` at `timestamp` (in seconds); only valid
+        until the next frame is measured.
+        """
+        return FrameMetrics(self, hands, timestamp)
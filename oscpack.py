@@ -0,0 +1,493 @@
+#
+#
+# Leapyosc
+# Low level OSC binary encoding helpers
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+import struct
+from collections import OrderedDict
+
+try:
+    INTEGER_TYPES = (int, long)
+except NameError: # Python 3
+    INTEGER_TYPES = (int,)
+
+
+INT32 = struct.Struct('>i')
+TIMETAG = struct.Struct('>LL')
+
+# pyOSC encodes the 'immediately' timetag as (0, 1)
+IMMEDIATELY = (0, 1)
+
+
+def osc_string(s):
+    """
+    Encode `s` as a NUL terminated OSC string padded to a multiple of 4 bytes.
+    (Byte-for-byte the same as pyOSC's `OSCString`.)
+    """
+    if not isinstance(s, bytes):
+        s = str(s).encode('ascii')
+    return s + b"\0" * (4 - (len(s) % 4))
+
+
+BUNDLE_HEADER = osc_string('#bundle')
+
+
+def osc_typetag(value):
+    """
+    Return the OSC typetag pyOSC would infer for `value`.
+    """
+    if isinstance(value, float):
+        return 'f'
+    if isinstance(value, INTEGER_TYPES) and not isinstance(value, bool):
+        return 'i'
+    return 's'
+
+
+def encode_message(address, *values):
+    """
+    Encode an arbitrary (non-templated) OSC message; floats, ints
+    and strings only.
+    """
+    typetags = ''.join(osc_typetag(v) for v in values)
+    binary = [osc_string(address), osc_string(',' + typetags)]
+    for tag, value in zip(typetags, values):
+        if tag == 's':
+            binary.append(osc_string(value))
+        else:
+            binary.append(struct.pack('>' + tag, value))
+    return b"".join(binary)
+
+
+class MessageTemplate(object):
+    """
+    A pre-encoded OSC message header (address + typetags).
+
+    OSC typetags `f` and `i` happen to be the `struct` codes for the same
+    big-endian values, so the payload packer is compiled straight from them
+    and only the argument values need packing per message.
+    """
+
+    __slots__ = ('address', 'typetags', 'header', 'payload', 'size',
+                'element')
+
+    def __init__(self, address, typetags=''):
+        self.address = address
+        self.typetags = typetags
+        self.header = osc_string(address) + osc_string(',' + typetags)
+        self.payload = struct.Struct('>' + typetags)
+        self.size = len(self.header) + self.payload.size
+        # The header as a bundle element, i.e. preceded by the message size
+        self.element = INT32.pack(self.size) + self.header
+
+    def __repr__(self):
+        return "<MessageTemplate %s ,%s>" % (self.address, self.typetags)
+
+    def encode(self, *values):
+        return self.header + self.payload.pack(*values)
+
+
+class BundleEncoder(object):
+    """
+    Writes one OSC bundle at a time into a reusable preallocated buffer.
+
+    Messages are packed in place with `struct.pack_into`, so encoding a
+    frame does not build any intermediate message objects or strings.
+    The encoded bundle is exposed as a `memoryview` which is only valid
+    until the next call to `begin`.
+    """
+
+    # `(address, start, end)` of each element, if kept (see `IndexedBundleEncoder`)
+    elements = None
+
+    def __init__(self, size=8192):
+        self._allocate(size)
+        self.offset = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _allocate(self, size):
+        buffer = bytearray(size)
+        if getattr(self, 'buffer', None) is not None:
+            buffer[:self.offset] = self.buffer[:self.offset]
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+
+    def _reserve(self, size):
+        end = self.offset + size
+        if end > len(self.buffer):
+            self._allocate(max(end, len(self.buffer) * 2))
+        return end
+
+    def begin(self, timetag=IMMEDIATELY):
+        self.buffer[0:8] = BUNDLE_HEADER
+        TIMETAG.pack_into(self.buffer, 8, timetag[0], timetag[1])
+        self.offset = 16
+        self.count = 0
+
+    def add(self, template, *values):
+        """
+        Append a message encoded from a `MessageTemplate` and its values.
+        """
+        offset = self.offset
+        end = self._reserve(4 + template.size)
+        buffer = self.buffer
+        element = template.element
+        buffer[offset:offset + len(element)] = element
+        template.payload.pack_into(buffer, offset + len(element), *values)
+        self.offset = end
+        self.count += 1
+
+    def add_vector(self, templates, vector):
+        """
+        Append the messages of a vector from its `OSCAddressTable` templates;
+        one per component, or one with all three. Returns how many messages
+        that was.
+        """
+        if len(templates) == 1:
+            template, = templates
+            self.add(template, vector[0], vector[1], vector[2])
+            return 1
+        x, y, z = templates
+        offset = self.offset
+        self.offset = self._reserve(12 + x.size + y.size + z.size)
+        buffer = self.buffer
+        element = x.element
+        end = offset + len(element)
+        buffer[offset:end] = element
+        x.payload.pack_into(buffer, end, vector[0])
+        offset = end + x.payload.size
+        element = y.element
+        end = offset + len(element)
+        buffer[offset:end] = element
+        y.payload.pack_into(buffer, end, vector[1])
+        offset = end + y.payload.size
+        element = z.element
+        end = offset + len(element)
+        buffer[offset:end] = element
+        z.payload.pack_into(buffer, end, vector[2])
+        self.count += 3
+        return 3
+
+    def add_binary(self, binary):
+        """
+        Append an already encoded OSC message.
+        """
+        offset = self.offset
+        end = self._reserve(4 + len(binary))
+        INT32.pack_into(self.buffer, offset, len(binary))
+        self.buffer[offset + 4:end] = binary
+        self.offset = end
+        self.count += 1
+
+    def getvalue(self):
+        return self.view[:self.offset]
+
+
+def as_bytes(data):
+    """
+    `bytes` of a string or buffer (`bytes(memoryview)` is its repr on Python 2)
+    """
+    if isinstance(data, memoryview):
+        return data.tobytes()
+    return bytes(data)
+
+
+def message_address(binary):
+    """
+    The address of an encoded OSC message (or `#bundle`.)
+    """
+    binary = as_bytes(binary[:256])
+    address = binary[:binary.index(b"\0")]
+    if not isinstance(address, str): # Python 3
+        address = address.decode('ascii')
+    return address
+
+
+def bundle_elements(bundle):
+    """
+    `(address, start, end)` of each element of an encoded bundle.
+    """
+    bundle = as_bytes(bundle)
+    elements = []
+    offset = len(BUNDLE_HEADER) + TIMETAG.size
+    while offset + INT32.size <= len(bundle):
+        size, = INT32.unpack_from(bundle, offset)
+        start = offset + INT32.size
+        elements.append((message_address(bundle[start:start + size]),
+                        offset, start + size))
+        offset = start + size
+    return elements
+
+
+def filter_bundle(bundle, elements, keep):
+    """
+    Cut a bundle of just the elements whose address `keep` accepts out of
+    an encoded `bundle` whose `elements` are known (see `bundle_elements`
+    and `IndexedBundleEncoder`.) Returns `None` if none are kept.
+
+    Runs of consecutive kept elements are copied as one slice.
+    """
+    bundle = as_bytes(bundle)
+    kept = [element for element in elements if keep(element[0])]
+    if not kept:
+        return None
+    return _cut_bundle(bundle, kept)
+
+
+def _cut_bundle(bundle, elements):
+    """
+    The header of `bundle` followed by its `elements`, in the order given
+    """
+    parts = [bundle[:len(BUNDLE_HEADER) + TIMETAG.size]]
+    run_start = run_end = None
+    for address, start, end in elements:
+        if start == run_end:
+            run_end = end
+            continue
+        if run_start is not None:
+            parts.append(bundle[run_start:run_end])
+        run_start, run_end = start, end
+    if run_start is not None:
+        parts.append(bundle[run_start:run_end])
+    return b"".join(parts)
+
+
+def rebase_elements(elements):
+    """
+    Where `elements` (in order) end up in a bundle cut from them.
+    """
+    rebased = []
+    offset = len(BUNDLE_HEADER) + TIMETAG.size
+    for address, start, end in elements:
+        rebased.append((address, offset, offset + end - start))
+        offset += end - start
+    return rebased
+
+
+def prepend_message(bundle, elements, binary):
+    """
+    An encoded `bundle` with the encoded message `binary` added as its
+    first element, and where its `elements` (if known) end up.
+    """
+    bundle = as_bytes(bundle)
+    head = len(BUNDLE_HEADER) + TIMETAG.size
+    size = INT32.size + len(binary)
+    if elements is not None:
+        elements = [(message_address(binary), head, head + size)] + \
+                    [(address, start + size, end + size)
+                    for address, start, end in elements]
+    return (b"".join([bundle[:head], INT32.pack(len(binary)), binary,
+                    bundle[head:]]), elements)
+
+
+def split_bundle(bundle, elements, max_size, group=None):
+    """
+    Split an encoded `bundle` (whose `elements` are known) into as few
+    bundles of at most `max_size` bytes as it can, all with its timetag.
+    Returns a list of `(bundle, elements)`.
+
+    Elements for which `group(address)` is the same are kept in one bundle
+    unless they can't fit in one on their own. Groups are packed first fit,
+    largest first; each bundle keeps its elements in their original order.
+    An element too big for `max_size` even alone gets a bundle to itself.
+    """
+    bundle = as_bytes(bundle)
+    if len(bundle) <= max_size:
+        return [(bundle, elements)]
+    room = max_size - len(BUNDLE_HEADER) - TIMETAG.size
+
+    groups = OrderedDict()
+    for element in elements:
+        key = group(element[0]) if group is not None else None
+        groups.setdefault(key, []).append(element)
+
+    pieces = []
+    for grouped in groups.values():
+        size = sum(end - start for _, start, end in grouped)
+        if size <= room:
+            pieces.append((size, grouped))
+            continue
+        # Too big to keep together; break it up in order
+        piece, size = [], 0
+        for element in grouped:
+            element_size = element[2] - element[1]
+            if piece and size + element_size > room:
+                pieces.append((size, piece))
+                piece, size = [], 0
+            piece.append(element)
+            size += element_size
+        pieces.append((size, piece))
+
+    bins = []
+    for size, piece in sorted(pieces, key=lambda p: -p[0]):
+        for b in bins:
+            if b[0] + size <= room:
+                b[0] += size
+                b[1].extend(piece)
+                break
+        else:
+            bins.append([size, list(piece)])
+
+    split = []
+    for _, binned in bins:
+        binned.sort(key=lambda element: element[1])
+        split.append((_cut_bundle(bundle, binned), rebase_elements(binned)))
+    return split
+
+
+# Packers of the fixed size OSC argument types, by typetag
+_ARGUMENTS = {
+    'i': INT32,
+    'f': struct.Struct('>f'),
+    'h': struct.Struct('>q'),
+    'd': struct.Struct('>d'),
+}
+
+
+def _read_string(binary, offset):
+    end = binary.index(b"\0", offset)
+    return binary[offset:end], (end + 4) & ~3
+
+
+def decode_message(binary):
+    """
+    `(address, args)` of an encoded OSC message; int, float, string, blob
+    and the argument-less typetags only.
+    """
+    binary = as_bytes(binary)
+    address, offset = _read_string(binary, 0)
+    typetags, offset = _read_string(binary, offset)
+    args = []
+    for tag in typetags[1:].decode('ascii'):
+        if tag in _ARGUMENTS:
+            packer = _ARGUMENTS[tag]
+            args.append(packer.unpack_from(binary, offset)[0])
+            offset += packer.size
+        elif tag == 's':
+            value, offset = _read_string(binary, offset)
+            args.append(value.decode('utf-8'))
+        elif tag == 'b':
+            size, = INT32.unpack_from(binary, offset)
+            args.append(binary[offset + 4:offset + 4 + size])
+            offset += (4 + size + 3) & ~3
+        elif tag in 'TFN':
+            args.append({'T': True, 'F': False, 'N': None}[tag])
+        else:
+            raise ValueError("Can't decode OSC typetag '%s'" % tag)
+    return address.decode('ascii'), args
+
+
+def decode_packet(packet):
+    """
+    `(timetag, messages)` of an encoded OSC message or bundle, where each
+    message is an encoded `bytes`; nested bundles are flattened (taking the
+    outermost timetag.) A message's timetag is `None`.
+    """
+    packet = as_bytes(packet)
+    if packet[:len(BUNDLE_HEADER)] != BUNDLE_HEADER:
+        return None, [packet]
+    timetag = TIMETAG.unpack_from(packet, len(BUNDLE_HEADER))
+    messages = []
+    offset = len(BUNDLE_HEADER) + TIMETAG.size
+    while offset + INT32.size <= len(packet):
+        size, = INT32.unpack_from(packet, offset)
+        start = offset + INT32.size
+        element = packet[start:start + size]
+        if element[:len(BUNDLE_HEADER)] == BUNDLE_HEADER:
+            messages.extend(decode_packet(element)[1])
+        else:
+            messages.append(element)
+        offset = start + size
+    return timetag, messages
+
+
+class IndexedBundleEncoder(BundleEncoder):
+    """
+    A `BundleEncoder` which also notes the address and extent of each
+    element, as `(address, start, end)` in `elements`, so bundles of some of
+    the messages can be cut straight out of the encoding (`filter_bundle`.)
+    """
+
+    def begin(self, timetag=IMMEDIATELY):
+        super(IndexedBundleEncoder, self).begin(timetag)
+        self.elements = []
+
+    def add(self, template, *values):
+        start = self.offset
+        super(IndexedBundleEncoder, self).add(template, *values)
+        self.elements.append((template.address, start, self.offset))
+
+    def add_vector(self, templates, vector):
+        if len(templates) == 1:
+            self.add(templates[0], vector[0], vector[1], vector[2])
+            return 1
+        for template, i in zip(templates, (0, 1, 2)):
+            self.add(template, vector[i])
+        return 3
+
+    def add_binary(self, binary):
+        start = self.offset
+        super(IndexedBundleEncoder, self).add_binary(binary)
+        self.elements.append((message_address(binary), start, self.offset))
+
+
+class OSCAddressTable(object):
+    """
+    Cache of `MessageTemplate`s for the per hand/finger addresses sent
+    every frame.
+
+    Entries are keyed by `(hand_id, finger_id, field, vector_as_args)`;
+    a `finger_id` of `None` addresses the palm. Vector fields map to an
+    `x`, `y`, `z` triple of single float messages, or to one `xyz` message
+    with three float arguments when `vector_as_args` is set. Others are a
+    single int (or float) message.
+
+    Fields of the whole hand (see metrics.py) go with the palm's but are
+    addressed `/hand<n>/<field>`.
+    """
+
+    VECTOR_FIELDS = frozenset(['t', 'd', 'v'])
+    HAND_FIELDS = frozenset(['pinch', 'spread', 'extended_count'])
+    FLOAT_FIELDS = frozenset(['pinch', 'spread'])
+
+    def __init__(self, max_entries=4096):
+        self._templates = {}
+        # Raw (untracked) Leap ids grow without bound, so cap the cache
+        self.max_entries = max_entries
+
+    def __len__(self):
+        return len(self._templates)
+
+    def base_address(self, hand_id, finger_id, field):
+        if field in self.HAND_FIELDS:
+            return "/hand%d/%s" % (hand_id, field)
+        if finger_id is None:
+            return "/hand%d/palm/%s" % (hand_id, field)
+        return "/hand%d/finger%d/%s" % (hand_id, finger_id, field)
+
+    def build(self, hand_id, finger_id, field, vector_as_args):
+        base = self.base_address(hand_id, finger_id, field)
+        if field not in self.VECTOR_FIELDS:
+            return (MessageTemplate(base,
+                            'f' if field in self.FLOAT_FIELDS else 'i'),)
+        if vector_as_args:
+            return (MessageTemplate("%sxyz" % base, 'fff'),)
+        return (MessageTemplate("%sx" % base, 'f'),
+                MessageTemplate("%sy" % base, 'f'),
+                MessageTemplate("%sz" % base, 'f'))
+
+    def get(self, hand_id, finger_id, field, vector_as_args=False):
+        key = (hand_id, finger_id, field, vector_as_args)
+        try:
+            return self._templates[key]
+        except KeyError:
+            if len(self._templates) >= self.max_entries:
+                self._templates.clear()
+            templates = self._templates[key] = self.build(*key)
+            return templates
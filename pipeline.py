@@ -0,0 +1,123 @@
+#
+#
+# Leapyosc
+# Hand-off of Leap frames from the SDK callback thread to a sender thread
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+import threading
+import traceback
+from collections import deque
+
+
+DROP_OLDEST = 'drop-oldest'
+DROP_NEWEST = 'drop-newest'
+COALESCE = 'coalesce'
+
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, COALESCE)
+
+
+class FrameRing(object):
+    """
+    A bounded buffer of frames between one producer and one consumer.
+
+    What happens when the producer gets ahead depends on `overflow`:
+
+    - `drop-oldest`: a full ring discards its oldest frame to make room
+    - `drop-newest`: a full ring discards the incoming frame
+    - `coalesce`: the consumer only ever gets the latest frame; any older
+        frames still queued are discarded when it takes one
+    """
+
+    def __init__(self, size=4, overflow=DROP_OLDEST):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError("Unknown overflow policy '%s'" % overflow)
+        self.size = size
+        self.overflow = overflow
+        self._frames = deque()
+        self._ready = threading.Condition(threading.Lock())
+        self.closed = False
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+    def put(self, frame):
+        with self._ready:
+            frames = self._frames
+            if len(frames) >= self.size:
+                if self.overflow == DROP_NEWEST:
+                    self.dropped += 1
+                    return
+                frames.popleft()
+                if self.overflow == COALESCE:
+                    self.coalesced += 1
+                else:
+                    self.dropped += 1
+            frames.append(frame)
+            if len(frames) > self.max_depth:
+                self.max_depth = len(frames)
+            self._ready.notify()
+
+    def get(self):
+        """
+        Block until a frame is available and return it; returns `None` once
+        the ring has been closed.
+        """
+        with self._ready:
+            frames = self._frames
+            while not frames and not self.closed:
+                self._ready.wait()
+            if not frames:
+                return None
+            if self.overflow == COALESCE and len(frames) > 1:
+                self.coalesced += len(frames) - 1
+                frame = frames.pop()
+                frames.clear()
+                return frame
+            return frames.popleft()
+
+    def close(self):
+        with self._ready:
+            self.closed = True
+            self._ready.notify_all()
+
+    def reset_max_depth(self):
+        self.max_depth = len(self._frames)
+
+
+class SenderThread(threading.Thread):
+    """
+    Drains a `FrameRing`, handing each frame to `process_frame`.
+
+    An exception while processing one frame is reported (as it would be
+    from the Leap callback) and does not stop the thread.
+    """
+
+    def __init__(self, ring, process_frame):
+        super(SenderThread, self).__init__(name="leapyosc-sender")
+        self.daemon = True
+        self.ring = ring
+        self.process_frame = process_frame
+        self.errors = 0
+
+    def run(self):
+        get = self.ring.get
+        process_frame = self.process_frame
+        while True:
+            frame = get()
+            if frame is None:
+                break
+            try:
+                process_frame(frame)
+            except Exception:
+                self.errors += 1
+                traceback.print_exc()
+
+    def stop(self, timeout=None):
+        self.ring.close()
+        self.join(timeout)
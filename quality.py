@@ -0,0 +1,91 @@
+#
+#
+# Leapyosc
+# Stepping output quality down (and back up) to keep up with the Leap
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+
+# Quality levels, best first; each also has those before it
+FULL = 'full'
+NO_FINGER_DIRECTIONS = 'no-finger-directions'
+VECTOR_ARGS = 'vector-args'
+COARSE = 'coarse'
+HALF_RATE = 'half-rate'
+
+QUALITY_LEVELS = (FULL, NO_FINGER_DIRECTIONS, VECTOR_ARGS, COARSE, HALF_RATE)
+
+
+class QualityController(object):
+    """
+    Picks one of `levels` (best quality first) from how loaded handling
+    the frames is: the seconds spent busy with them over the seconds of
+    frames (by their timestamps) they covered, measured over every `window`
+    seconds of frames.
+
+    A window loaded above `degrade_load` steps one level down. Only once a
+    level has been kept for `hold` seconds, and a window is loaded below
+    `recover_load`, is it stepped back up. If stepping up only leads to
+    stepping down again before `hold` is up, the next step up waits twice
+    as long (up to `max_hold`.)
+    """
+
+    def __init__(self, levels=QUALITY_LEVELS, degrade_load=0.9,
+                recover_load=0.5, window=0.25, hold=1.0, max_hold=30.0):
+        if not 0 < recover_load < degrade_load:
+            raise ValueError("recover_load must be between 0 and "
+                            "degrade_load")
+        self.levels = tuple(levels)
+        self.degrade_load = degrade_load
+        self.recover_load = recover_load
+        self.window = window
+        self.hold = hold
+        self.max_hold = max_hold
+        self.level = 0
+        self.load = 0.0
+        self.changes = 0
+        self.recover_hold = hold
+        self._busy = 0.0
+        self._elapsed = 0.0
+        self._held = 0.0
+        self._last_step = 0
+
+    @property
+    def name(self):
+        return self.levels[self.level]
+
+    def observe(self, busy, elapsed):
+        """
+        Count `busy` seconds spent on `elapsed` seconds of frames; the new
+        level if that changes it, otherwise `None`.
+        """
+        self._busy += busy
+        self._elapsed += elapsed
+        if self._elapsed < self.window:
+            return None
+        self.load = self._busy / self._elapsed
+        self._held += self._elapsed
+        self._busy = self._elapsed = 0.0
+
+        if self.load > self.degrade_load:
+            if self.level == len(self.levels) - 1:
+                return None
+            if self._last_step < 0 and self._held < self.hold:
+                self.recover_hold = min(self.recover_hold * 2, self.max_hold)
+            return self._step(1)
+        if self._last_step < 0 and self._held >= self.hold:
+            # Stepping up stuck
+            self.recover_hold = self.hold
+        if self.load < self.recover_load and self.level > 0 and \
+                self._held >= self.recover_hold:
+            return self._step(-1)
+        return None
+
+    def _step(self, step):
+        self.level += step
+        self.changes += 1
+        self._held = 0.0
+        self._last_step = step
+        return self.level
@@ -0,0 +1,90 @@
+#
+#
+# Leapyosc
+# Per-address rate limits and priorities, read from a file
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+from fanout import AddressFilter
+
+
+class AddressRule(object):
+    """
+    Fields with an address matching `pattern` (a glob, as for
+    `--destination`) are sent at most `rate` times a second (every frame
+    if `None`), and before those of lower `priority` in each frame.
+    """
+
+    __slots__ = ('pattern', 'rate', 'period', 'priority', 'matches')
+
+    def __init__(self, pattern, rate=None, priority=0):
+        if rate is not None and rate <= 0:
+            raise ValueError("Rate must be more than 0, got %s" % rate)
+        self.pattern = pattern
+        self.rate = rate
+        self.period = None if rate is None else 1.0 / rate
+        self.priority = priority
+        self.matches = AddressFilter([pattern])
+
+    def __repr__(self):
+        return "<AddressRule %s %s %s>" % (self.pattern,
+                        "full" if self.rate is None else self.rate,
+                        self.priority)
+
+
+# For fields no rule matches
+DEFAULT_RULE = AddressRule('*')
+
+
+class RateSchedule(object):
+    """
+    A list of `AddressRule`s; a field gets the first which matches it.
+
+    Read (see `parse`) from lines of `pattern rate [priority]`, where
+    `rate` is how many times a second, or `full` for every frame, and
+    `priority` defaults to 0. Blank lines and `#` comments are skipped:
+
+        # pattern                   rate    priority
+        /hand*/palm/t               full    10
+        /hand*/finger*/d            20
+        /hand*/finger*/extended     5
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.top_priority = max([DEFAULT_RULE.priority] +
+                                [rule.priority for rule in self.rules])
+
+    @classmethod
+    def parse(cls, lines, name="<rates>"):
+        rules = []
+        for number, line in enumerate(lines, 1):
+            words = line.split("#", 1)[0].split()
+            if not words:
+                continue
+            try:
+                if not 2 <= len(words) <= 3:
+                    raise ValueError("Expected pattern rate [priority]")
+                pattern, rate = words[:2]
+                rules.append(AddressRule(pattern,
+                            None if rate == 'full' else float(rate),
+                            int(words[2]) if len(words) > 2 else 0))
+            except ValueError as e:
+                raise ValueError("%s, line %s: %s" % (name, number, e))
+        return cls(rules)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.parse(f, path)
+
+    def rule_for(self, addresses):
+        """
+        The rule for a field sent to any of `addresses`
+        """
+        for rule in self.rules:
+            if any(rule.matches(address) for address in addresses):
+                return rule
+        return DEFAULT_RULE
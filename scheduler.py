@@ -0,0 +1,223 @@
+#
+#
+# Leapyosc
+# Fixed-rate resampling of tracked hand state
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+import math
+import threading
+import time
+import traceback
+
+
+INTERPOLATE = 'interpolate'
+LATEST = 'latest'
+
+RESAMPLE_MODES = (INTERPOLATE, LATEST)
+
+# Finger types (`Leap.Finger.TYPE_THUMB`, `TYPE_INDEX`...); or not known
+THUMB = 0
+INDEX = 1
+UNKNOWN_TYPE = -1
+
+
+def as_tuple(vector):
+    return (vector[0], vector[1], vector[2])
+
+
+def lerp(a, b, alpha):
+    return (a[0] + (b[0] - a[0]) * alpha,
+            a[1] + (b[1] - a[1]) * alpha,
+            a[2] + (b[2] - a[2]) * alpha)
+
+
+def nlerp(a, b, alpha):
+    """
+    Interpolate between two directions, keeping the result unit length.
+    """
+    v = lerp(a, b, alpha)
+    norm = math.sqrt(v[0] * v[0] + v[1] * v[1] + v[2] * v[2])
+    if norm == 0:
+        return v
+    return (v[0] / norm, v[1] / norm, v[2] / norm)
+
+
+class FingerState(object):
+    """
+    The values of one (tracked or raw) finger at one point in time.
+    """
+
+    __slots__ = ('id', 'tip_position', 'direction', 'is_extended', 'zeroed',
+                'type')
+
+    def __init__(self, id, tip_position, direction, is_extended, zeroed=False,
+                type=UNKNOWN_TYPE):
+        self.id = id
+        self.tip_position = tip_position
+        self.direction = direction
+        self.is_extended = is_extended
+        self.zeroed = zeroed
+        self.type = type
+
+    @classmethod
+    def snapshot(cls, finger):
+        return cls(finger.id, as_tuple(finger.tip_position),
+                    as_tuple(finger.direction), bool(finger.is_extended),
+                    getattr(finger, 'zeroed', False),
+                    getattr(finger, 'type', UNKNOWN_TYPE))
+
+    def interpolate(self, older, alpha):
+        return FingerState(self.id,
+                    lerp(older.tip_position, self.tip_position, alpha),
+                    nlerp(older.direction, self.direction, alpha),
+                    self.is_extended if alpha >= 0.5 else older.is_extended,
+                    type=self.type)
+
+
+class HandState(object):
+    """
+    The values of one (tracked or raw) hand and its fingers at one point
+    in time.
+    """
+
+    __slots__ = ('id', 'palm_position', 'palm_normal', 'fingers', 'zeroed')
+
+    def __init__(self, id, palm_position, palm_normal, fingers, zeroed=False):
+        self.id = id
+        self.palm_position = palm_position
+        self.palm_normal = palm_normal
+        self.fingers = fingers
+        self.zeroed = zeroed
+
+    @classmethod
+    def snapshot(cls, hand):
+        return cls(hand.id, as_tuple(hand.palm_position),
+                    as_tuple(hand.palm_normal),
+                    [FingerState.snapshot(f) for f in hand.fingers],
+                    getattr(hand, 'zeroed', False))
+
+    def interpolate(self, older, alpha):
+        older_fingers = dict((f.id, f) for f in older.fingers)
+        return HandState(self.id,
+                    lerp(older.palm_position, self.palm_position, alpha),
+                    nlerp(older.palm_normal, self.palm_normal, alpha),
+                    resample_parts(older_fingers, self.fingers, alpha))
+
+
+def resample_parts(older_by_id, newer, alpha):
+    """
+    Interpolate each part in `newer` with the same-id part in `older_by_id`.
+
+    Parts which only just appeared, or which are zeroed at either end, are
+    not interpolated (they take their newer values) so they don't appear to
+    fly in from, or off to, the origin. Parts which have since disappeared
+    are left out.
+    """
+    parts = []
+    for part in newer:
+        previous = older_by_id.get(part.id)
+        if previous is None or previous.zeroed or part.zeroed:
+            parts.append(part)
+        else:
+            parts.append(part.interpolate(previous, alpha))
+    return parts
+
+
+class ResampledFrame(object):
+    """
+    Stands in for a `Leap.Frame` when sending resampled hand state.
+    """
+
+    __slots__ = ('hands', 'timestamp')
+
+    def __init__(self, hands, timestamp):
+        self.hands = hands
+        self.timestamp = timestamp
+
+
+class HandStateBuffer(object):
+    """
+    Holds the two most recent hand state snapshots and resamples them
+    at arbitrary times.
+
+    Written by the frame thread, read by the output timer; each update
+    swaps in a new tuple, so readers never see a half written pair.
+    """
+
+    def __init__(self, mode=INTERPOLATE):
+        if mode not in RESAMPLE_MODES:
+            raise ValueError("Unknown resample mode '%s'" % mode)
+        self.mode = mode
+        self.samples = (None, None)
+
+    def record(self, hands, now=None):
+        sample = (time.time() if now is None else now,
+                    [HandState.snapshot(hand) for hand in hands])
+        self.samples = (self.samples[1], sample)
+
+    def resample(self, now, max_delay):
+        """
+        Return a `ResampledFrame` of the hand state as it was one device frame
+        interval (but at most `max_delay` seconds) before `now`; or `None`
+        if nothing has been recorded yet.
+        """
+        older, newer = self.samples
+        if newer is None:
+            return None
+        if older is None or self.mode == LATEST:
+            return ResampledFrame(newer[1], newer[0])
+        (t0, older_hands), (t1, newer_hands) = older, newer
+        interval = t1 - t0
+        if interval <= 0:
+            return ResampledFrame(newer_hands, t1)
+        target = now - min(interval, max_delay)
+        alpha = (target - t0) / interval
+        if alpha >= 1.0:
+            return ResampledFrame(newer_hands, t1)
+        if alpha <= 0.0:
+            return ResampledFrame(older_hands, t0)
+        older_by_id = dict((h.id, h) for h in older_hands)
+        return ResampledFrame(resample_parts(older_by_id, newer_hands, alpha),
+                            target)
+
+
+class FixedRateTimer(threading.Thread):
+    """
+    Calls `tick(now)` `rate` times a second.
+
+    Ticks are scheduled against the start time, so they don't drift; if
+    a tick overruns, the missed ticks are skipped rather than bunched up.
+    An exception from one tick is reported and doesn't stop the timer.
+    """
+
+    def __init__(self, rate, tick):
+        super(FixedRateTimer, self).__init__(name="leapyosc-output")
+        self.daemon = True
+        self.period = 1.0 / rate
+        self.tick = tick
+        self._stopped = threading.Event()
+
+    def run(self):
+        period = self.period
+        next_tick = time.time() + period
+        while not self._stopped.is_set():
+            delay = next_tick - time.time()
+            if delay > 0:
+                self._stopped.wait(delay)
+                if self._stopped.is_set():
+                    break
+            now = time.time()
+            try:
+                self.tick(now)
+            except Exception:
+                traceback.print_exc()
+            next_tick += period
+            if next_tick < now:
+                next_tick = now + period - ((now - next_tick) % period)
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        self.join(timeout)
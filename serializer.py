@@ -1,19 +1,338 @@
-import csv
+#
+#
+# Leapyosc
+# Compact binary recording and replay of Leap frames
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+import mmap
+import struct
+import threading
+import time
+
+from scheduler import FingerState, HandState, as_tuple, UNKNOWN_TYPE
+
+
+# File layout (all little-endian):
+#
+#   header      magic, version, frame count, offset of the index
+#   frames      one frame record, then for each hand a hand record
+#               followed by that hand's finger records
+#   index       one (timestamp, offset) entry per frame
+#
+# The frame count and index offset are written when the recording is
+# closed; a recording which wasn't closed is still readable (its frames
+# are scanned for when it is opened.)
+MAGIC = b'LEAPYOSC'
+VERSION = 2
+
+HEADER = struct.Struct('<8sHH4xQQ')  # magic, version, 0, frame count, index offset
+FRAME = struct.Struct('<qqHH')       # Leap frame id, timestamp (us), hands, fingers
+HAND = struct.Struct('<iH2x6f')      # id, fingers, palm position, palm normal
+FINGER = struct.Struct('<i6f?b2x')   # id, tip position, direction, extended,
+                                     # type (version 2 on)
+INDEX = struct.Struct('<qQ')         # timestamp (us), offset of frame record
+
+
+class RecordingError(Exception):
+    pass
+
+
+def frame_record_size(hand_count, finger_count):
+    return FRAME.size + hand_count * HAND.size + finger_count * FINGER.size
+
+
+def pack_frame_into(buffer, offset, frame, max_hands=None, max_fingers=None):
+    """
+    Write the records of `frame` into `buffer` at `offset` (with at most
+    `max_hands` hands of at most `max_fingers` fingers each) and return
+    their size.
+    """
+    start = offset
+    offset += FRAME.size
+    hand_count = finger_count = 0
+    for hand in frame.hands:
+        if max_hands is not None and hand_count >= max_hands:
+            break
+        fingers = list(hand.fingers)[:max_fingers]
+        p = as_tuple(hand.palm_position)
+        n = as_tuple(hand.palm_normal)
+        HAND.pack_into(buffer, offset, hand.id, len(fingers), p[0], p[1], p[2],
+                        n[0], n[1], n[2])
+        offset += HAND.size
+        for finger in fingers:
+            t = as_tuple(finger.tip_position)
+            d = as_tuple(finger.direction)
+            FINGER.pack_into(buffer, offset, finger.id, t[0], t[1], t[2],
+                            d[0], d[1], d[2], bool(finger.is_extended),
+                            getattr(finger, 'type', UNKNOWN_TYPE))
+            offset += FINGER.size
+        hand_count += 1
+        finger_count += len(fingers)
+    FRAME.pack_into(buffer, start, frame.id, frame.timestamp, hand_count,
+                    finger_count)
+    return offset - start
+
+
+def unpack_frame(data, offset, version=VERSION):
+    """
+    The `RecordedFrame` whose records are at `offset` in `data` (written
+    in the format of `version`)
+    """
+    frame_id, timestamp, hand_count, _ = FRAME.unpack_from(data, offset)
+    offset += FRAME.size
+    hands = []
+    for _ in range(hand_count):
+        hand_id, finger_count, px, py, pz, nx, ny, nz = \
+                        HAND.unpack_from(data, offset)
+        offset += HAND.size
+        fingers = []
+        for _ in range(finger_count):
+            finger_id, tx, ty, tz, dx, dy, dz, extended, type_ = \
+                        FINGER.unpack_from(data, offset)
+            offset += FINGER.size
+            if version < 2: # Padding
+                type_ = UNKNOWN_TYPE
+            fingers.append(FingerState(finger_id, (tx, ty, tz),
+                                    (dx, dy, dz), extended, type=type_))
+        hands.append(HandState(hand_id, (px, py, pz), (nx, ny, nz), fingers))
+    return RecordedFrame(frame_id, timestamp, hands)
+
+
+class RecordedFrame(object):
+    """
+    Stands in for a `Leap.Frame` when replaying a recording.
+    """
+
+    __slots__ = ('id', 'timestamp', 'hands')
+
+    def __init__(self, id, timestamp, hands):
+        self.id = id
+        self.timestamp = timestamp
+        self.hands = hands
+
 
 class FrameSerializer(object):
+    """
+    Record Leap frames (raw or tracked) to a binary file.
+
+    `out_fp` must be a file opened for binary writing; it has to be seekable
+    for `close` to fill in the header.
+    """
+
+    def __init__(self, out_fp):
+        self.out_fp = out_fp
+        self.frame_count = 0
+        self.offset = HEADER.size
+        self._index = []
+        self._records = []
+        out_fp.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+
+    def serialize(self, frame):
+        records = self._records
+        hand_count = finger_count = 0
+        records.append(None) # Frame record, once the counts are known
+        for hand in frame.hands:
+            fingers = list(hand.fingers)
+            self.serialize_hand(hand, len(fingers))
+            for finger in fingers:
+                self.serialize_finger(finger)
+            hand_count += 1
+            finger_count += len(fingers)
+        records[0] = FRAME.pack(frame.id, frame.timestamp, hand_count,
+                                finger_count)
+
+        data = b''.join(records)
+        del records[:]
+        self.out_fp.write(data)
+        self._index.append(INDEX.pack(frame.timestamp, self.offset))
+        self.offset += len(data)
+        self.frame_count += 1
+
+    def serialize_finger(self, finger):
+        t = as_tuple(finger.tip_position)
+        d = as_tuple(finger.direction)
+        self._records.append(FINGER.pack(finger.id, t[0], t[1], t[2],
+                                d[0], d[1], d[2], bool(finger.is_extended),
+                                getattr(finger, 'type', UNKNOWN_TYPE)))
+
+    def serialize_hand(self, hand, finger_count):
+        p = as_tuple(hand.palm_position)
+        n = as_tuple(hand.palm_normal)
+        self._records.append(HAND.pack(hand.id, finger_count, p[0], p[1], p[2],
+                                n[0], n[1], n[2]))
+
+    def close(self):
+        """
+        Write the index and fill in the header.
+        """
+        out_fp = self.out_fp
+        out_fp.write(b''.join(self._index))
+        out_fp.seek(0)
+        out_fp.write(HEADER.pack(MAGIC, VERSION, 0, self.frame_count, self.offset))
+        out_fp.flush()
+
+
+class FrameReader(object):
+    """
+    Random access to a recording made by `FrameSerializer`.
+
+    The file is memory mapped and records are decoded straight out of the
+    map as they're asked for, so opening and seeking around even a long
+    recording is cheap.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # Empty file
+            self._file.close()
+            raise RecordingError("'%s' is not a recording" % path)
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise RecordingError("'%s' is not a recording" % path)
+        magic, version, _, frame_count, index_offset = \
+                        HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise RecordingError("'%s' is not a recording" % path)
+        if not 1 <= version <= VERSION:
+            self.close()
+            raise RecordingError("Unsupported recording version %s" % version)
+        self.version = version
+
+        if index_offset:
+            self._index = self._map
+            self._index_offset = index_offset
+            self.frame_count = frame_count
+        else:
+            # Never closed; find the complete frames
+            self._index, self.frame_count = self._scan()
+            self._index_offset = 0
+
+    def _scan(self):
+        data = self._map
+        end = len(data)
+        index = bytearray()
+        offset = HEADER.size
+        count = 0
+        while offset + FRAME.size <= end:
+            _, timestamp, hand_count, finger_count = FRAME.unpack_from(data, offset)
+            size = frame_record_size(hand_count, finger_count)
+            if offset + size > end:
+                break
+            index += INDEX.pack(timestamp, offset)
+            offset += size
+            count += 1
+        return index, count
+
+    def __len__(self):
+        return self.frame_count
+
+    def __iter__(self):
+        for i in range(self.frame_count):
+            yield self[i]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _entry(self, i):
+        if i < 0:
+            i += self.frame_count
+        if not 0 <= i < self.frame_count:
+            raise IndexError("frame index out of range")
+        return INDEX.unpack_from(self._index, self._index_offset + i * INDEX.size)
+
+    def timestamp(self, i):
+        return self._entry(i)[0]
+
+    def find(self, timestamp):
+        """
+        Index of the first frame at or after `timestamp` (in microseconds.)
+        """
+        lo, hi = 0, self.frame_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamp(mid) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __getitem__(self, i):
+        return unpack_frame(self._map, self._entry(i)[1], self.version)
+
+    def close(self):
+        self._index = None
+        self._map.close()
+        self._file.close()
+
+
+class ReplayController(object):
+    """
+    Replays a recording to a listener in place of a `Leap.Controller`.
+
+    Frames are played at their recorded pace scaled by `speed` (so `2.0` is
+    twice as fast), or as fast as they can be handled if `speed` is `None`.
+    As with the Leap controller, `add_listener` returns straight away; the
+    frames are played on a separate thread.
+    """
+
+    def __init__(self, reader, speed=1.0, start=0, stop=None):
+        self.reader = reader
+        self.speed = speed or None
+        self.start = start
+        self.stop = len(reader) if stop is None else stop
+        self.current = None
+        self.frames_played = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def set_policy(self, policy):
+        pass
 
-	def __init__(self, out_fp):
-		self.out_fp = out_fp
+    def frame(self, history=0):
+        return self.current
 
-	def serialize(self, frame):
-		for hand in frame.hands:
-			self.serialize_hand(hand)
-			for finger in hand.fingers:
-				self.serialize_finger(finger)
+    def add_listener(self, listener):
+        listener.on_init(self)
+        listener.on_connect(self)
+        self._thread = threading.Thread(target=self.play, args=(listener,),
+                                        name="leapyosc-replay")
+        self._thread.daemon = True
+        self._thread.start()
 
-	def serialize_finger(self, finger):
-		pass
+    def remove_listener(self, listener):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        listener.on_disconnect(self)
+        listener.on_exit(self)
 
-	def serialize_hand(self, hand):
+    def is_playing(self):
+        return self._thread is not None and self._thread.is_alive()
 
-		pass
\ No newline at end of file
+    def play(self, listener):
+        reader = self.reader
+        speed = self.speed
+        if self.start >= self.stop:
+            return
+        first_timestamp = reader.timestamp(self.start)
+        started = time.time()
+        for i in range(self.start, self.stop):
+            if self._stopped.is_set():
+                break
+            if speed is not None:
+                due = started + (reader.timestamp(i) - first_timestamp) / 1e6 / speed
+                delay = due - time.time()
+                if delay > 0 and self._stopped.wait(delay):
+                    break
+            self.current = reader[i]
+            listener.on_frame(self)
+            self.frames_played += 1
@@ -0,0 +1,200 @@
+#
+#
+# Leapyosc
+# Hand-off of Leap frames to worker processes through shared memory
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+import mmap
+import multiprocessing
+import struct
+
+from serializer import frame_record_size, pack_frame_into, unpack_frame
+
+try:
+    from multiprocessing import shared_memory
+except ImportError: # Python < 3.8; an anonymous map, shared with forked workers
+    shared_memory = None
+
+
+# Layout: a header, then `slots` fixed size slots each holding a sequence
+# number followed by one frame's records (see serializer.py).
+#
+#   header  frames written, closed flag
+#   slot    sequence (2n + 1 while frame n is being written, 2n + 2 once
+#           it has been), then the frame's records
+#
+# There is one writer. Readers check a slot's sequence before and after
+# copying it out, so a frame overwritten while being read is noticed.
+RING_HEADER = struct.Struct('<QB7x')
+SEQUENCE = struct.Struct('<Q')
+
+
+class SharedFrameRing(object):
+    """
+    A ring of the last `slots` frames (of up to `max_hands` hands of
+    `max_fingers` fingers) in shared memory, written by one process and
+    read by any number of `SharedFrameReader`s in others.
+
+    The writer never waits for readers; a reader which falls more than
+    `slots` frames behind skips ahead (and counts what it missed.) Each
+    reader has an `Event` which is set whenever a frame is written.
+    """
+
+    def __init__(self, slots=64, max_hands=4, max_fingers=5, readers=1):
+        self.slots = slots
+        self.max_hands = max_hands
+        self.max_fingers = max_fingers
+        self.slot_size = SEQUENCE.size + \
+                        frame_record_size(max_hands, max_hands * max_fingers)
+        self.size = RING_HEADER.size + slots * self.slot_size
+        self.events = [multiprocessing.Event() for _ in range(readers)]
+        self.written = 0
+        self._owner = True
+        if shared_memory is not None:
+            self._shm = shared_memory.SharedMemory(create=True, size=self.size)
+            self.buffer = self._shm.buf
+        else:
+            self._shm = None
+            self.buffer = mmap.mmap(-1, self.size)
+        RING_HEADER.pack_into(self.buffer, 0, 0, 0)
+
+    def __getstate__(self):
+        if self._shm is None:
+            raise TypeError("Without multiprocessing.shared_memory the ring "
+                            "can only be shared with forked processes")
+        state = self.__dict__.copy()
+        state['_shm'] = self._shm.name
+        del state['buffer']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._owner = False
+        self._shm = shared_memory.SharedMemory(name=state['_shm'])
+        self.buffer = self._shm.buf
+
+    def slot_offset(self, n):
+        return RING_HEADER.size + (n % self.slots) * self.slot_size
+
+    def put(self, frame):
+        n = self.written
+        offset = self.slot_offset(n)
+        buffer = self.buffer
+        SEQUENCE.pack_into(buffer, offset, 2 * n + 1)
+        pack_frame_into(buffer, offset + SEQUENCE.size, frame,
+                        self.max_hands, self.max_fingers)
+        SEQUENCE.pack_into(buffer, offset, 2 * n + 2)
+        self.written = n + 1
+        RING_HEADER.pack_into(buffer, 0, self.written, 0)
+        for event in self.events:
+            event.set()
+
+    def close(self):
+        RING_HEADER.pack_into(self.buffer, 0, self.written, 1)
+        for event in self.events:
+            event.set()
+
+    def reader(self, index=0):
+        return SharedFrameReader(self, index)
+
+    def release(self):
+        """
+        Let go of the shared memory (and free it, if it was created here.)
+        """
+        if self._shm is not None:
+            self.buffer.release()
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+        else:
+            self.buffer.close()
+
+
+class SharedFrameReader(object):
+    """
+    Reads the frames written to a `SharedFrameRing` in order, starting
+    with the oldest still in the ring.
+    """
+
+    def __init__(self, ring, index=0):
+        self.ring = ring
+        self.event = ring.events[index]
+        self.next = max(0, self.written()[0] - ring.slots)
+        self.frames_read = 0
+        self.skipped = 0
+
+    def written(self):
+        """
+        `(frames written, closed)`
+        """
+        written, closed = RING_HEADER.unpack_from(self.ring.buffer, 0)
+        return written, bool(closed)
+
+    def read(self, n):
+        """
+        Frame `n`, or `None` if it has been (or is being) overwritten
+        """
+        ring = self.ring
+        buffer = ring.buffer
+        offset = ring.slot_offset(n)
+        if SEQUENCE.unpack_from(buffer, offset)[0] != 2 * n + 2:
+            return None
+        frame = unpack_frame(buffer, offset + SEQUENCE.size)
+        if SEQUENCE.unpack_from(buffer, offset)[0] != 2 * n + 2:
+            return None
+        return frame
+
+    def frames(self, timeout=0.1):
+        """
+        Yield each frame as it is written, until the ring is closed.
+        """
+        slots = self.ring.slots
+        while True:
+            self.event.clear()
+            written, closed = self.written()
+            while self.next < written:
+                if written - self.next > slots:
+                    self.skipped += written - slots - self.next
+                    self.next = written - slots
+                frame = self.read(self.next)
+                self.next += 1
+                if frame is None:
+                    self.skipped += 1
+                    continue
+                self.frames_read += 1
+                yield frame
+                written = self.written()[0]
+            if closed:
+                return
+            self.event.wait(timeout)
+
+
+class SharedRingController(object):
+    """
+    Plays the frames from a `SharedFrameReader` to a listener in place of
+    a `Leap.Controller`, on the calling thread, until the ring is closed.
+    """
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.current = None
+
+    def set_policy(self, policy):
+        pass
+
+    def frame(self, history=0):
+        return self.current
+
+    def play(self, listener):
+        listener.on_init(self)
+        listener.on_connect(self)
+        try:
+            for frame in self.reader.frames():
+                self.current = frame
+                listener.on_frame(self)
+        finally:
+            listener.on_disconnect(self)
+            listener.on_exit(self)
@@ -0,0 +1,119 @@
+#
+#
+# Leapyosc
+# Adaptive (One Euro) smoothing of whole frames of tracked parts
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+import numpy as np
+
+
+def smoothing_factor(cutoff, dt):
+    """
+    Exponential smoothing factor of a low-pass filter at `cutoff` Hz
+    for samples `dt` seconds apart
+    """
+    tau = 1.0 / (2 * np.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter(object):
+    """
+    The One Euro filter (Casiez, Roussel and Vogel, CHI 2012) applied to
+    the positions and directions of every hand and finger in a `FrameArray`
+    at once.
+
+    Each vector is low-pass filtered with a cutoff of `min_cutoff` Hz plus
+    `beta` times its (smoothed) speed, so slow movements have their jitter
+    taken out and fast ones aren't lagged. Positions' speeds are in mm/s;
+    directions' are scaled by `direction_scale` (as if they were that many
+    mm long) to be comparable. Directions are kept unit length.
+
+    State is kept in arrays indexed by (hand id, finger id + 1 or 0 for the
+    palm), so the ids must be small; i.e. tracked ones. A part's state is
+    started over when it is zeroed or missing from a frame.
+    """
+
+    # Columns of the state kept per part
+    VALUES = slice(0, 6)
+    SPEEDS = slice(6, 12)
+    TIME = 12
+
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0,
+                direction_scale=100.0, hands=4, fingers=8):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.direction_scale = direction_scale
+        # Speeds of (position, direction) are scaled by this
+        self.speed_scales = np.array([[1.0], [direction_scale]])
+        self.state = None
+        self._allocate(hands, fingers)
+
+    def _allocate(self, hands, fingers):
+        """
+        Room for hand ids up to `hands` and finger ids up to `fingers`
+        (keeping any state already kept)
+        """
+        state = np.zeros((hands + 1, fingers + 2, 13))
+        state[:, :, self.TIME] = np.nan
+        if self.state is not None:
+            h, f, _ = self.state.shape
+            state[:h, :f] = self.state
+        self.state = state
+
+    def reset(self):
+        self.state[:, :, self.TIME] = np.nan
+
+    def __call__(self, frame_array, timestamp):
+        """
+        Filter, in place, the positions and directions of the hands in
+        `frame_array`, as of `timestamp` (in seconds.)
+        """
+        count = frame_array.hand_count
+        if count == 0:
+            self.reset()
+            return frame_array
+        data = frame_array.hands
+        live, hands, parts = frame_array.live_parts()
+        if len(hands) == 0:
+            self.reset()
+            return frame_array
+        if hands.max() >= self.state.shape[0] or \
+                parts.max() >= self.state.shape[1]:
+            self._allocate(max(hands.max(), self.state.shape[0] - 1),
+                        max(parts.max(), self.state.shape[1] - 2))
+
+        vectors = data[:, :, :6]
+        x = vectors[live].reshape(-1, 2, 3)
+        state = self.state[hands, parts]
+        dt = timestamp - state[:, self.TIME]
+        # No state (nan) or no time passed: start over from this value
+        with np.errstate(invalid='ignore'):
+            fresh = ~(dt > 0)
+        dt[fresh] = 1.0
+        dt = dt[:, None, None]
+        previous = state[:, self.VALUES].reshape(-1, 2, 3)
+        previous[fresh] = x[fresh]
+        previous_speed = state[:, self.SPEEDS].reshape(-1, 2, 3)
+        previous_speed[fresh] = 0.0
+
+        speed = previous_speed + smoothing_factor(self.d_cutoff, dt) * \
+                        ((x - previous) / dt - previous_speed)
+        cutoff = self.min_cutoff + self.beta * self.speed_scales * \
+                        np.sqrt((speed * speed).sum(axis=2, keepdims=True))
+        filtered = previous + smoothing_factor(cutoff, dt) * (x - previous)
+
+        directions = filtered[:, 1]
+        norms = np.sqrt((directions * directions).sum(axis=1, keepdims=True))
+        np.divide(directions, norms, out=directions, where=norms > 0)
+
+        state[:, self.VALUES] = filtered.reshape(-1, 6)
+        state[:, self.SPEEDS] = speed.reshape(-1, 6)
+        state[:, self.TIME] = timestamp
+        self.reset()
+        self.state[hands, parts] = state
+        vectors[live] = filtered.reshape(-1, 6)
+        return frame_array
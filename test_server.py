@@ -1,61 +1,417 @@
-from OSC import OSCServer
+#
+#
+# Leapyosc
+# OSC receiver for trying out (and load testing) leapyosc
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+# Needs Python 3 (for asyncio), but not pyOSC.
+#
+
+import asyncio
+import heapq
+import json
+import socket
 import sys
-from time import sleep
+import time
+from collections import Counter, OrderedDict
+from optparse import OptionParser
+
+from frameblob import ADDRESS as FRAME_ADDRESS, decode_frame_message
+from oscpack import decode_message, decode_packet, message_address
+from timetags import bundle_timetag, from_timetag
+
+
+# See client.py --sequence
+SEQUENCE_ADDRESS = '/seq'
+SEQUENCE_MASK = 0x7fffffff
 
-message_count = 0
 
 def log(msg):
     sys.stderr.write(str(msg))
     sys.stderr.flush()
 
-def main(hostname="localhost",port="8000"):
-    server = OSCServer((hostname, int(port)))
-    server.timeout = 0
-    run = True
-    global message_count
-    message_count = 0
-
-    # this method of reporting timeouts only works by convention
-    # that before calling handle_request() field .timed_out is 
-    # set to False
-    def handle_timeout(self):
-        self.timed_out = True
-
-    # funny python's way to add a method to an instance of a class
-    import types
-    server.handle_timeout = types.MethodType(handle_timeout, server)
-
-    def user_callback(path, tags, args, source):
-        log("%s %s\n" % (path, args))
-        global message_count
-        message_count += 1
-
-    def quit_callback(path, tags, args, source):
-        #global run
-        run = False
-
-    server.addMsgHandler( "default", user_callback )
-    server.addMsgHandler( "/quit", quit_callback )
-
-    # user script that's called by the game engine every frame
-    def each_frame():
-        log("Messages received: %s\n" % message_count)
-        # clear timed_out flag
-        server.timed_out = False
-        # handle all pending requests then return
-        while not server.timed_out:
-            server.handle_request()
-
-    # simulate a "game engine"
-    print "Server running at %s:%s" % (hostname, port)
-    while run:
-        # do the game stuff:
-        sleep(1)
-        # call user script
-        each_frame()
-
-    server.close()
+
+class SequenceTracker(object):
+    """
+    Packets lost, reordered and duplicated between one sender and us, from
+    the `/seq` numbers it starts its bundles with.
+
+    A packet is counted lost as soon as one after it arrives, and taken
+    back off if it turns up (late, so reordered) within `window` packets.
+    A number further back than that means the sender started over.
+    """
+
+    def __init__(self, window=1024):
+        self.window = window
+        self.expected = None
+        self.received = 0
+        self.lost = 0
+        self.reordered = 0
+        self.duplicates = 0
+        self.restarts = 0
+        self._missing = OrderedDict()
+
+    def add(self, sequence):
+        self.received += 1
+        if self.expected is None:
+            self.expected = (sequence + 1) & SEQUENCE_MASK
+            return
+        ahead = (sequence - self.expected) & SEQUENCE_MASK
+        if ahead < self.window:
+            for i in range(ahead):
+                self._missing[(self.expected + i) & SEQUENCE_MASK] = True
+            while len(self._missing) > self.window:
+                self._missing.popitem(last=False)
+            self.lost += ahead
+            self.expected = (sequence + 1) & SEQUENCE_MASK
+        elif sequence in self._missing:
+            del self._missing[sequence]
+            self.lost -= 1
+            self.reordered += 1
+        elif (self.expected - sequence) & SEQUENCE_MASK <= self.window:
+            self.duplicates += 1
+        else:
+            self.restarts += 1
+            self._missing.clear()
+            self.expected = (sequence + 1) & SEQUENCE_MASK
+
+
+class JitterMeter(object):
+    """
+    Jitter of bundles against their timetags, smoothed as RFC 3550
+    interarrival jitter is (plus the largest seen.)
+    """
+
+    def __init__(self):
+        self.previous = None
+        self.jitter = 0.0
+        self.max = 0.0
+
+    def add(self, sent, at):
+        if self.previous is not None:
+            deviation = abs((at - self.previous[1]) - (sent - self.previous[0]))
+            self.jitter += (deviation - self.jitter) / 16.0
+            self.max = max(self.max, deviation)
+        self.previous = (sent, at)
+
+    def __str__(self):
+        return "%.2f ms (max %.2f ms)" % (self.jitter * 1e3, self.max * 1e3)
+
+
+class JitterBuffer(object):
+    """
+    Holds timetagged bundles until `delay` seconds after their timetag.
+
+    The sender's clock may not be ours, so timetags are moved onto our
+    clock by the smallest (arrival - timetag) seen. Packets without
+    a timetag, and bundles arriving after their release time, are released
+    straight away.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.offset = None
+        self.late = 0
+        self._packets = []
+        self._count = 0
+
+    def __len__(self):
+        return len(self._packets)
+
+    def push(self, packet, arrival):
+        timetag = bundle_timetag(packet)
+        sent = from_timetag(timetag) if timetag is not None else None
+        if sent is None:
+            release = arrival
+        else:
+            if self.offset is None or arrival - sent < self.offset:
+                self.offset = arrival - sent
+            release = sent + self.offset + self.delay
+            if release < arrival:
+                self.late += 1
+                release = arrival
+        self._count += 1
+        heapq.heappush(self._packets, (release, self._count, packet, sent))
+        return sent
+
+    def next_release(self):
+        return self._packets[0][0] if self._packets else None
+
+    def pop_due(self, now):
+        """
+        `(packet, sent)` for each packet due for release by `now`, in order
+        """
+        while self._packets and self._packets[0][0] <= now:
+            release, _, packet, sent = heapq.heappop(self._packets)
+            yield packet, sent
+
+
+class ReceiverStats(object):
+    """
+    What has been received since the last `reset` (and in total.)
+    """
+
+    def __init__(self):
+        self.total_packets = 0
+        self.total_messages = 0
+        self.sequences = {}
+        self.reset(time.time())
+
+    def reset(self, now):
+        self.started = now
+        self.packets = 0
+        self.bytes = 0
+        self.addresses = Counter()
+        self.sequence_totals = self.totals()
+
+    def totals(self):
+        """
+        Lost, reordered and duplicated packets over all senders
+        """
+        return (sum(s.lost for s in self.sequences.values()),
+                sum(s.reordered for s in self.sequences.values()),
+                sum(s.duplicates for s in self.sequences.values()))
+
+    def summary(self, now, per_address=False):
+        elapsed = max(now - self.started, 1e-9)
+        messages = sum(self.addresses.values())
+        totals = self.totals()
+        summary = OrderedDict([
+            ('seconds', round(elapsed, 3)),
+            ('packets_per_sec', round(self.packets / elapsed, 1)),
+            ('messages_per_sec', round(messages / elapsed, 1)),
+            ('bytes_per_sec', round(self.bytes / elapsed, 1)),
+            ('addresses', len(self.addresses)),
+        ])
+        if self.sequences:
+            summary['lost'], summary['reordered'], summary['duplicates'] = \
+                        [t - before for t, before in
+                            zip(totals, self.sequence_totals)]
+        if per_address:
+            summary['address_rates'] = OrderedDict(
+                        (address, round(count / elapsed, 1))
+                        for address, count in sorted(self.addresses.items()))
+        return summary
+
+
+def format_summary(summary):
+    line = ("%(packets_per_sec).0f packets/s, %(messages_per_sec).0f msgs/s, "
+            "%(kb).1f KB/s, %(addresses)s addresses" %
+            dict(summary, kb=summary['bytes_per_sec'] / 1e3))
+    if 'lost' in summary:
+        line += "; lost %(lost)s, reordered %(reordered)s, " \
+                "duplicated %(duplicates)s" % summary
+    for address, rate in summary.get('address_rates', {}).items():
+        line += "\n    %-32s %8.1f/s" % (address, rate)
+    return line
+
+
+class OSCReceiver(asyncio.DatagramProtocol):
+    """
+    Takes packets off the socket as they arrive, and decodes them in
+    batches (every `batch_interval` seconds, or `batch_size` packets)
+    counting messages per address, and (with client.py --sequence or
+    --blob) packets lost and reordered. `/frame` blobs are unpacked.
+    Stats are reported every `report_interval` seconds.
+
+    `/quit` stops the receiver unless `keep_running`. With `jitter_buffer`
+    (a `JitterBuffer`) the jitter of timetagged bundles is also measured as
+    received and as played back on their timetags.
+    """
+
+    def __init__(self, verbose=False, per_address=False, as_json=False,
+                keep_running=False, jitter_buffer=None, batch_size=256,
+                batch_interval=0.005, report_interval=1.0):
+        self.verbose = verbose
+        self.per_address = per_address
+        self.as_json = as_json
+        self.keep_running = keep_running
+        self.jitter_buffer = jitter_buffer
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.report_interval = report_interval
+        self.stats = ReceiverStats()
+        self.received_jitter = JitterMeter()
+        self.played_jitter = JitterMeter()
+        self.pending = []
+        self.batch_handle = None
+        self.release_handle = None
+        self.release_at = None
+        self.loop = None
+        self.transport = None
+        self.done = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.loop = asyncio.get_running_loop()
+        self.done = self.loop.create_future()
+        self.loop.call_later(self.report_interval, self.report)
+
+    def connection_lost(self, exc):
+        if not self.done.done():
+            self.done.set_result(None)
+
+    def error_received(self, exc):
+        log("Receive error: %s\n" % exc)
+
+    def datagram_received(self, data, source):
+        self.pending.append((data, source, time.time()))
+        if len(self.pending) >= self.batch_size:
+            if self.batch_handle is not None:
+                self.batch_handle.cancel()
+            self.batch_handle = self.loop.call_soon(self.decode_pending)
+        elif self.batch_handle is None:
+            self.batch_handle = self.loop.call_later(self.batch_interval,
+                                                    self.decode_pending)
+
+    def decode_pending(self):
+        self.batch_handle = None
+        pending, self.pending = self.pending, []
+        stats = self.stats
+        addresses = stats.addresses
+        for data, source, arrival in pending:
+            stats.packets += 1
+            stats.bytes += len(data)
+            timetag, messages = decode_packet(data)
+            for binary in messages:
+                address = message_address(binary)
+                addresses[address] += 1
+                if address == FRAME_ADDRESS:
+                    # client.py --blob
+                    frame = decode_frame_message(binary)
+                    self.sequence(source).add(frame.sequence & SEQUENCE_MASK)
+                    if self.verbose:
+                        log("%s #%s %s %s\n" % (address, frame.sequence,
+                                                frame.timestamp, frame.hands))
+                    continue
+                if address == SEQUENCE_ADDRESS:
+                    self.sequence(source).add(decode_message(binary)[1][0])
+                elif address == '/quit' and not self.keep_running:
+                    self.stop()
+                if self.verbose:
+                    log("%s %s\n" % decode_message(binary))
+            stats.total_messages += len(messages)
+            if self.jitter_buffer is not None:
+                sent = self.jitter_buffer.push(data, arrival)
+                if sent is not None:
+                    self.received_jitter.add(sent, arrival)
+        stats.total_packets += len(pending)
+        if self.jitter_buffer is not None:
+            self.schedule_release()
+
+    def sequence(self, source):
+        try:
+            return self.stats.sequences[source]
+        except KeyError:
+            tracker = self.stats.sequences[source] = SequenceTracker()
+            return tracker
+
+    def schedule_release(self):
+        release = self.jitter_buffer.next_release()
+        if release is None:
+            return
+        if self.release_handle is not None:
+            if self.release_at <= release:
+                return
+            self.release_handle.cancel()
+        self.release_at = release
+        self.release_handle = self.loop.call_later(
+                        max(0.0, release - time.time()), self.release_due)
+
+    def release_due(self):
+        self.release_handle = None
+        for packet, sent in self.jitter_buffer.pop_due(time.time()):
+            if sent is not None:
+                self.played_jitter.add(sent, time.time())
+        self.schedule_release()
+
+    def report(self):
+        if self.done.done():
+            return
+        now = time.time()
+        summary = self.stats.summary(now, self.per_address)
+        if self.jitter_buffer is not None:
+            summary['jitter_received_ms'] = round(
+                                    self.received_jitter.jitter * 1e3, 3)
+            summary['jitter_played_ms'] = round(
+                                    self.played_jitter.jitter * 1e3, 3)
+            summary['late'] = self.jitter_buffer.late
+        if self.as_json:
+            sys.stdout.write(json.dumps(summary) + "\n")
+            sys.stdout.flush()
+        elif summary['packets_per_sec'] or self.verbose:
+            line = format_summary(summary)
+            if self.jitter_buffer is not None:
+                line += "; jitter received %s, played %s; %s late, " \
+                        "%s buffered" % (self.received_jitter,
+                                        self.played_jitter,
+                                        self.jitter_buffer.late,
+                                        len(self.jitter_buffer))
+            log(line + "\n")
+        self.received_jitter.max = self.played_jitter.max = 0.0
+        self.stats.reset(now)
+        self.loop.call_later(self.report_interval, self.report)
+
+    def stop(self):
+        if not self.done.done():
+            self.done.set_result(None)
+
+
+async def serve(hostname="localhost", port=8000, receive_buffer=4 << 20,
+                **kwargs):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+    sock.bind((hostname, int(port)))
+    loop = asyncio.get_running_loop()
+    transport, receiver = await loop.create_datagram_endpoint(
+                        lambda: OSCReceiver(**kwargs), sock=sock)
+    log("Server running at %s:%s\n" % (hostname, port))
+    try:
+        await receiver.done
+    finally:
+        if receiver.pending:
+            receiver.decode_pending()
+        transport.close()
+        stats = receiver.stats
+        log("Received %s packets, %s messages" % (stats.total_packets,
+                                                stats.total_messages))
+        if stats.sequences:
+            log("; lost %s, reordered %s, duplicated %s" % stats.totals())
+        log("\n")
+    return receiver
+
+
+def main(hostname="localhost", port="8000", **kwargs):
+    try:
+        asyncio.run(serve(hostname, port, **kwargs))
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
-    main(*sys.argv[1:])
\ No newline at end of file
+    parser = OptionParser(usage="usage: %prog [options] [host] [port]")
+    parser.add_option("-v", "--verbose", dest="verbose", action="store_true",
+        help="Log every message received")
+    parser.add_option("-a", "--addresses", dest="per_address",
+        action="store_true",
+        help="Report the rate of each address received")
+    parser.add_option("--json", dest="as_json", action="store_true",
+        help="Report as a line of JSON (on stdout) a second")
+    parser.add_option("-k", "--keep-running", dest="keep_running",
+        action="store_true",
+        help="Don't stop on `/quit` (e.g. when receiving from several runs)")
+    parser.add_option("-j", "--jitter-buffer", dest="jitter_buffer_ms",
+        type="float", action="store", default=None, metavar="MS",
+        help="Play timetagged bundles (see client.py --timetags) back MS "
+        "milliseconds after their timetags, and report jitter before and "
+        "after")
+    (opts, args_) = parser.parse_args()
+
+    jitter_buffer = None
+    if opts.jitter_buffer_ms is not None:
+        jitter_buffer = JitterBuffer(opts.jitter_buffer_ms / 1e3)
+    main(*args_, verbose=opts.verbose, per_address=opts.per_address,
+        as_json=opts.as_json, keep_running=opts.keep_running,
+        jitter_buffer=jitter_buffer)
@@ -0,0 +1,123 @@
+#
+# Tests for frameblob.py
+#
+# Usage: python -m unittest discover tests (or: pytest tests)
+#
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from frameblob import (FrameBlobEncoder, decode_frame_message, HEADER,
+                      BLOB_VERSION, FLOAT32, INT16, ADDRESS)
+from oscpack import as_bytes, decode_message, message_address
+
+
+# Values float32 holds exactly
+HANDS = [
+    (1, (12.5, 187.25, -30.0), (0.0, -1.0, 0.0), [
+        (1, (10.0, 200.5, -40.25), (0.5, 0.25, -0.75), True),
+        (2, (-20.0, 190.0, -35.5), (0.0, 0.0, -1.0), False),
+    ]),
+    (3, (-100.0, 150.0, 20.0), (0.125, -0.5, 0.0), []),
+]
+
+
+def encode(encoder, frame_id=1234, timestamp=5678901234, hands=HANDS):
+    return as_bytes(encoder.encode(frame_id, timestamp, hands))
+
+
+class FrameBlobTest(unittest.TestCase):
+
+    def assertHandsAlmostEqual(self, hands, expected, delta):
+        self.assertEqual(len(hands), len(expected))
+        for hand, expected_hand in zip(hands, expected):
+            self.assertEqual(hand[0], expected_hand[0])
+            self.assertEqual(len(hand[3]), len(expected_hand[3]))
+            parts = [(hand, expected_hand)] + list(zip(hand[3],
+                                                       expected_hand[3]))
+            for part, expected_part in parts:
+                self.assertEqual(part[0], expected_part[0])
+                for vector, expected_vector in zip(part[1:3],
+                                                   expected_part[1:3]):
+                    for value, expected_value in zip(vector, expected_vector):
+                        self.assertAlmostEqual(value, expected_value,
+                                               delta=delta)
+            for finger, expected_finger in parts[1:]:
+                self.assertEqual(finger[3], expected_finger[3])
+
+    def test_float32_round_trip(self):
+        frame = decode_frame_message(encode(FrameBlobEncoder(FLOAT32)))
+        self.assertEqual((frame.sequence, frame.id, frame.timestamp),
+                         (0, 1234, 5678901234))
+        self.assertEqual([(hand[0], tuple(hand[1]), tuple(hand[2]),
+                           [(f[0], tuple(f[1]), tuple(f[2]), f[3])
+                            for f in hand[3]])
+                          for hand in frame.hands], HANDS)
+
+    def test_int16_round_trip(self):
+        frame = decode_frame_message(encode(FrameBlobEncoder(INT16, 10.0)))
+        self.assertEqual((frame.id, frame.timestamp), (1234, 5678901234))
+        # To within the fixed point resolution
+        self.assertHandsAlmostEqual(frame.hands, HANDS, 0.05 + 1e-9)
+
+    def test_int16_clamps(self):
+        hands = [(1, (5000.0, -5000.0, 0.0), (1.0, -1.0, 0.0), [])]
+        frame = decode_frame_message(encode(FrameBlobEncoder(INT16, 10.0),
+                                            hands=hands))
+        self.assertHandsAlmostEqual(frame.hands,
+                    [(1, (3276.7, -3276.8, 0.0), (1.0, -1.0, 0.0), [])], 1e-4)
+
+    def test_no_hands(self):
+        frame = decode_frame_message(encode(FrameBlobEncoder(), -1, 0, []))
+        self.assertEqual((frame.id, frame.timestamp, frame.hands),
+                         (-1, 0, []))
+
+    def test_is_an_osc_message(self):
+        for format in (FLOAT32, INT16):
+            binary = encode(FrameBlobEncoder(format))
+            self.assertEqual(len(binary) % 4, 0)
+            self.assertEqual(message_address(binary), ADDRESS)
+            address, (blob,) = decode_message(binary)
+            # Two hands, two fingers
+            self.assertEqual(len(blob), HEADER.size + 4 *
+                             FrameBlobEncoder(format).part.size)
+
+    def test_counts_frames_sent(self):
+        encoder = FrameBlobEncoder()
+        for sequence in range(3):
+            self.assertEqual(decode_frame_message(encode(encoder)).sequence,
+                             sequence)
+        encoder.sequence = 0xffffffff
+        encode(encoder)
+        self.assertEqual(decode_frame_message(encode(encoder)).sequence, 0)
+
+    def test_reuses_its_buffer(self):
+        # Each frame decodes the same, however big the one before it was
+        encoder = FrameBlobEncoder()
+        big = [(n, (0.0, 0.0, 0.0), (0.0, 0.0, 0.0), HANDS[0][3] * 50)
+               for n in range(4)]
+        first = encode(FrameBlobEncoder())
+        encode(encoder, hands=big)
+        binary = encode(encoder)
+        self.assertEqual(len(binary), len(first))
+        self.assertEqual(decode_frame_message(binary).hands,
+                         decode_frame_message(first).hands)
+
+    def test_rejects_other_versions(self):
+        encoder = FrameBlobEncoder()
+        binary = bytearray(encode(encoder))
+        # After the address, typetags and blob size
+        start = len(encoder.prefix) + 4
+        self.assertEqual(binary[start], BLOB_VERSION)
+        binary[start] = BLOB_VERSION + 1
+        self.assertRaises(ValueError, decode_frame_message, bytes(binary))
+
+    def test_rejects_unknown_formats(self):
+        self.assertRaises(ValueError, FrameBlobEncoder, 'float64')
+
+
+if __name__ == "__main__":
+    unittest.main()
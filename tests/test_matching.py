@@ -0,0 +1,132 @@
+#
+# Tests for matching.py
+#
+# Usage: python -m unittest discover tests (or: pytest tests)
+#
+# Skipped where NumPy isn't installed.
+#
+
+import itertools
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    from matching import min_cost_assignment, match_nearest
+except ImportError:
+    min_cost_assignment = match_nearest = None
+
+
+def best_total(cost):
+    """
+    The least total cost of pairing every row (or column, if there are
+    fewer) of `cost`, found by trying every pairing
+    """
+    n, m = len(cost), len(cost[0])
+    if n <= m:
+        return min(sum(cost[i][j] for i, j in enumerate(columns))
+                   for columns in itertools.permutations(range(m), n))
+    return min(sum(cost[i][j] for j, i in enumerate(rows))
+               for rows in itertools.permutations(range(n), m))
+
+
+@unittest.skipIf(min_cost_assignment is None, "needs NumPy")
+class MinCostAssignmentTest(unittest.TestCase):
+
+    def check(self, cost):
+        """
+        Checks the pairs for `cost` pair as many rows and columns as there
+        can be, each at most once, at the least total cost
+        """
+        pairs = min_cost_assignment(cost)
+        rows = [i for i, j in pairs]
+        columns = [j for i, j in pairs]
+        self.assertEqual(len(pairs), min(len(cost), len(cost[0])))
+        self.assertEqual(len(set(rows)), len(rows))
+        self.assertEqual(len(set(columns)), len(columns))
+        self.assertAlmostEqual(sum(cost[i][j] for i, j in pairs),
+                               best_total(cost))
+        return sorted(pairs)
+
+    def test_square(self):
+        self.assertEqual(self.check([[4.0, 1.0, 3.0],
+                                     [2.0, 0.0, 5.0],
+                                     [3.0, 2.0, 2.0]]),
+                         [(0, 1), (1, 0), (2, 2)])
+
+    def test_nearest_is_not_always_best(self):
+        # Row 0 is nearest column 0, but giving it to row 1 costs less
+        self.assertEqual(self.check([[1.0, 2.0],
+                                     [1.5, 10.0]]),
+                         [(0, 1), (1, 0)])
+
+    def test_more_columns(self):
+        self.assertEqual(self.check([[9.0, 1.0, 8.0, 7.0],
+                                     [9.0, 2.0, 3.0, 9.0]]),
+                         [(0, 1), (1, 2)])
+
+    def test_more_rows(self):
+        self.assertEqual(self.check([[9.0, 9.0],
+                                     [1.0, 2.0],
+                                     [8.0, 3.0],
+                                     [7.0, 9.0]]),
+                         [(1, 0), (2, 1)])
+
+    def test_one_row_or_column(self):
+        self.assertEqual(self.check([[3.0, 1.0, 2.0]]), [(0, 1)])
+        self.assertEqual(self.check([[3.0], [1.0], [2.0]]), [(1, 0)])
+
+    def test_ties(self):
+        self.check([[1.0, 1.0], [1.0, 1.0]])
+        self.check([[0.0, 0.0, 0.0], [0.0, 0.0, 0.0]])
+        self.check([[2.0, 1.0, 1.0], [1.0, 2.0, 1.0], [1.0, 1.0, 2.0]])
+        self.check([[5.0, 5.0], [5.0, 5.0], [5.0, 5.0]])
+
+    def test_against_every_pairing(self):
+        # Small integer costs, so there are plenty of ties
+        for n, m in [(3, 3), (2, 5), (5, 2), (4, 4), (4, 6)]:
+            for seed in range(20):
+                cost = [[(seed * 7 + i * 13 + j * 5 + i * j * seed) % 6
+                         for j in range(m)] for i in range(n)]
+                self.check(cost)
+
+
+@unittest.skipIf(match_nearest is None, "needs NumPy")
+class MatchNearestTest(unittest.TestCase):
+
+    def test_matches_nearest(self):
+        self.assertEqual(sorted(match_nearest(
+                                    [(0.0, 0.0, 0.0), (100.0, 0.0, 0.0)],
+                                    [(98.0, 0.0, 0.0), (1.0, 1.0, 0.0)],
+                                    10.0)),
+                         [(0, 1), (1, 0)])
+
+    def test_gate_rejects_pairs(self):
+        self.assertEqual(match_nearest([(0.0, 0.0, 0.0)],
+                                       [(0.0, 30.0, 40.0)], 49.0), [])
+        self.assertEqual(match_nearest([(0.0, 0.0, 0.0)],
+                                       [(0.0, 30.0, 40.0)], 50.0), [(0, 0)])
+
+    def test_gate_rejects_only_pairs_too_far_apart(self):
+        positions = [(0.0, 0.0, 0.0), (100.0, 0.0, 0.0), (200.0, 0.0, 0.0)]
+        lost = [(205.0, 0.0, 0.0), (3.0, 0.0, 0.0), (150.0, 0.0, 0.0)]
+        self.assertEqual(sorted(match_nearest(positions, lost, 10.0)),
+                         [(0, 1), (2, 0)])
+
+    def test_matches_as_many_as_the_gate_allows(self):
+        # Pairing the nearest two (0 and 0) would leave 1 and 1, further
+        # apart than the gate, unmatched
+        positions = [(0.0, 0.0, 0.0), (8.0, 0.0, 0.0)]
+        lost = [(2.0, 0.0, 0.0), (-9.0, 0.0, 0.0)]
+        self.assertEqual(sorted(match_nearest(positions, lost, 10.0)),
+                         [(0, 1), (1, 0)])
+
+    def test_nothing_to_match(self):
+        self.assertEqual(match_nearest([], [(0.0, 0.0, 0.0)], 10.0), [])
+        self.assertEqual(match_nearest([(0.0, 0.0, 0.0)], [], 10.0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
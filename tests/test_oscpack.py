@@ -0,0 +1,227 @@
+#
+# Tests for oscpack.py
+#
+# Usage: python -m unittest discover tests (or: pytest tests)
+#
+# Comparisons with pyOSC are skipped where it isn't importable (it is
+# Python 2 only).
+#
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from oscpack import (OSCAddressTable, BundleEncoder, IndexedBundleEncoder,
+                    MessageTemplate, encode_message, decode_message,
+                    decode_packet, bundle_elements, split_bundle, as_bytes,
+                    IMMEDIATELY)
+
+try:
+    import OSC
+except ImportError:
+    OSC = None
+
+
+TIP = (12.5, 187.25, -30.0)
+DIRECTION = (0.1, 0.2, -0.97)
+
+
+def encode_frame(encoder, table, vector_as_args, timetag=IMMEDIATELY):
+    """
+    Two hands of five fingers, as `BundledMixin` sends them
+    """
+    encoder.begin(timetag)
+    for hand_id in (1, 2):
+        for finger_id in (1, 2, 3, 4, 5, None):
+            encoder.add_vector(table.get(hand_id, finger_id, 't',
+                                        vector_as_args), TIP)
+            encoder.add_vector(table.get(hand_id, finger_id, 'd',
+                                        vector_as_args), DIRECTION)
+            if finger_id is not None:
+                template, = table.get(hand_id, finger_id, 'extended')
+                encoder.add(template, 1)
+    return as_bytes(encoder.getvalue())
+
+
+def pyosc_frame(vector_as_args):
+    """
+    The same frame built with pyOSC, as the original `BundledMixin` did
+    """
+    bundle = OSC.OSCBundle()
+
+    def send(address, value):
+        message = OSC.OSCMessage(address)
+        message.append(value)
+        bundle.append(message)
+
+    def send_vector(base, vector):
+        if vector_as_args:
+            send("%sxyz" % base, vector)
+        else:
+            for axis, value in zip("xyz", vector):
+                send("%s%s" % (base, axis), value)
+
+    for hand_id in (1, 2):
+        for finger_id in (1, 2, 3, 4, 5, None):
+            base = "/hand%d/palm/" % hand_id if finger_id is None else \
+                        "/hand%d/finger%d/" % (hand_id, finger_id)
+            send_vector(base + "t", TIP)
+            send_vector(base + "d", DIRECTION)
+            if finger_id is not None:
+                send(base + "extended", 1)
+    return bundle.getBinary()
+
+
+class BundleEncoderTest(unittest.TestCase):
+
+    @unittest.skipIf(OSC is None, "needs pyOSC")
+    def test_same_bytes_as_pyosc(self):
+        for vector_as_args in (False, True):
+            self.assertEqual(encode_frame(BundleEncoder(), OSCAddressTable(),
+                                        vector_as_args),
+                            pyosc_frame(vector_as_args))
+
+    @unittest.skipIf(OSC is None, "needs pyOSC")
+    def test_messages_same_bytes_as_pyosc(self):
+        for address, values in [('/a', (1,)), ('/seq', ()),
+                                ('/status/quality', (2, 'coarse')),
+                                ('/hand1/palm/txyz', TIP)]:
+            message = OSC.OSCMessage(address)
+            for value in values:
+                message.append(value)
+            self.assertEqual(encode_message(address, *values),
+                            message.getBinary())
+
+    def test_indexed_encoder_same_bytes(self):
+        for vector_as_args in (False, True):
+            self.assertEqual(encode_frame(IndexedBundleEncoder(),
+                                        OSCAddressTable(), vector_as_args),
+                            encode_frame(BundleEncoder(), OSCAddressTable(),
+                                        vector_as_args))
+
+    def test_grows_past_its_buffer(self):
+        # Begun again (as each frame is) after growing, from a small buffer
+        encoder = BundleEncoder(size=64)
+        table = OSCAddressTable()
+        first = encode_frame(encoder, table, False)
+        self.assertEqual(encode_frame(encoder, table, False), first)
+        self.assertEqual(first, encode_frame(BundleEncoder(), table, False))
+
+    def test_decodes(self):
+        encoder = BundleEncoder()
+        encoder.begin((1, 2))
+        encoder.add(MessageTemplate('/hand1/palm/txyz', 'fff'), *TIP)
+        encoder.add(MessageTemplate('/hand1/finger1/extended', 'i'), 0)
+        encoder.add_binary(encode_message('/status/quality', 1, 'full'))
+        timetag, messages = decode_packet(as_bytes(encoder.getvalue()))
+        self.assertEqual(timetag, (1, 2))
+        self.assertEqual([decode_message(m) for m in messages], [
+            ('/hand1/palm/txyz', list(TIP)),
+            ('/hand1/finger1/extended', [0]),
+            ('/status/quality', [1, 'full']),
+        ])
+
+
+def hand_group(address):
+    # As `BundledMixin.bundle_group`
+    return address.split("/", 2)[1]
+
+
+class SplitBundleTest(unittest.TestCase):
+
+    TIMETAG = (3, 4)
+
+    def setUp(self):
+        encoder = IndexedBundleEncoder()
+        self.bundle = encode_frame(encoder, OSCAddressTable(), False,
+                                   self.TIMETAG)
+        self.elements = encoder.elements
+
+    def split(self, max_size, group=hand_group):
+        return split_bundle(self.bundle, self.elements, max_size, group)
+
+    def decode(self, bundle):
+        timetag, messages = decode_packet(bundle)
+        self.assertEqual(timetag, self.TIMETAG)
+        return [decode_message(m) for m in messages]
+
+    def check_split(self, split, max_size):
+        messages = []
+        for bundle, elements in split:
+            self.assertTrue(len(bundle) <= max_size, len(bundle))
+            self.assertEqual(elements, bundle_elements(bundle))
+            messages.extend(self.decode(bundle))
+        # Nothing lost or repeated
+        self.assertEqual(sorted(messages), sorted(self.decode(self.bundle)))
+
+    def test_small_enough_bundle_is_kept(self):
+        split = self.split(len(self.bundle))
+        self.assertEqual(split, [(self.bundle, self.elements)])
+
+    def test_bundles_fit(self):
+        for max_size in (200, 600, 1000, len(self.bundle) - 1):
+            self.check_split(self.split(max_size), max_size)
+
+    def test_hands_kept_together(self):
+        hand_size = (len(self.bundle) - 16) // 2
+        split = self.split(16 + hand_size)
+        self.check_split(split, 16 + hand_size)
+        self.assertEqual(len(split), 2)
+        for bundle, elements in split:
+            self.assertEqual(len(set(hand_group(address)
+                                     for address, _, _ in elements)), 1)
+
+    def test_hands_packed_together_where_they_fit(self):
+        encoder = IndexedBundleEncoder()
+        encoder.begin(self.TIMETAG)
+        table = OSCAddressTable()
+        for hand_id in (1, 2, 3):
+            for finger_id in (1, 2, None):
+                encoder.add_vector(table.get(hand_id, finger_id, 't'), TIP)
+        bundle = as_bytes(encoder.getvalue())
+        hand_size = (len(bundle) - 16) // 3
+        split = split_bundle(bundle, encoder.elements,
+                             16 + hand_size * 2, hand_group)
+        self.assertEqual(len(split), 2)
+        self.assertEqual(sorted(len(elements) for _, elements in split),
+                         [9, 18])
+
+    def test_elements_kept_in_order(self):
+        order = [address for address, _, _ in self.elements]
+        for bundle, elements in self.split(300):
+            addresses = [address for address, _, _ in elements]
+            self.assertEqual(addresses,
+                             sorted(addresses, key=order.index))
+
+    def test_group_too_big_is_broken_up_in_order(self):
+        # Into runs of consecutive elements
+        order = [address for address, _, _ in self.elements]
+        split = self.split(200)
+        self.check_split(split, 200)
+        for bundle, elements in split:
+            for hand in ('hand1', 'hand2'):
+                indexes = [order.index(address) for address, _, _ in elements
+                           if hand_group(address) == hand]
+                self.assertEqual(indexes,
+                                 list(range(indexes[0], indexes[0] +
+                                            len(indexes)))
+                                 if indexes else [])
+
+    def test_element_too_big_gets_a_bundle_of_its_own(self):
+        encoder = IndexedBundleEncoder()
+        encoder.begin(self.TIMETAG)
+        encoder.add(MessageTemplate('/hand1/palm/tx', 'f'), 1.0)
+        encoder.add_binary(encode_message('/hand1/name', 'x' * 100))
+        encoder.add(MessageTemplate('/hand1/palm/ty', 'f'), 2.0)
+        split = split_bundle(as_bytes(encoder.getvalue()),
+                             encoder.elements, 80, hand_group)
+        self.assertEqual([[address for address, _, _ in elements]
+                          for _, elements in split],
+                         [['/hand1/name'], ['/hand1/palm/tx',
+                                            '/hand1/palm/ty']])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+#
+# Tests for how client.py composes (and specializes) listeners from
+# `PIPELINE`
+#
+# Usage: python -m unittest discover tests (or: pytest tests)
+#
+# Skipped where client.py can't be imported (it needs pyOSC, which is
+# Python 2 only); the stand-in `Leap` module in benchmarks/synthetic is used
+# in place of the Leap SDK.
+#
+
+import os
+import socket
+import sys
+import unittest
+
+HERE = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(HERE, '..', 'benchmarks', 'synthetic'))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+try:
+    import Leap
+    import client
+except ImportError:
+    client = None
+
+
+def make_listener(*args, **kwargs):
+    parser = client.make_parser()
+    options, _ = parser.parse_args(list(args))
+    client.check_options(parser, options)
+    return client.make_listener(options, 'localhost',
+                                kwargs.get('port', 9),
+                                kwargs.get('stages', client.PIPELINE))
+
+
+@unittest.skipIf(client is None, "needs client.py's dependencies")
+class SpecializeTest(unittest.TestCase):
+
+    def specialized(self, listener):
+        return 'send_part_vector' in vars(listener)
+
+    def test_bundled_part_values_encoded_directly(self):
+        # Stages which don't change the part values sent
+        for args in ([], ['-m'], ['--timetags'], ['--max-datagram', '600'],
+                     ['--sequence'], ['--instrument'], ['--dumb'],
+                     ['--destination', 'localhost:10'], ['--adaptive'],
+                     ['--numpy'], ['--metric', 'pinch'], ['--smooth']):
+            if client.FrameArray is None and \
+                    set(args) & set(['--numpy', '--metric', '--smooth']):
+                continue
+            listener = make_listener(*args)
+            self.assertEqual(listener.overridden_part_methods(), [], args)
+            self.assertTrue(self.specialized(listener), args)
+
+    def test_not_specialized_when_values_are_changed(self):
+        listener = make_listener('--delta')
+        self.assertEqual(listener.overridden_part_methods(),
+                         [('send_part_value', client.DeltaMixin),
+                          ('send_part_vector', client.DeltaMixin)])
+        self.assertFalse(self.specialized(listener))
+
+    def test_not_specialized_unbundled(self):
+        for args in (['--unbundled'], ['--pyosc-bundles'],
+                     ['--blob', 'float32']):
+            self.assertFalse(self.specialized(make_listener(*args)), args)
+
+
+class FrameCounter(object):
+    """
+    A stage which counts the frames passed through it
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.frames_counted = 0
+        super(FrameCounter,self).__init__(*args, **kwargs)
+
+    def send_frame_data(self, frame):
+        self.frames_counted += 1
+        return super(FrameCounter,self).send_frame_data(frame)
+
+
+@unittest.skipIf(client is None, "needs client.py's dependencies")
+class SwapStageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sink.bind(('127.0.0.1', 0))
+        self.sink.settimeout(0.2)
+
+    def tearDown(self):
+        self.sink.close()
+
+    def sent(self, *args, **kwargs):
+        """
+        The packets sent for 20 synthetic frames
+        """
+        listener = make_listener(port=self.sink.getsockname()[1], *args,
+                                 **kwargs)
+        controller = Leap.Controller(Leap.SyntheticFrames(motion=Leap.JITTER,
+                                                          churn=0.01))
+        packets = []
+        for _ in range(20):
+            controller.step()
+            listener.on_frame(controller)
+            packets.append(self.sink.recv(65536))
+        return listener, packets
+
+    def test_swapped_stage_is_used(self):
+        stages = [client.Stage('bundle', client.PyOSCBundledMixin,
+                               client._bundled)
+                  if stage.name == 'bundle' else stage
+                  for stage in client.PIPELINE]
+        listener, packets = self.sent(stages=stages)
+        self.assertTrue(isinstance(listener, client.PyOSCBundledMixin))
+        self.assertFalse(isinstance(listener, client.BundledMixin))
+        # pyOSC's bundles are the same as the built-in ones
+        self.assertEqual(packets, self.sent()[1])
+
+    def test_added_stage_is_used(self):
+        stages = list(client.PIPELINE)
+        track = [stage.name for stage in stages].index('track')
+        stages.insert(track, client.Stage('count', FrameCounter,
+                                          lambda options: True))
+        listener, packets = self.sent('--delta', stages=stages)
+        self.assertEqual(listener.frames_counted, 20)
+        self.assertEqual(packets, self.sent('--delta')[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+#
+# Tests for quality.py
+#
+# Usage: python -m unittest discover tests (or: pytest tests)
+#
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from quality import QualityController, QUALITY_LEVELS
+
+
+class QualityControllerTest(unittest.TestCase):
+
+    # Windows of this many seconds; `hold` is 4 of them
+    WINDOW = 0.25
+
+    def setUp(self):
+        self.quality = QualityController(window=self.WINDOW, hold=1.0,
+                                         max_hold=4.0)
+
+    def windows(self, load, count=1):
+        """
+        The levels stepped to over `count` windows loaded `load`
+        """
+        levels = []
+        for _ in range(count):
+            level = self.quality.observe(load * self.WINDOW, self.WINDOW)
+            if level is not None:
+                levels.append(level)
+        return levels
+
+    def degrade_to(self, level):
+        self.windows(1.0, level)
+        self.assertEqual(self.quality.level, level)
+
+    def test_steps_down_a_level_a_window(self):
+        self.assertEqual(self.windows(1.0, 10),
+                         list(range(1, len(QUALITY_LEVELS))))
+        self.assertEqual(self.quality.name, QUALITY_LEVELS[-1])
+
+    def test_steps_back_up_a_level_a_hold(self):
+        self.degrade_to(len(QUALITY_LEVELS) - 1)
+        for level in reversed(range(len(QUALITY_LEVELS) - 1)):
+            self.assertEqual(self.windows(0.1, 3), [])
+            self.assertEqual(self.windows(0.1), [level])
+        self.assertEqual(self.windows(0.1, 10), [])
+        self.assertEqual(self.quality.name, QUALITY_LEVELS[0])
+
+    def test_stays_put_between_the_loads(self):
+        self.degrade_to(2)
+        self.assertEqual(self.windows(0.7, 20), [])
+        self.assertEqual(self.windows(0.1, 4), [1])
+
+    def test_windows_add_up_observations(self):
+        # Frames of 1/64s, 95% of which is busy
+        for _ in range(15):
+            self.assertEqual(self.quality.observe(0.95 / 64, 1 / 64.0), None)
+        self.assertEqual(self.quality.observe(0.95 / 64, 1 / 64.0), 1)
+        self.assertAlmostEqual(self.quality.load, 0.95)
+
+    def test_undone_step_up_waits_twice_as_long(self):
+        self.degrade_to(1)
+        self.assertEqual(self.windows(0.1, 4), [0])
+        # Stepping up was too much
+        self.assertEqual(self.windows(1.0), [1])
+        self.assertEqual(self.quality.recover_hold, 2.0)
+        self.assertEqual(self.windows(0.1, 7), [])
+        self.assertEqual(self.windows(0.1), [0])
+
+    def test_wait_is_capped(self):
+        self.degrade_to(1)
+        for _ in range(5):
+            # Back up, and straight back down
+            while self.quality.level:
+                self.windows(0.1)
+            self.windows(1.0)
+        self.assertEqual(self.quality.recover_hold, 4.0)
+
+    def test_wait_starts_over_once_a_step_up_holds(self):
+        self.degrade_to(1)
+        self.windows(0.1, 4)
+        self.windows(1.0)
+        self.windows(0.1, 8)
+        self.assertEqual(self.quality.recover_hold, 2.0)
+        # Held for `hold` at the better level this time
+        self.windows(0.7, 4)
+        self.assertEqual(self.quality.recover_hold, 1.0)
+        self.assertEqual(self.windows(1.0), [1])
+        self.assertEqual(self.windows(0.1, 4), [0])
+
+    def test_levels_which_apply(self):
+        quality = QualityController(levels=QUALITY_LEVELS[:2],
+                                    window=self.WINDOW)
+        self.assertEqual(quality.observe(self.WINDOW, self.WINDOW), 1)
+        self.assertEqual(quality.observe(self.WINDOW, self.WINDOW), None)
+
+    def test_rejects_loads_the_wrong_way_round(self):
+        self.assertRaises(ValueError, QualityController, degrade_load=0.5,
+                          recover_load=0.9)
+        self.assertRaises(ValueError, QualityController, recover_load=0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+#
+# Tests for rates.py, and its use by client.py's `RateLimitMixin`
+#
+# Usage: python -m unittest discover tests (or: pytest tests)
+#
+# The `RateLimitMixin` tests are skipped where client.py can't be imported
+# (it needs pyOSC, which is Python 2 only); the stand-in `Leap` module in
+# benchmarks/synthetic is used in place of the Leap SDK.
+#
+
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(HERE, '..', 'benchmarks', 'synthetic'))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from rates import AddressRule, RateSchedule, DEFAULT_RULE
+
+try:
+    import client
+except ImportError:
+    client = None
+
+
+def make_listener(rates, *args):
+    parser = client.make_parser()
+    options, _ = parser.parse_args(list(args))
+    client.check_options(parser, options)
+    options.rate_schedule = RateSchedule.parse(rates)
+    return client.make_listener(options, 'localhost', 9)
+
+
+class RateScheduleTest(unittest.TestCase):
+
+    def test_parse(self):
+        schedule = RateSchedule.parse([
+            "# pattern            rate  priority\n",
+            "\n",
+            "/hand*/palm/t        full  10   # every frame\n",
+            "/hand*/finger*/d     20\n",
+            "  /hand*/finger*/extended  2.5  -1\n",
+        ])
+        self.assertEqual([(rule.pattern, rule.rate, rule.period, rule.priority)
+                          for rule in schedule.rules],
+                         [('/hand*/palm/t', None, None, 10),
+                          ('/hand*/finger*/d', 20.0, 0.05, 0),
+                          ('/hand*/finger*/extended', 2.5, 0.4, -1)])
+        self.assertEqual(schedule.top_priority, 10)
+
+    def test_top_priority_is_at_least_the_default(self):
+        schedule = RateSchedule.parse(["/hand*/palm/t  full  -5"])
+        self.assertEqual(schedule.top_priority, DEFAULT_RULE.priority)
+
+    def test_parse_errors_name_the_line(self):
+        for line in ("/hand*/palm/t", "/hand*/palm/t full 1 2",
+                     "/hand*/palm/t fast", "/hand*/palm/t 0",
+                     "/hand*/palm/t -10", "/hand*/palm/t 10 high"):
+            try:
+                RateSchedule.parse(["# ok", line], "rates.txt")
+            except ValueError as e:
+                self.assertTrue(str(e).startswith("rates.txt, line 2: "),
+                                str(e))
+            else:
+                self.fail("Parsed %r" % line)
+
+    def test_first_matching_rule(self):
+        schedule = RateSchedule([AddressRule('/hand1/*', 5),
+                                 AddressRule('/hand*/palm/*', 10),
+                                 AddressRule('/hand*/palm/tx', 20)])
+        self.assertEqual(schedule.rule_for(['/hand1/palm/tx']).rate, 5)
+        self.assertEqual(schedule.rule_for(['/hand2/palm/tx']).rate, 10)
+        self.assertEqual(schedule.rule_for(['/hand2/finger1/tx']),
+                         DEFAULT_RULE)
+
+    def test_any_address_matches(self):
+        # A field is matched by its base address and each one it's sent to
+        schedule = RateSchedule([AddressRule('/hand*/palm/txyz', 5)])
+        self.assertEqual(schedule.rule_for(['/hand1/palm/t',
+                                            '/hand1/palm/txyz']).rate, 5)
+        self.assertEqual(schedule.rule_for(['/hand1/palm/t',
+                                            '/hand1/palm/tx']),
+                         DEFAULT_RULE)
+
+
+class RecordingStage(object):
+    """
+    Notes what `RateLimitMixin` passes on, in place of sending it; sends
+    the `fields` of `Frame`s.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.passed = []
+        super(RecordingStage,self).__init__(*args, **kwargs)
+
+    def send_frame_data(self, frame):
+        for hand_id, finger_id, field, value in frame.fields:
+            if isinstance(value, tuple):
+                self.send_part_vector(hand_id, finger_id, field, value)
+            else:
+                self.send_part_value(hand_id, finger_id, field, value)
+
+    def send_part_vector(self, hand_id, finger_id, field, vector):
+        self.passed.append((hand_id, finger_id, field))
+
+    def send_part_value(self, hand_id, finger_id, field, value):
+        self.passed.append((hand_id, finger_id, field))
+
+
+class Frame(object):
+    """
+    Stands in for a Leap frame; `fields` are `(hand_id, finger_id, field,
+    value)`, with vectors as tuples.
+    """
+
+    def __init__(self, seconds, fields):
+        self.timestamp = int(round(seconds * 1e6))
+        self.fields = fields
+
+
+@unittest.skipIf(client is None, "needs client.py's dependencies")
+class RateLimitMixinTest(unittest.TestCase):
+
+    def limiter(self, rates):
+        class_ = type('RateLimitedListener', (client.RateLimitMixin,
+                            RecordingStage, client.OSCLeapListener), {})
+        return class_(rate_schedule=RateSchedule.parse(rates),
+                      hostname='localhost', port=9)
+
+    def send(self, limiter, times, fields):
+        """
+        The times (of `times`) at which each field was passed on
+        """
+        sent = {}
+        for seconds in times:
+            del limiter.passed[:]
+            limiter.send_frame_data(Frame(seconds, fields(seconds)))
+            for passed in limiter.passed:
+                sent.setdefault(passed, []).append(seconds)
+        return sent
+
+    def test_sends_at_the_rate(self):
+        limiter = self.limiter(["/hand*/palm/t  10"])
+        times = [i / 60.0 for i in range(60)]
+        sent = self.send(limiter, times,
+                         lambda t: [(1, None, 't', (t, 0.0, 0.0)),
+                                    (1, 1, 't', (t, 0.0, 0.0))])
+        # Every frame for fields no rule matches
+        self.assertEqual(sent[(1, 1, 't')], times)
+        # Keeping to the rate on average, though 1/60 doesn't divide 1/10
+        self.assertEqual(len(sent[(1, None, 't')]), 10)
+        self.assertEqual(sent[(1, None, 't')][:3], [0.0, 6 / 60.0, 12 / 60.0])
+
+    def test_starts_over_once_a_period_behind(self):
+        limiter = self.limiter(["/hand*/palm/t  10"])
+        sent = self.send(limiter, [0.0, 0.35, 0.4, 0.45, 0.5],
+                         lambda t: [(1, None, 't', (t, 0.0, 0.0))])
+        self.assertEqual(sent[(1, None, 't')], [0.0, 0.35, 0.45])
+
+    def test_integer_fields_sent_when_they_change(self):
+        limiter = self.limiter(["/hand*/finger*/extended  1"])
+        times = [i / 10.0 for i in range(30)]
+        sent = self.send(limiter, times,
+                         lambda t: [(1, 1, 'extended', 1 if t >= 0.5 else 0)])
+        # Changed at 0.5, then due a period after that
+        self.assertEqual(sent[(1, 1, 'extended')], [0.0, 0.5, 1.5, 2.5])
+
+    def test_float_fields_only_at_the_rate(self):
+        limiter = self.limiter(["/hand*/pinch  2"])
+        times = [i / 10.0 for i in range(10)]
+        sent = self.send(limiter, times, lambda t: [(1, None, 'pinch', t)])
+        self.assertEqual(sent[(1, None, 'pinch')], [0.0, 0.5])
+
+    def test_passed_on_in_order_of_priority(self):
+        limiter = self.limiter(["/hand*/finger*/extended  full  -1",
+                                "/hand*/palm/t  full  5",
+                                "/hand*/finger*/t  full  1"])
+        limiter.send_frame_data(Frame(0.0, [(1, 1, 'extended', 1),
+                                            (1, 1, 't', (0.0, 0.0, 0.0)),
+                                            (1, 1, 'd', (0.0, 0.0, 0.0)),
+                                            (1, None, 't', (0.0, 0.0, 0.0)),
+                                            (1, 2, 't', (0.0, 0.0, 0.0))]))
+        self.assertEqual(limiter.passed, [(1, None, 't'), (1, 1, 't'),
+                                          (1, 2, 't'), (1, 1, 'd'),
+                                          (1, 1, 'extended')])
+
+    def test_rules_follow_vector_as_args(self):
+        listener = make_listener(["/hand*/finger*/tx  10",
+                                  "/hand*/finger*/txyz  20"], '--adaptive')
+        self.assertEqual(listener.rate_rule(1, 1, 't').rate, 10)
+        # As `AdaptiveQualityMixin` steps down to sending vectors as one
+        # message each, and back up
+        listener.quality.level = \
+                    listener.quality.levels.index(client.VECTOR_ARGS)
+        listener.apply_quality()
+        self.assertEqual(listener.rate_rule(1, 1, 't').rate, 20)
+        listener.quality.level = 0
+        listener.apply_quality()
+        self.assertEqual(listener.rate_rule(1, 1, 't').rate, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
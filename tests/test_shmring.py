@@ -0,0 +1,114 @@
+#
+# Tests for shmring.py
+#
+# Usage: python -m unittest discover tests (or: pytest tests)
+#
+# Written and read in one process, so frames being overwritten mid-read
+# are brought about on purpose.
+#
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import shmring
+from scheduler import FingerState, HandState
+from serializer import RecordedFrame
+from shmring import SharedFrameRing
+
+
+def make_frame(n):
+    finger = FingerState(n, (n, 2.0, 3.0), (0.0, 0.0, -1.0), True, type=1)
+    hand = HandState(1, (n, 0.5, -0.5), (0.0, -1.0, 0.0), [finger])
+    return RecordedFrame(n, 1000 * n, [hand])
+
+
+class SharedFrameRingTest(unittest.TestCase):
+
+    SLOTS = 4
+    # Put back after tests which wrap it
+    unpack_frame = staticmethod(shmring.unpack_frame)
+
+    def setUp(self):
+        self.ring = SharedFrameRing(slots=self.SLOTS)
+        self.reader = self.ring.reader()
+
+    def tearDown(self):
+        shmring.unpack_frame = self.unpack_frame
+        self.ring.release()
+
+    def put(self, *ns):
+        for n in ns:
+            self.ring.put(make_frame(n))
+
+    def read_all(self):
+        self.ring.close()
+        return [frame.id for frame in self.reader.frames(timeout=0)]
+
+    def test_round_trip(self):
+        self.put(0)
+        frame = self.reader.read(0)
+        self.assertEqual((frame.id, frame.timestamp), (0, 0))
+        hand, = frame.hands
+        finger, = hand.fingers
+        self.assertEqual(hand.palm_position, (0.0, 0.5, -0.5))
+        self.assertEqual((finger.id, finger.tip_position, finger.direction,
+                          finger.is_extended, finger.type),
+                         (0, (0.0, 2.0, 3.0), (0.0, 0.0, -1.0), True, 1))
+
+    def test_reads_in_order(self):
+        self.put(0, 1, 2)
+        self.assertEqual(self.read_all(), [0, 1, 2])
+        self.assertEqual(self.reader.skipped, 0)
+
+    def test_frame_overwritten_is_not_read(self):
+        self.put(*range(self.SLOTS + 1))
+        self.assertEqual(self.reader.read(0), None)
+        self.assertEqual(self.reader.read(self.SLOTS).id, self.SLOTS)
+
+    def test_frame_being_written_is_not_read(self):
+        self.put(0)
+        # As if the writer had started on frame 1 in the next slot
+        shmring.SEQUENCE.pack_into(self.ring.buffer,
+                                   self.ring.slot_offset(1), 2 * 1 + 1)
+        self.assertEqual(self.reader.read(1), None)
+        self.assertEqual(self.reader.read(0).id, 0)
+
+    def test_torn_read_is_noticed(self):
+        self.put(*range(self.SLOTS))
+        ring = self.ring
+
+        def unpack_then_overwrite(data, offset):
+            frame = self.unpack_frame(data, offset)
+            # The writer laps the reader while it copies frame 0 out
+            ring.put(make_frame(ring.written))
+            return frame
+        shmring.unpack_frame = unpack_then_overwrite
+        self.assertEqual(self.reader.read(0), None)
+
+    def test_reader_behind_skips_ahead(self):
+        self.put(*range(self.SLOTS * 2 + 2))
+        self.assertEqual(self.read_all(),
+                         list(range(self.SLOTS + 2, self.SLOTS * 2 + 2)))
+        self.assertEqual(self.reader.skipped, self.SLOTS + 2)
+        self.assertEqual(self.reader.frames_read, self.SLOTS)
+
+    def test_new_reader_starts_at_the_oldest_frame(self):
+        self.put(*range(self.SLOTS * 3))
+        self.reader = self.ring.reader()
+        self.assertEqual(self.read_all(),
+                         list(range(self.SLOTS * 2, self.SLOTS * 3)))
+        self.assertEqual(self.reader.skipped, 0)
+
+    def test_wraps_many_times(self):
+        for n in range(self.SLOTS * 50):
+            self.put(n)
+            frames = self.reader.frames(timeout=0)
+            self.assertEqual(next(frames).id, n)
+        self.assertEqual(self.reader.skipped, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
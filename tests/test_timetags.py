@@ -0,0 +1,136 @@
+#
+# Tests for timetags.py
+#
+# Usage: python -m unittest discover tests (or: pytest tests)
+#
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from oscpack import BundleEncoder, IMMEDIATELY, encode_message
+from timetags import (to_timetag, from_timetag, bundle_timetag,
+                      LeapTimeMapper, NTP_EPOCH_OFFSET)
+
+
+class TimetagTest(unittest.TestCase):
+
+    def test_fraction_bits(self):
+        self.assertEqual(to_timetag(0.0), (NTP_EPOCH_OFFSET, 0))
+        self.assertEqual(to_timetag(0.5), (NTP_EPOCH_OFFSET, 0x80000000))
+        self.assertEqual(to_timetag(1.25), (NTP_EPOCH_OFFSET + 1, 0x40000000))
+        self.assertEqual(to_timetag(2 ** -32), (NTP_EPOCH_OFFSET, 1))
+        # Truncated, never carried into the seconds
+        self.assertEqual(to_timetag(1 - 2 ** -40),
+                         (NTP_EPOCH_OFFSET, 0xffffffff))
+
+    def test_from_fraction_bits(self):
+        self.assertEqual(from_timetag((NTP_EPOCH_OFFSET, 1)), 2 ** -32)
+        self.assertEqual(from_timetag((NTP_EPOCH_OFFSET + 3, 0xc0000000)),
+                         3.75)
+        self.assertEqual(from_timetag((0, 0)), -NTP_EPOCH_OFFSET)
+
+    def test_round_trip_timetags(self):
+        # Around now, a float holds fractions down to 2**-21s or so; timetags
+        # with no finer fraction than that come back exactly
+        for fraction in (0, 1 << 12, 0x12345000, 0xfffff000):
+            timetag = (NTP_EPOCH_OFFSET + 1700000000, fraction)
+            self.assertEqual(to_timetag(from_timetag(timetag)), timetag)
+
+    def test_round_trip_times(self):
+        for seconds in (0.0, 0.001, 1.5, 1700000000.0, 1700000000.123456,
+                        1799999999.999999):
+            self.assertAlmostEqual(from_timetag(to_timetag(seconds)),
+                                   seconds, delta=1e-6)
+
+    def test_immediately(self):
+        self.assertEqual(from_timetag(IMMEDIATELY), None)
+        self.assertEqual(from_timetag(list(IMMEDIATELY)), None)
+
+    def test_bundle_timetag(self):
+        encoder = BundleEncoder()
+        encoder.begin(to_timetag(1.5))
+        self.assertEqual(bundle_timetag(encoder.getvalue()),
+                         (NTP_EPOCH_OFFSET + 1, 0x80000000))
+        self.assertEqual(bundle_timetag(encode_message('/ping', 1)), None)
+
+
+class LeapTimeMapperTest(unittest.TestCase):
+
+    # Leap frames at 100 per second, from this Leap time (in microseconds)
+    START_US = 5000000
+    LOCAL = 1500000000.0
+
+    def setUp(self):
+        self.mapper = LeapTimeMapper()
+
+    def arrive(self, seconds, rate=1.0, start=0.0):
+        """
+        Observes `seconds` of frames, from `start` (in Leap seconds), each
+        arriving 0.5ms to 2.5ms late by a local clock running at `rate` to
+        the Leap's; returns the Leap time of the last.
+        """
+        for n in range(int(seconds * 100)):
+            leap_us = self.START_US + int(round((start + n / 100.0) * 1e6))
+            delay = 0.0005 + (n * 7 % 11) * 0.0002
+            self.mapper.observe(leap_us, self.local(leap_us, rate) + delay)
+        return leap_us
+
+    def local(self, leap_us, rate=1.0):
+        """
+        The local time at which the Leap took a frame
+        """
+        return self.LOCAL + (leap_us - self.START_US) / 1e6 * rate
+
+    def test_first_frame_anchors(self):
+        self.mapper.observe(self.START_US, self.LOCAL)
+        self.assertEqual(self.mapper.to_local(self.START_US), self.LOCAL)
+        self.assertEqual(self.mapper.to_local(self.START_US + 250000),
+                         self.LOCAL + 0.25)
+
+    def test_maps_to_the_earliest_arrival(self):
+        leap_us = self.arrive(10)
+        # Within rounding of the local times
+        self.assertAlmostEqual(self.mapper.to_local(leap_us),
+                               self.local(leap_us) + 0.0005, delta=1e-6)
+        self.assertAlmostEqual(self.mapper.mapping[2], 1.0, delta=1e-6)
+
+    def test_corrects_drift(self):
+        # The clocks drift apart by 200ppm, 24ms over the two minutes
+        rate = 1 + 2e-4
+        leap_us = self.arrive(120, rate)
+        self.assertAlmostEqual(self.mapper.mapping[2], rate, delta=1e-6)
+        for later in (0, 500000, 5000000):
+            self.assertAlmostEqual(self.mapper.to_local(leap_us + later),
+                                   self.local(leap_us + later, rate) + 0.0005,
+                                   delta=1e-5)
+
+    def test_starts_over_after_a_jump(self):
+        leap_us = self.arrive(30, 1 + 2e-4)
+        # The Leap service restarts, its clock back near 0
+        self.mapper.observe(1000, self.local(leap_us) + 0.1)
+        self.assertEqual(self.mapper.mapping,
+                         (0.001, self.local(leap_us) + 0.1, 1.0))
+        self.assertEqual(self.mapper.window_min, None)
+
+    def test_jump_is_more_than_reset_after(self):
+        leap_us = self.arrive(2)
+        rate = self.mapper.mapping[2]
+        # Arriving late by less than a second is only noted
+        self.mapper.observe(leap_us + 10000, self.local(leap_us) + 0.9)
+        self.assertEqual(self.mapper.mapping[2], rate)
+        self.mapper.observe(leap_us + 20000, self.local(leap_us) + 1.1)
+        self.assertEqual(self.mapper.mapping[1:],
+                         (self.local(leap_us) + 1.1, 1.0))
+
+    def test_jump_either_way(self):
+        leap_us = self.arrive(2)
+        self.mapper.observe(leap_us + 10000, self.local(leap_us) - 1.5)
+        self.assertEqual(self.mapper.to_local(leap_us + 10000),
+                         self.local(leap_us) - 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
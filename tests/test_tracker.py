@@ -0,0 +1,212 @@
+#
+# Tests for the real part numbering of `RealPartTracker` (client.py)
+#
+# Usage: python -m unittest discover tests (or: pytest tests)
+#
+# Skipped where client.py can't be imported (it needs pyOSC, which is
+# Python 2 only); the stand-in `Leap` module in benchmarks/synthetic is used
+# in place of the Leap SDK.
+#
+
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(HERE, '..', 'benchmarks', 'synthetic'))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+try:
+    from client import RealFingerTracker, match_nearest
+except ImportError:
+    RealFingerTracker = match_nearest = None
+
+
+class RawFinger(object):
+
+    def __init__(self, id, tip_position=(0.0, 0.0, 0.0)):
+        self.id = id
+        self.tip_position = tip_position
+        self.direction = (0.0, 0.0, -1.0)
+        self.is_extended = True
+
+
+class RawHand(object):
+
+    def __init__(self, fingers):
+        self.fingers = fingers
+
+
+@unittest.skipIf(RealFingerTracker is None, "needs client.py's dependencies")
+class RealPartTrackerTest(unittest.TestCase):
+
+    MISS = 3
+
+    def setUp(self):
+        self.tracker = RealFingerTracker(part_miss_count=self.MISS)
+
+    def tick(self, *leap_ids):
+        self.tracker.handle_parent_tick(
+                    RawHand([RawFinger(leap_id) for leap_id in leap_ids]))
+
+    def numbers(self):
+        """
+        Leap id -> real number of each live part
+        """
+        return dict((part.leap_id, part.id)
+                    for part in self.tracker.get_real_parts()
+                    if not part.zeroed)
+
+    def zeroed(self):
+        return sorted(part.id for part in self.tracker.get_real_parts()
+                      if part.zeroed)
+
+    def check_invariants(self):
+        tracker = self.tracker
+        parts = tracker._real_parts
+        self.assertEqual(sorted(parts),
+                         sorted(list(tracker._live_parts) +
+                                list(tracker._zeroed_parts)))
+        for number, part in parts.items():
+            self.assertEqual(part.id, number)
+        # Each Leap id known maps to a part which has it
+        for leap_id, number in tracker._by_leap_id.items():
+            self.assertEqual(parts[number].leap_id, leap_id)
+        # Every number up to the highest handed out is in use or claimable
+        free = set(tracker._free_numbers)
+        for number in range(1, tracker._top_number + 1):
+            self.assertTrue(number in parts or number in free, number)
+
+    def test_numbers_lowest_first(self):
+        self.tick(100, 200, 300)
+        self.assertEqual(self.numbers(), {100: 1, 200: 2, 300: 3})
+        self.check_invariants()
+
+    def test_keeps_numbers_while_seen(self):
+        self.tick(100, 200, 300)
+        for i in range(10):
+            self.tick(300, 100, 200)
+        self.assertEqual(self.numbers(), {100: 1, 200: 2, 300: 3})
+        self.check_invariants()
+
+    def test_zeroes_then_drops_lost_parts(self):
+        self.tick(100, 200)
+        for i in range(self.MISS):
+            self.tick(100)
+        self.assertEqual(self.numbers(), {100: 1})
+        self.assertEqual(self.zeroed(), [2])
+        for i in range(self.MISS):
+            self.tick(100)
+        self.assertEqual(self.zeroed(), [])
+        self.assertEqual(len(self.tracker.get_real_parts()), 1)
+        self.check_invariants()
+
+    def test_zeroed_part_keeps_its_number_when_seen_again(self):
+        self.tick(100, 200)
+        for i in range(self.MISS):
+            self.tick(100)
+        self.tick(100, 200)
+        self.assertEqual(self.numbers(), {100: 1, 200: 2})
+        self.check_invariants()
+
+    def test_new_part_fills_the_lowest_hole(self):
+        self.tick(100, 200, 300)
+        for i in range(self.MISS * 2):
+            self.tick(100, 300)
+        self.tick(100, 300, 400)
+        self.assertEqual(self.numbers(), {100: 1, 300: 3, 400: 2})
+        self.tick(100, 300, 400, 500)
+        self.assertEqual(self.numbers(), {100: 1, 300: 3, 400: 2, 500: 4})
+        self.check_invariants()
+
+    def test_new_part_takes_over_a_zeroed_number(self):
+        self.tick(100, 200)
+        for i in range(self.MISS):
+            self.tick(100)
+        self.assertEqual(self.zeroed(), [2])
+        self.tick(100, 300)
+        self.assertEqual(self.numbers(), {100: 1, 300: 2})
+        self.assertEqual(self.zeroed(), [])
+        # The zeroed part is forgotten: back again, it's a new part
+        self.tick(100, 300, 200)
+        self.assertEqual(self.numbers(), {100: 1, 300: 2, 200: 3})
+        self.check_invariants()
+
+    def test_flickering_parts_keep_free_numbers_bounded(self):
+        for i in range(500):
+            leap_ids = [100] + ([1000 + i] if i % 2 else [])
+            self.tick(*leap_ids)
+            self.check_invariants()
+        tracker = self.tracker
+        self.assertTrue(len(tracker._free_numbers) <=
+                        2 * (len(tracker._real_parts) + 4))
+        self.assertTrue(tracker._top_number <= self.MISS * 2 + 2)
+
+
+@unittest.skipIf(match_nearest is None, "needs client.py's dependencies, "
+                                        "and NumPy")
+class ReassociateTest(RealPartTrackerTest):
+
+    GATE = 20.0
+
+    def setUp(self):
+        self.tracker = RealFingerTracker(part_miss_count=self.MISS,
+                                         reassociate_mm=self.GATE)
+
+    def tick(self, *fingers):
+        """
+        Ticks with fingers given as `(leap_id, x)`, or (for the tests
+        inherited) just Leap ids, spaced out beyond the gate
+        """
+        fingers = [finger if isinstance(finger, tuple) else
+                   (finger, finger * self.GATE * 2) for finger in fingers]
+        self.tracker.handle_parent_tick(RawHand([
+                    RawFinger(leap_id, (x, 0.0, 0.0))
+                    for leap_id, x in fingers]))
+
+    def test_new_leap_id_gets_the_old_number(self):
+        self.tick((100, 0.0), (200, 50.0), (300, 100.0))
+        self.tick((100, 0.0), (200, 50.0))
+        # 300 comes back as 301, near where it was
+        self.tick((100, 0.0), (200, 50.0), (301, 105.0))
+        self.assertEqual(self.numbers(), {100: 1, 200: 2, 301: 3})
+        self.assertEqual(self.tracker.reassociated_count, 1)
+        self.assertEqual(self.tracker.get_real_part(RawFinger(301))
+                         .last_position, (105.0, 0.0, 0.0))
+        self.check_invariants()
+
+    def test_zeroed_part_gets_its_number_back(self):
+        self.tick((100, 0.0), (200, 50.0))
+        for i in range(self.MISS):
+            self.tick((100, 0.0))
+        self.assertEqual(self.zeroed(), [2])
+        self.tick((100, 0.0), (201, 40.0))
+        self.assertEqual(self.numbers(), {100: 1, 201: 2})
+        self.assertEqual(self.zeroed(), [])
+        self.check_invariants()
+
+    def test_beyond_the_gate_is_a_new_part(self):
+        self.tick((100, 0.0), (200, 50.0))
+        self.tick((100, 0.0))
+        self.tick((100, 0.0), (201, 50.0 + self.GATE + 1.0))
+        self.assertEqual(self.numbers(), {100: 1, 200: 2, 201: 3})
+        self.assertEqual(self.tracker.reassociated_count, 0)
+        self.check_invariants()
+
+    def test_parts_seen_this_frame_are_not_taken(self):
+        self.tick((100, 0.0), (200, 25.0))
+        # 201 is nearer 100 than 200, but 100 is still seen
+        self.tick((100, 0.0), (201, 8.0))
+        self.assertEqual(self.numbers(), {100: 1, 201: 2})
+        self.check_invariants()
+
+    def test_each_lost_part_goes_to_the_nearest(self):
+        self.tick((100, 0.0), (200, 30.0), (300, 60.0))
+        self.tick((101, 62.0), (201, 3.0), (301, 28.0))
+        self.assertEqual(self.numbers(), {201: 1, 301: 2, 101: 3})
+        self.assertEqual(self.tracker.reassociated_count, 3)
+        self.check_invariants()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+#
+#
+# Leapyosc
+# OSC (NTP) timetags from Leap frame timestamps
+#
+#
+# http://www.github.com/topher515/leapyosc/
+#
+
+from oscpack import BUNDLE_HEADER, TIMETAG, IMMEDIATELY, as_bytes
+
+
+# Seconds from the NTP epoch (1900) to the Unix epoch (1970)
+NTP_EPOCH_OFFSET = 2208988800
+
+
+def to_timetag(seconds):
+    """
+    `(seconds, fraction)` OSC timetag for a Unix time
+    """
+    # Split before adding the offset, which would cost the fraction a bit
+    whole = int(seconds)
+    return (whole + NTP_EPOCH_OFFSET,
+            int((seconds - whole) * 4294967296.0) & 0xffffffff)
+
+
+def from_timetag(timetag):
+    """
+    Unix time of an OSC timetag (`None` for 'immediately')
+    """
+    if tuple(timetag) == IMMEDIATELY:
+        return None
+    return timetag[0] - NTP_EPOCH_OFFSET + timetag[1] / 4294967296.0
+
+
+def bundle_timetag(packet):
+    """
+    The timetag of an encoded bundle, or `None` if `packet` isn't one
+    """
+    if as_bytes(packet[:len(BUNDLE_HEADER)]) != BUNDLE_HEADER:
+        return None
+    return TIMETAG.unpack_from(packet, len(BUNDLE_HEADER))
+
+
+class LeapTimeMapper(object):
+    """
+    Maps Leap frame timestamps (microseconds on the Leap service's clock)
+    onto local Unix time, correcting for the two clocks drifting apart.
+
+    Each frame is `observe`d with the local time it arrived. Arrival can
+    only be late, so once every `window` seconds the mapping is moved by the
+    smallest difference between arrival and mapped time seen in that window,
+    and its rate adjusted by `gain` of the drift that shows. A jump of more
+    than `reset_after` seconds (e.g. the Leap service restarted) starts the
+    mapping over.
+
+    Observed by the frame thread, but may be read (`to_local`) by another,
+    e.g. with a sender thread; each update swaps in a new `mapping` tuple,
+    so readers never see a half updated one.
+    """
+
+    def __init__(self, window=1.0, gain=0.5, reset_after=1.0):
+        self.window = window
+        self.gain = gain
+        self.reset_after = reset_after
+        # (leap seconds, local time it maps to, rate)
+        self.mapping = None
+        self.window_end = None
+        self.window_min = None
+
+    def to_local(self, leap_us):
+        anchor_leap, anchor_local, rate = self.mapping
+        return anchor_local + (leap_us / 1e6 - anchor_leap) * rate
+
+    def reset(self, leap_s, local):
+        self.mapping = (leap_s, local, 1.0)
+        self.window_end = leap_s + self.window
+        self.window_min = None
+
+    def observe(self, leap_us, local):
+        leap_s = leap_us / 1e6
+        if self.mapping is None:
+            self.reset(leap_s, local)
+            return
+        error = local - self.to_local(leap_us)
+        if abs(error) > self.reset_after:
+            self.reset(leap_s, local)
+            return
+        if self.window_min is None or error < self.window_min:
+            self.window_min = error
+        if leap_s >= self.window_end:
+            anchor_leap, _, rate = self.mapping
+            elapsed = leap_s - anchor_leap
+            correction = self.window_min
+            if elapsed > 0:
+                rate += self.gain * correction / elapsed
+            self.mapping = (leap_s, self.to_local(leap_us) + correction, rate)
+            self.window_end = leap_s + self.window
+            self.window_min = None